@@ -0,0 +1,328 @@
+"""
+Бенчмарки путей загрузки и чтения данных на синтетических (или записанных) ответах hh.ru:
+- transform: разбор JSON (целиком и поэлементно), извлечение полей вакансий (FieldExtractor в сравнении
+  с прежним поштучным разбором полей; ускорение меньше EXTRACT_SPEEDUP - ошибка) и преобразование
+  страниц поиска (VacHH.transform_page);
+- load: запись страниц в БД (VacHH.load_page: справочники + COPY/upsert вакансий), повторная
+  запись тех же вакансий (обновление) и обновление сводной статистики;
+- query: запросы DBManager;
+- export: выгрузка вакансий в файлы (VacancyExporter; Parquet и Arrow - если установлен pyarrow).
+
+Пути load, query и export используют отдельную БД vacancies_bench на сервере из database.ini.
+Результаты записываются в src/benchmarks/results (JSON) и сравниваются с эталоном
+src/benchmarks/baseline.json: замедление больше допустимого отмечается как регрессия.
+
+Запуск из корня проекта:
+    python -m src.benchmarks.bench [--paths transform load query export] [--scales 2000 20000 200000]
+                                   [--repeat 5] [--fixture pages.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+import psycopg2
+from loguru import logger
+
+from src.benchmarks import legacy
+from src.benchmarks.fixtures import synthetic_pages, recorded_pages
+from src.conf.config import config
+from src.conf.constants import SCRIPT_DBCREATE, SCRIPT_DBCREATETABLES, PATH_MIGRATIONS
+from src.utils.creationdb import CreationDB
+from src.utils.currencyrates import currency_rates
+from src.utils.dbmanager import DBManager
+from src.utils.dbpool import db_pool, close_pools
+from src.utils import exporter
+from src.utils.exporter import VacancyExporter
+from src.utils.salaryanalytics import SalaryAnalytics
+from src.utils.jsondecode import loads, iter_items, JSON_BACKEND
+from src.utils.vacancies import VacHH
+
+BENCH_DB_NAME = 'vacancies_bench'
+BENCH_AREA_ID = 999999  # регион/город, в который загружаются синтетические вакансии
+SCALES = (2000, 20000, 200000)
+PATHS = ('transform', 'load', 'query', 'export')
+REPEAT = 5
+TOLERANCE = 0.2  # допустимое замедление относительно эталона (доля)
+EXTRACT_SPEEDUP = 3  # минимальное ускорение извлечения полей FieldExtractor относительно прежнего разбора
+PATH_RESULTS = os.path.join('..', 'src', 'benchmarks', 'results')
+PATH_BASELINE = os.path.join('..', 'src', 'benchmarks', 'baseline.json')
+# Курсы валют синтетических вакансий (единиц валюты за 1 рубль): результаты не зависят от сети и курсов hh.ru
+BENCH_RATES = {'RUR': 1.0, 'USD': 0.011, 'EUR': 0.01, 'KZT': 5.5}
+
+
+class Benchmark:
+    """
+    Измерение времени выполнения: каждая функция выполняется repeat раз,
+    в результат записываются медианное, минимальное и максимальное время.
+    """
+
+    def __init__(self, repeat: int = REPEAT) -> None:
+        self.__repeat = repeat
+        self.results: dict[str, dict] = {}
+        self.failures: list[str] = []  # невыполненные требования к результатам
+
+    def measure(self, name: str, func: Callable[[], object], rows: int | None = None,
+                setup: Callable[[], None] | None = None, repeat: int | None = None) -> None:
+        """
+        Измерение времени выполнения функции.
+        :param name: Имя измерения, str.
+        :param func: Измеряемая функция, Callable.
+        :param rows: Количество обрабатываемых строк (для расчёта скорости), int.
+        :param setup: Подготовка перед каждым повтором (не измеряется), Callable.
+        :param repeat: Количество повторов (по-умолчанию - общее), int.
+        """
+        times = []
+        for _ in range(repeat or self.__repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        seconds = statistics.median(times)
+        result = {'seconds': seconds, 'min': min(times), 'max': max(times), 'repeat': len(times)}
+        if rows:
+            result['rows'] = rows
+            result['rows_per_sec'] = rows / seconds if seconds > 0 else 0
+        self.results[name] = result
+        rate = f', {result["rows_per_sec"]:.0f} строк/с' if rows else ''
+        print(f'{name:<40} {seconds * 1000:>10.2f} мс (мин. {min(times) * 1000:.2f}){rate}')
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(repeat: {self.__repeat}, results: {len(self.results)})"
+
+
+def prepare_database(params: dict) -> None:
+    """
+    Создание БД для бенчмарков (если её нет), применение миграций, добавление региона/города.
+    :param params: Параметры подключения к БД, dict.
+    """
+    conn = psycopg2.connect(dbname='postgres', **params)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute('SELECT 1 FROM pg_database WHERE datname = %s', (BENCH_DB_NAME,))
+        exists = cur.fetchone() is not None
+    conn.close()
+    db = CreationDB(params, BENCH_DB_NAME)
+    if not exists:
+        db.create_database(SCRIPT_DBCREATE)
+        db.create_tables(SCRIPT_DBCREATETABLES)
+    db.migrate(PATH_MIGRATIONS)
+    with db_pool(BENCH_DB_NAME, params).transaction() as conn:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO areas(area_id, area_name) VALUES (%s, 'Бенчмарк') ON CONFLICT DO NOTHING",
+                        (BENCH_AREA_ID,))
+
+
+def reset_area(params: dict) -> None:
+    """
+    Удаление вакансий и работодателей региона/города бенчмарков.
+    :param params: Параметры подключения к БД, dict.
+    """
+    with db_pool(BENCH_DB_NAME, params).transaction() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS vacancies_{BENCH_AREA_ID}')
+            cur.execute('DELETE FROM employers WHERE area_id = %s', (BENCH_AREA_ID,))
+    VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID).create_partition()
+
+
+def bench_transform(bench: Benchmark, pages: list[bytes], rows: int) -> list[dict]:
+    """
+    Разбор JSON и преобразование страниц поиска (разобранных и поэлементно из тел ответов).
+    :return: Преобразованные страницы, list[dict].
+    """
+    decoded = [loads(page) for page in pages]
+    bench.measure(f'transform/decode/{rows}', lambda: [loads(page) for page in pages], rows)
+    bench.measure(f'transform/iter_items/{rows}', lambda: [sum(1 for _ in iter_items(page)) for page in pages], rows)
+    # Извлечение полей: прежний поштучный разбор и FieldExtractor (результаты должны совпадать).
+    # Вакансии обрабатываются постранично, как в transform_page (строки страницы передаются на запись в БД
+    # и не накапливаются)
+    extractor = VacHH.EXTRACTOR
+    for js_obj in decoded:
+        if [legacy.extract(item) for item in js_obj['items']] != [extractor.extract(item) for item in js_obj['items']]:
+            raise AssertionError('Результаты FieldExtractor и прежнего разбора полей не совпадают')
+
+    def extract(func: Callable[[dict], object]) -> Callable[[], None]:
+        def pages_extract() -> None:
+            for js_obj in decoded:
+                [func(item) for item in js_obj['items']]
+        return pages_extract
+
+    bench.measure(f'transform/extract_legacy/{rows}', extract(legacy.extract), rows)
+    bench.measure(f'transform/extract/{rows}', extract(extractor.extract), rows)
+    result = bench.results[f'transform/extract/{rows}']
+    result['speedup'] = bench.results[f'transform/extract_legacy/{rows}']['seconds'] / result['seconds']
+    print(f'{"transform/extract: ускорение":<40} {result["speedup"]:>10.2f}x')
+    if result['speedup'] < EXTRACT_SPEEDUP:
+        bench.failures.append(f'transform/extract/{rows}: ускорение {result["speedup"]:.2f}x '
+                              f'(требуется не меньше {EXTRACT_SPEEDUP}x)')
+    state = {}  # новый экземпляр VacHH на каждый повтор (id полученных вакансий не повторяются)
+
+    def transform() -> None:
+        state['batches'] = [state['vac'].transform_page(js_obj) for js_obj in decoded]
+
+    bench.measure(f'transform/transform_page/{rows}', transform, rows,
+                  setup=lambda: state.update(vac=VacHH(BENCH_DB_NAME, {}, BENCH_AREA_ID)))
+    bench.measure(f'transform/transform_bytes/{rows}', lambda: [state['vac'].transform_page(page) for page in pages],
+                  rows, setup=lambda: state.update(vac=VacHH(BENCH_DB_NAME, {}, BENCH_AREA_ID)))
+    return state['batches']
+
+
+def bench_load(bench: Benchmark, batches: list[dict], rows: int, params: dict) -> None:
+    """
+    Запись преобразованных страниц в БД: добавление, обновление тех же вакансий, сводная статистика.
+    """
+    def load() -> None:
+        vac = VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID)
+        for batch in batches:
+            vac.load_page(batch)
+
+    bench.measure(f'load/insert/{rows}', load, rows, setup=lambda: reset_area(params))
+    bench.measure(f'load/upsert/{rows}', load, rows)
+    bench.measure(f'load/refresh_summary/{rows}', VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID).refresh_summary)
+
+
+def bench_query(bench: Benchmark, rows: int, params: dict) -> None:
+    """
+    Запросы DBManager (без кэша результатов).
+    """
+    db = DBManager(BENCH_DB_NAME, params, BENCH_AREA_ID)
+    first_page = db.get_vacancies_page('all', 10)
+    queries = {
+        'summary': db.get_summary,
+        'companies_and_vacancies_count': db.get_companies_and_vacancies_count,
+        'avg_salary': db.get_avg_salary,
+        'count_all': lambda: db.count_vacancies('all'),
+        'page_all': lambda: db.get_vacancies_page('all', 10),
+        'page_all_next': lambda: db.get_vacancies_page('all', 10, after=db.page_key('all', first_page[-1])),
+        'count_higher': lambda: db.count_vacancies('higher'),
+        'page_higher': lambda: db.get_vacancies_page('higher', 10),
+        'count_keyword': lambda: db.count_vacancies('keyword', 'python'),
+        'page_keyword': lambda: db.get_vacancies_page('keyword', 10, word='python'),
+        'all_vacancies': db.get_all_vacancies,
+        'stream_all': lambda: sum(1 for _ in db.iter_vacancies('all')),
+        'salary_analytics': SalaryAnalytics(BENCH_DB_NAME, params, BENCH_AREA_ID).stats,
+    }
+    for name, query in queries.items():
+        bench.measure(f'query/{name}/{rows}', query, setup=DBManager.cache.clear)
+
+
+def bench_export(bench: Benchmark, rows: int, params: dict) -> None:
+    """
+    Выгрузка всех вакансий в файлы (во временную папку).
+    """
+    vacancy_exporter = VacancyExporter(DBManager(BENCH_DB_NAME, params, BENCH_AREA_ID))
+    formats = [fmt for fmt in VacancyExporter.FORMATS if exporter.pyarrow is not None or fmt in ('csv', 'jsonl')]
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            path = os.path.join(directory, f'vacancies.{VacancyExporter.FORMATS[fmt]}')
+            bench.measure(f'export/{fmt}/{rows}', lambda: vacancy_exporter.export(path, fmt=fmt), rows)
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """
+    Сравнение результатов с эталоном.
+    :return: Имена измерений с замедлением больше допустимого, list[str].
+    """
+    regressions = []
+    print(f'\n{"Измерение":<40} {"эталон, мс":>12} {"сейчас, мс":>12} {"отношение":>10}')
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['seconds'] / baseline[name]['seconds'] if baseline[name]['seconds'] > 0 else 1.0
+        mark = ''
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            mark = '  РЕГРЕССИЯ'
+        print(f'{name:<40} {baseline[name]["seconds"] * 1000:>12.2f} {result["seconds"] * 1000:>12.2f} '
+              f'{ratio:>10.2f}{mark}')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Бенчмарки загрузки и чтения данных о вакансиях')
+    parser.add_argument('--paths', nargs='+', choices=PATHS, default=list(PATHS))
+    parser.add_argument('--scales', nargs='+', type=int, default=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--fixture', help='файл JSON с записанными страницами поиска hh.ru')
+    parser.add_argument('--baseline', help='файл эталонных результатов (по-умолчанию - src/benchmarks/baseline.json)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как эталон')
+    args = parser.parse_args()
+    # Пути к файлам программы заданы относительно каталога src (каталог меняется только при запуске
+    # бенчмарков, пути из аргументов - относительно каталога запуска)
+    args.fixture = os.path.abspath(args.fixture) if args.fixture else None
+    args.baseline = os.path.abspath(args.baseline) if args.baseline else PATH_BASELINE
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    bench = Benchmark(args.repeat)
+    params = None
+    if {'load', 'query', 'export'} & set(args.paths):
+        params = config()
+        prepare_database(params)
+        currency_rates().update(BENCH_RATES)
+
+    for rows in args.scales:
+        if args.fixture:
+            pages = list(recorded_pages(args.fixture, rows, BENCH_AREA_ID))
+        else:
+            pages = list(synthetic_pages(rows, BENCH_AREA_ID))
+        batches = bench_transform(bench, pages, rows) if 'transform' in args.paths else None
+        if params is None:
+            continue
+        if batches is None:
+            vac = VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID)
+            batches = [vac.transform_page(page) for page in pages]
+        if 'load' in args.paths:
+            bench_load(bench, batches, rows, params)
+        else:
+            reset_area(params)
+            vac = VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID)
+            for batch in batches:
+                vac.load_page(batch)
+            vac.refresh_summary()
+        if 'query' in args.paths:
+            bench_query(bench, rows, params)
+        if 'export' in args.paths:
+            bench_export(bench, rows, params)
+    if params is not None:
+        close_pools()
+
+    report = {'meta': {'datetime': datetime.now().isoformat(timespec='seconds'),
+                       'python': platform.python_version(), 'platform': platform.platform(),
+                       'repeat': args.repeat, 'fixture': args.fixture or 'synthetic', 'json': JSON_BACKEND},
+              'results': bench.results}
+    os.makedirs(PATH_RESULTS, exist_ok=True)
+    path = os.path.join(PATH_RESULTS, f'bench-{datetime.now():%Y%m%d-%H%M%S}.json')
+    with open(path, 'w', encoding='utf8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f'\nРезультаты записаны в файл {path}')
+
+    if bench.failures:
+        print(f'\nНе выполнены требования: {"; ".join(bench.failures)}')
+    if args.save_baseline:
+        if bench.failures:
+            sys.exit(1)
+        with open(args.baseline, 'w', encoding='utf8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f'Эталон записан в файл {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf8') as file:
+            regressions = compare(bench.results, json.load(file)['results'], args.tolerance)
+        if regressions:
+            print(f'\nРегрессии (замедление больше {args.tolerance:.0%}): {", ".join(regressions)}')
+            sys.exit(1)
+    if bench.failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
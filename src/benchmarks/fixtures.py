@@ -0,0 +1,86 @@
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+# Значения справочников и текстов для синтетических вакансий
+_POSITIONS = ['Python-разработчик', 'Программист 1С', 'Менеджер по продажам', 'Бухгалтер', 'Водитель',
+              'Аналитик данных', 'Инженер-конструктор', 'Продавец-консультант', 'Data Engineer', 'DevOps-инженер']
+_CURRENCIES = ['RUR', 'RUR', 'RUR', 'USD', 'EUR', 'KZT']
+_SCHEDULES = ['Полный день', 'Удаленная работа', 'Сменный график', 'Гибкий график', 'Вахтовый метод']
+_EMPLOYMENTS = ['Полная занятость', 'Частичная занятость', 'Проектная работа', 'Стажировка']
+_EXPERIENCES = ['Нет опыта', 'От 1 года до 3 лет', 'От 3 до 6 лет', 'Более 6 лет']
+_WORDS = ['опыт', 'работы', 'знание', '<highlighttext>Python</highlighttext>', 'SQL', 'PostgreSQL', 'команде',
+          'ответственность', 'клиентами', 'документации', 'разработка', 'сопровождение', 'отчётности']
+
+
+def synthetic_item(rnd: random.Random, vacancy_id: int, area: int, employers: int) -> dict:
+    """
+    Синтетическая вакансия в формате выдачи поиска hh.ru (поля, используемые при загрузке).
+    :param rnd: Генератор случайных чисел, random.Random.
+    :param vacancy_id: id вакансии, int.
+    :param area: id региона/города, int.
+    :param employers: Количество различных работодателей, int.
+    :return: Вакансия, dict.
+    """
+    salary_from = rnd.choice([None, rnd.randrange(20, 300) * 1000])
+    salary_to = rnd.choice([None, (salary_from or 20000) + rnd.randrange(0, 100) * 1000])
+    published = datetime(2023, 8, 1, 12) - timedelta(minutes=rnd.randrange(0, 30 * 24 * 60))
+    return {
+        'id': str(vacancy_id),
+        'name': f'  {rnd.choice(_POSITIONS)}  ',
+        'area': {'id': str(area)},
+        'salary': {'from': salary_from, 'to': salary_to, 'currency': rnd.choice(_CURRENCIES)},
+        'published_at': published.strftime('%Y-%m-%dT%H:%M:%S+0300'),
+        'employer': {'name': f'Работодатель №{rnd.randrange(employers)}'},
+        'schedule': {'name': rnd.choice(_SCHEDULES)},
+        'employment': {'name': rnd.choice(_EMPLOYMENTS)},
+        'experience': {'name': rnd.choice(_EXPERIENCES)},
+        'snippet': {'requirement': ' '.join(rnd.choices(_WORDS, k=rnd.randrange(5, 30))),
+                    'responsibility': rnd.choice([None, ' '.join(rnd.choices(_WORDS, k=rnd.randrange(5, 30)))])},
+        'address': rnd.choice([None, {'raw': f'г. Город, ул. Улица, д. {rnd.randrange(1, 200)}'}]),
+        'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}',
+    }
+
+
+def synthetic_pages(rows: int, area: int, per_page: int = 100, seed: int = 1) -> Iterator[bytes]:
+    """
+    Синтетические страницы выдачи поиска hh.ru (тело ответа API).
+    При одинаковых параметрах страницы одинаковы.
+    :param rows: Количество вакансий, int.
+    :param area: id региона/города, int.
+    :param per_page: Количество вакансий на странице, int.
+    :param seed: Начальное значение генератора случайных чисел, int.
+    :return: Итератор тел ответов, Iterator[bytes].
+    """
+    rnd = random.Random(seed)
+    employers = max(10, rows // 20)
+    pages = (rows + per_page - 1) // per_page
+    for page in range(pages):
+        items = [synthetic_item(rnd, 10_000_000 + i, area, employers)
+                 for i in range(page * per_page, min(rows, (page + 1) * per_page))]
+        yield json.dumps({'items': items, 'found': rows, 'pages': pages, 'page': page,
+                          'per_page': per_page}, ensure_ascii=False).encode('utf8')
+
+
+def recorded_pages(path: str, rows: int, area: int, per_page: int = 100) -> Iterator[bytes]:
+    """
+    Страницы выдачи поиска, составленные из записанных ответов hh.ru (файл JSON со списком
+    страниц или одной страницей). Вакансии повторяются по кругу с новыми id до нужного количества.
+    :param path: Путь к файлу, str.
+    :param rows: Количество вакансий, int.
+    :param area: id региона/города, int.
+    :param per_page: Количество вакансий на странице, int.
+    :return: Итератор тел ответов, Iterator[bytes].
+    """
+    with open(path, 'r', encoding='utf8') as file:
+        recorded = json.load(file)
+    items = [item for page in (recorded if isinstance(recorded, list) else [recorded]) for item in page['items']]
+    pages = (rows + per_page - 1) // per_page
+    for page in range(pages):
+        page_items = []
+        for i in range(page * per_page, min(rows, (page + 1) * per_page)):
+            item = dict(items[i % len(items)], id=str(10_000_000 + i), area={'id': str(area)})
+            page_items.append(item)
+        yield json.dumps({'items': page_items, 'found': rows, 'pages': pages, 'page': page,
+                          'per_page': per_page}, ensure_ascii=False).encode('utf8')
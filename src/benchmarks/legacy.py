@@ -0,0 +1,99 @@
+"""
+Прежний (до FieldExtractor) разбор полей вакансии - методы Mixin и цикл VacHH.vacancies_all без изменений:
+каждое поле извлекается отдельным вызовом с проверкой вложенных словарей, html-теги удаляются re.sub
+с разбором шаблона при каждом вызове, ключи справочников вычисляются повторно.
+Используется только в бенчмарках для сравнения с FieldExtractor и проверки совпадения результатов.
+"""
+import re
+
+from src.conf.constants import NOT_DATA
+
+
+class Mixin:
+    """
+    Прежние методы разбора полей вакансии.
+    """
+
+    def one_level(self, dict_vak: dict, key_1: str) -> str:
+        """
+        Строковое значение 1-го уровня вложенности.
+        """
+        try:
+            if all(dict_vak.get(key_1)):
+                return self.del_space(self.del_html_tag(dict_vak[key_1]))
+        except (TypeError, AttributeError):
+            return NOT_DATA
+
+    def two_levels(self, dict_vak: dict, key_1: str, key_2: str) -> str:
+        """
+        Строковое значение 2-го уровня вложенности.
+        """
+        try:
+            if all(dict_vak.get(key_1).get(key_2)):
+                return self.del_space(self.del_html_tag(dict_vak[key_1][key_2]))
+        except (TypeError, AttributeError):
+            return NOT_DATA
+
+    @staticmethod
+    def two_levels_salary(dict_vak: dict, key_1: str, key_2: str) -> int:
+        """
+        Зарплата (2-й уровень вложенности), 0 - если её нет.
+        """
+        salary = 0
+        try:
+            if all(str(dict_vak.get(key_1).get(key_2))):
+                if str(dict_vak.get(key_1).get(key_2)) != 'None':
+                    salary = dict_vak[key_1][key_2]
+        except (TypeError, AttributeError):
+            pass
+        return salary
+
+    @staticmethod
+    def del_space(txt: str) -> str:
+        """
+        Удаление лишних пробелов (в начале, в конце, двойных), между словами - по одному пробелу.
+        """
+        txt = ' '.join(txt.strip().split())
+        return txt
+
+    @staticmethod
+    def del_html_tag(txt: str) -> str:
+        """
+        Удаление html-тегов.
+        """
+        txt = re.sub(r'\<[^>]*\>', '', txt)
+        return txt
+
+
+_MIXIN = Mixin()
+
+
+def extract(value: dict) -> tuple[list, list[tuple]]:
+    """
+    Строка таблицы vacancies и ключи справочников (как FieldExtractor.extract).
+    :param value: Вакансия из выдачи поиска hh.ru, dict.
+    :return: Строка вакансии и ключи справочников, tuple[list, list[tuple]].
+    """
+    self = _MIXIN
+    row_db = [
+        value["published_at"].split('T')[0],
+        self.one_level(value, "name"),
+        (int(value["area"]["id"]), self.two_levels(value, "employer", "name")),
+        self.two_levels_salary(value, "salary", "from"),
+        self.two_levels_salary(value, "salary", "to"),
+        self.two_levels(value, "salary", "currency"),
+        self.two_levels(value, "schedule", "name"),
+        self.two_levels(value, "employment", "name"),
+        self.two_levels(value, "experience", "name"),
+        self.two_levels(value, "snippet", "requirement"),
+        self.two_levels(value, "snippet", "responsibility"),
+        self.two_levels(value, "address", 'raw'),
+        self.one_level(value, "alternate_url"),
+        int(value['id']),
+    ]
+    keys = [(int(value["area"]["id"]), self.two_levels(value, "employer", "name")),
+            (self.two_levels(value, "salary", "currency"),),
+            (self.two_levels(value, "schedule", "name"),),
+            (self.two_levels(value, "employment", "name"),),
+            (self.two_levels(value, "experience", "name"),)]
+    return row_db, keys
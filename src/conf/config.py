@@ -1,9 +1,22 @@
 from configparser import ConfigParser
+from functools import lru_cache
 
 from src.conf.constants import PATH_INI
 
 
 def config(filename: str = PATH_INI, section: str = "postgresql") -> dict:
+    """
+    Возвращает параметры подключения к БД из файла database.ini как словарь.
+    Файл читается один раз, далее используются сохранённые параметры.
+    :param filename: Имя файла, хранящего конфигурацию доступа к БД, str.
+    :param section: Секция, содержащая данные в файле, str.
+    :return: Словарь с параметрами БД, dict.
+    """
+    return dict(read_config(filename, section))
+
+
+@lru_cache
+def read_config(filename: str, section: str) -> dict:
     """
     Читает параметры в файле database.ini и возвращает их как словарь.
     :param filename: Имя файла, хранящего конфигурацию доступа к БД, str.
@@ -2,20 +2,105 @@ import os
 
 # URL регионы
 URL_AREAS_HH = 'https://api.hh.ru/areas/113'
+# URL дочерних регионов/населённых пунктов по id
+URL_AREAS_ID_HH = 'https://api.hh.ru/areas/{}'
 # id России для поиска вакансий
 ID_RUSSIA_HH = 113
+# URL вакансии
+URL_VACANCIES_HH = 'https://api.hh.ru/vacancies'
+# URL справочников (курсы валют для пересчёта зарплат в рубли)
+URL_DICTIONARIES_HH = 'https://api.hh.ru/dictionaries'
+# Код рубля в справочнике валют hh.ru
+CURRENCY_RUB = 'RUR'
+# Максимальное количество страниц выдачи hh.ru (20 стр. по 100 вакансий)
+MAX_PAGES_HH = 20
+# Ограничение глубины выдачи hh.ru (вакансий на один запрос)
+DEPTH_CAP_HH = 2000
+# Количество потоков для параллельной загрузки страниц с вакансиями
+MAX_WORKERS_HH = 8
+
+# Срок публикации вакансии на hh.ru, дн. (более старые вакансии удаляются при синхронизации)
+VACANCY_LIFETIME_DAYS = 30
+# Срок, в течение которого загруженные данные по региону считаются актуальными, ч.
+AREA_FRESH_HOURS = 24
+# Перекрытие периода при получении новых вакансий с момента последнего обновления, мин.
+SYNC_OVERLAP_MINUTES = 60
+
+# Размер очередей между этапами конвейера загрузки (страниц)
+PIPELINE_QUEUE_SIZE = 4
+# Количество запоминаемых обработанных значений повторяющегося поля вакансии (должность, работодатель, адрес)
+EXTRACT_CACHE_SIZE = 50000
+
+# Разбиение запроса на части (шарды) при превышении глубины выдачи
+SHARD_PERIOD_DAYS = 30  # период публикации, разбиваемый по датам, дн.
+SHARD_MIN_WINDOW = 60  # минимальный интервал даты публикации в шарде, сек.
+SHARD_MAX_DEPTH = 16  # максимальная глубина разбиения
+SHARD_DEADLINE = 120  # ограничение времени построения плана загрузки, сек.
+
+# HTTP-клиент
+HEADERS_HH = {'User-Agent': 'term-paper-zaberov-bd-5/0.1'}
+HTTP_TIMEOUT = 10  # тайм-аут запроса, сек.
+HTTP_RETRIES = 5  # количество повторов запроса при ошибках
+HTTP_BACKOFF = 0.5  # начальная задержка перед повтором, сек.
+HTTP_BACKOFF_MAX = 30  # максимальная задержка перед повтором, сек.
+HTTP_POOL_SIZE = MAX_WORKERS_HH  # размер пула соединений
+RATE_LIMIT_HH = 10  # допустимое количество запросов к hh.ru в секунду
+RATE_BURST_HH = 5  # допустимое количество запросов "всплеском"
+
+# Дисковый кэш ответов API hh.ru
+PATH_CACHE = os.path.join('..', 'src', 'cache', 'http.sqlite')
+CACHE_ENABLED = True
+CACHE_SIZE = 256 * 1024 * 1024  # допустимый размер кэша, байт
+# Время жизни ответов по префиксу адреса, сек.
+CACHE_TTL = {
+    'https://api.hh.ru/areas': 7 * 24 * 60 * 60,
+    'https://api.hh.ru/vacancies': 30 * 60,
+    'https://api.hh.ru/dictionaries': 24 * 60 * 60,
+}
+# Работа без сети: ответы берутся только из кэша (переменная окружения HH_OFFLINE=1)
+HTTP_OFFLINE = os.environ.get('HH_OFFLINE') == '1'
 
 # SQL
 DB_NAME = 'vacancies'
+# Пул соединений с БД (минимальное и максимальное количество соединений)
+DB_POOL_MIN = 1
+DB_POOL_MAX = 8
+# Количество результатов запросов, хранимых в кэше DBManager
+QUERY_CACHE_SIZE = 64
+# Суммарное количество строк результатов в кэше DBManager (больший результат не кэшируется)
+QUERY_CACHE_ROWS = 20000
+# Поиск региона/города по названию: максимальное количество вариантов для выбора
+# и минимальное сходство (по триграммам) для нечёткого поиска
+AREA_CANDIDATES_MAX = 10
+AREA_SIMILARITY = 0.3
 PATH_INI = os.path.join('..', 'src', 'conf', 'database.ini')
+# Количество строк в одном запросе INSERT ... VALUES при массовой загрузке
+BULK_PAGE_SIZE = 1000
 # Скрипты
 # Создание БД, таблиц, заполнение таблиц
 SCRIPT_DBCREATE = os.path.join('..', 'src', 'conf', 'dbcreate.sql')
 SCRIPT_DBCREATETABLES = os.path.join('..', 'src', 'conf', 'dbcreatetables.sql')
+# Миграции схемы БД (файлы NNNN_описание.sql, применяются по порядку номеров)
+PATH_MIGRATIONS = os.path.join('..', 'src', 'conf', 'migrations')
+# Ключ блокировки, исключающей одновременное применение миграций несколькими процессами
+MIGRATIONS_LOCK_ID = 20230801
+
+# Статистика зарплат: количество интервалов гистограммы и количество работодателей в разбивке
+ANALYTICS_BINS = 20
+ANALYTICS_TOP_EMPLOYERS = 10
+
+# Выгрузка вакансий в файлы: папка по-умолчанию и количество строк в пакете
+PATH_EXPORT = os.path.join('..', 'src', 'export')
+EXPORT_BATCH_SIZE = 10000
 
 # Путь хранения логов
 PATH_LOGS = os.path.join('..', 'src', 'logs', 'logs.log')
 
+# Метрики: файл для Prometheus (node_exporter textfile collector)
+# и границы интервалов гистограмм времени выполнения, сек.
+PATH_METRICS = os.path.join('..', 'src', 'logs', 'metrics.prom')
+METRICS_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 # "Контрольные" логи
 LOG_FULL = 'Полное обновление БД прошло успешно'
 LOG_USER = 'Обновление БД по запросу пользователя прошло успешно'
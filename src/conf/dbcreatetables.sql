@@ -1,12 +1,26 @@
+-- Расширение для поиска по подстроке и с опечатками (триграммы)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Таблица "Регионы, города/населённые пункты"
 CREATE TABLE IF NOT EXISTS areas
 (
     area_id integer NOT NULL,
     area_name varchar(100) NOT NULL,
+    parent_id integer DEFAULT NULL,
 
     CONSTRAINT pk_areas_area_id PRIMARY KEY (area_id)
 );
 
+-- Таблица "Отпечатки справочников" (хэш последней загруженной версии)
+CREATE TABLE IF NOT EXISTS fingerprints
+(
+    fingerprint_name varchar(50) NOT NULL,
+    fingerprint_hash char(64) NOT NULL,
+    fingerprint_datetime TIMESTAMP NOT NULL,
+
+    CONSTRAINT pk_fingerprints_fingerprint_name PRIMARY KEY (fingerprint_name)
+);
+
 -- Таблица "Работодатели"
 CREATE TABLE IF NOT EXISTS employers
 (
@@ -15,6 +29,7 @@ CREATE TABLE IF NOT EXISTS employers
     employer_name varchar(200) NOT NULL,
 
     CONSTRAINT pk_employers_employer_id PRIMARY KEY (employer_id),
+    CONSTRAINT uq_employers_area_id_employer_name UNIQUE (area_id, employer_name),
     CONSTRAINT fk_employers_area_id FOREIGN KEY (area_id) REFERENCES areas(area_id)
 );
 
@@ -25,7 +40,8 @@ CREATE TABLE IF NOT EXISTS currency
     currency_id serial NOT NULL,
     currency_name varchar(3) NOT NULL,
 
-    CONSTRAINT pk_currency_currency_id PRIMARY KEY (currency_id)
+    CONSTRAINT pk_currency_currency_id PRIMARY KEY (currency_id),
+    CONSTRAINT uq_currency_currency_name UNIQUE (currency_name)
 );
 
 -- Таблица "График работы"
@@ -34,7 +50,8 @@ CREATE TABLE IF NOT EXISTS schedule
     schedule_id serial NOT NULL,
     schedule_name varchar(50) NOT NULL,
 
-    CONSTRAINT pk_schedule_schedule_id PRIMARY KEY (schedule_id)
+    CONSTRAINT pk_schedule_schedule_id PRIMARY KEY (schedule_id),
+    CONSTRAINT uq_schedule_schedule_name UNIQUE (schedule_name)
 );
 
 -- Таблица "Занятость"
@@ -43,7 +60,8 @@ CREATE TABLE IF NOT EXISTS employment
     employment_id serial NOT NULL,
     employment_name varchar(50) NOT NULL,
 
-    CONSTRAINT pk_employment_employment_id PRIMARY KEY (employment_id)
+    CONSTRAINT pk_employment_employment_id PRIMARY KEY (employment_id),
+    CONSTRAINT uq_employment_employment_name UNIQUE (employment_name)
 );
 
 -- Таблица "Опыт работы"
@@ -52,13 +70,17 @@ CREATE TABLE IF NOT EXISTS experience
     experience_id serial NOT NULL,
     experience_name varchar(50) NOT NULL,
 
-    CONSTRAINT pk_experience_experience_id PRIMARY KEY (experience_id)
+    CONSTRAINT pk_experience_experience_id PRIMARY KEY (experience_id),
+    CONSTRAINT uq_experience_experience_name UNIQUE (experience_name)
 );
 
--- Таблица "Отобранные вакансии"
+-- Таблица "Отобранные вакансии" (секционирована по региону/городу поиска,
+-- секции vacancies_<area_id> создаются при первой загрузке региона)
 CREATE TABLE IF NOT EXISTS vacancies
 (
     vacancy_id serial NOT NULL,
+    area_id integer NOT NULL,
+    hh_id bigint NOT NULL,
     date_publication date NOT NULL,
     position_employee varchar(200) NOT NULL,
     employer_id integer NOT NULL,
@@ -72,21 +94,35 @@ CREATE TABLE IF NOT EXISTS vacancies
     duties text DEFAULT NULL,
     employer_address varchar(300) DEFAULT NULL,
     url varchar(200),
-
-    CONSTRAINT pk_vacancies_vacancy_id PRIMARY KEY (vacancy_id),
+    -- поисковый вектор (должность, требования, обязанности), обновляется при каждой записи вакансии
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(position_employee, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(applicant_requirements, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(duties, '')), 'C')) STORED,
+
+    CONSTRAINT pk_vacancies_area_id_vacancy_id PRIMARY KEY (area_id, vacancy_id),
+    CONSTRAINT uq_vacancies_area_id_hh_id UNIQUE (area_id, hh_id),
+    CONSTRAINT fk_vacancies_area_id FOREIGN KEY (area_id) REFERENCES areas(area_id),
     CONSTRAINT fk_vacancies_employer_id FOREIGN KEY (employer_id) REFERENCES employers(employer_id),
     CONSTRAINT fk_vacancies_currency_id FOREIGN KEY (currency_id) REFERENCES currency(currency_id),
     CONSTRAINT fk_vacancies_schedule_id FOREIGN KEY (schedule_id) REFERENCES schedule(schedule_id),
     CONSTRAINT fk_vacancies_employment_id FOREIGN KEY (employment_id) REFERENCES employment(employment_id),
     CONSTRAINT fk_vacancies_experience_id FOREIGN KEY (experience_id) REFERENCES experience(experience_id)
-);
+) PARTITION BY LIST (area_id);
+
+-- Индексы полнотекстового и триграммного поиска вакансий (создаются и в секциях)
+CREATE INDEX IF NOT EXISTS ix_vacancies_search_vector ON vacancies USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_vacancies_position_employee_trgm ON vacancies USING GIN (position_employee gin_trgm_ops);
 
--- Таблица "История"
-CREATE TABLE IF NOT EXISTS history
+-- Сводная статистика по вакансиям (материализованное представление vacancies_summary)
+-- создаётся миграцией 5 (зарплаты в рублях)
+
+-- Таблица "Актуальность данных по регионам/городам"
+CREATE TABLE IF NOT EXISTS area_freshness
 (
-    history_id serial NOT NULL,
-    history_datetime TIMESTAMP NOT NULL,
-    history_area varchar(100) NOT NULL,
+    area_id integer NOT NULL,
+    freshness_datetime TIMESTAMP NOT NULL,
 
-    CONSTRAINT pk_history_history_id PRIMARY KEY (history_id)
-);
\ No newline at end of file
+    CONSTRAINT pk_area_freshness_area_id PRIMARY KEY (area_id),
+    CONSTRAINT fk_area_freshness_area_id FOREIGN KEY (area_id) REFERENCES areas(area_id)
+);
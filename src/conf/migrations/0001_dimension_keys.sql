@@ -0,0 +1,62 @@
+-- Миграция 1. Справочники и вакансии БД, созданной до появления миграций:
+-- родительский регион в таблице areas, таблица отпечатков справочников, естественные ключи
+-- справочников (UNIQUE) и id вакансии hh.ru. В БД, созданной скриптом dbcreatetables.sql
+-- текущей версии, все изменения уже есть (миграция ничего не меняет).
+
+-- Родительский регион (заполняется при следующем обновлении справочника регионов)
+ALTER TABLE areas ADD COLUMN IF NOT EXISTS parent_id integer DEFAULT NULL;
+
+-- Таблица "Отпечатки справочников" (хэш последней загруженной версии)
+CREATE TABLE IF NOT EXISTS fingerprints
+(
+    fingerprint_name varchar(50) NOT NULL,
+    fingerprint_hash char(64) NOT NULL,
+    fingerprint_datetime TIMESTAMP NOT NULL,
+
+    CONSTRAINT pk_fingerprints_fingerprint_name PRIMARY KEY (fingerprint_name)
+);
+
+-- Естественные ключи справочников: повторяющиеся записи объединяются (вакансии ссылаются
+-- на запись с наименьшим id), затем добавляется ограничение UNIQUE
+DO $$
+DECLARE
+    dimension text;
+BEGIN
+    FOREACH dimension IN ARRAY ARRAY['currency', 'schedule', 'employment', 'experience'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = format('uq_%s_%s_name', dimension, dimension)) THEN
+            EXECUTE format('UPDATE vacancies v SET %1$s_id = d.keep_id '
+                           'FROM (SELECT %1$s_id, MIN(%1$s_id) OVER (PARTITION BY %1$s_name) AS keep_id '
+                           'FROM %1$s) d '
+                           'WHERE v.%1$s_id = d.%1$s_id AND d.keep_id <> d.%1$s_id', dimension);
+            EXECUTE format('DELETE FROM %1$s t USING %1$s k '
+                           'WHERE t.%1$s_name = k.%1$s_name AND t.%1$s_id > k.%1$s_id', dimension);
+            EXECUTE format('ALTER TABLE %1$s ADD CONSTRAINT uq_%1$s_%1$s_name UNIQUE (%1$s_name)', dimension);
+        END IF;
+    END LOOP;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_employers_area_id_employer_name') THEN
+        UPDATE vacancies v SET employer_id = d.keep_id
+        FROM (SELECT employer_id, MIN(employer_id) OVER (PARTITION BY area_id, employer_name) AS keep_id
+              FROM employers) d
+        WHERE v.employer_id = d.employer_id AND d.keep_id <> d.employer_id;
+        DELETE FROM employers e USING employers k
+        WHERE e.area_id = k.area_id AND e.employer_name = k.employer_name AND e.employer_id > k.employer_id;
+        ALTER TABLE employers
+            ADD CONSTRAINT uq_employers_area_id_employer_name UNIQUE (area_id, employer_name);
+    END IF;
+END $$;
+
+-- id вакансии hh.ru (ключ обновления вакансий при синхронизации) берётся из её адреса
+-- (https://hh.ru/vacancy/<id>); вакансии без id и повторы удаляются и загружаются заново
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'vacancies' AND column_name = 'hh_id') THEN
+        ALTER TABLE vacancies ADD COLUMN hh_id bigint;
+        UPDATE vacancies SET hh_id = substring(url FROM '/vacancy/(\d+)')::bigint;
+        DELETE FROM vacancies WHERE hh_id IS NULL;
+        DELETE FROM vacancies v USING vacancies k WHERE v.hh_id = k.hh_id AND v.vacancy_id < k.vacancy_id;
+        ALTER TABLE vacancies ALTER COLUMN hh_id SET NOT NULL;
+        ALTER TABLE vacancies ADD CONSTRAINT uq_vacancies_hh_id UNIQUE (hh_id);
+    END IF;
+END $$;
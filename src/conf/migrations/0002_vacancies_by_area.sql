@@ -0,0 +1,106 @@
+-- Миграция 2. Вакансии по регионам/городам поиска в БД, созданной до появления миграций:
+-- таблица vacancies пересоздаётся секционированной по area_id (ключ обновления - area_id, hh_id),
+-- добавляются таблица area_freshness и id региона в истории запросов. Если vacancies уже
+-- секционирована (БД создана скриптом dbcreatetables.sql текущей версии), таблица не меняется.
+
+-- Расширение для поиска по подстроке и с опечатками (триграммы)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Таблица "Актуальность данных по регионам/городам"
+CREATE TABLE IF NOT EXISTS area_freshness
+(
+    area_id integer NOT NULL,
+    freshness_datetime TIMESTAMP NOT NULL,
+
+    CONSTRAINT pk_area_freshness_area_id PRIMARY KEY (area_id),
+    CONSTRAINT fk_area_freshness_area_id FOREIGN KEY (area_id) REFERENCES areas(area_id)
+);
+
+-- id региона/города в истории запросов: по названию региона (как при поиске), иначе - Россия
+ALTER TABLE IF EXISTS history ADD COLUMN IF NOT EXISTS history_area_id integer DEFAULT NULL;
+DO $$
+BEGIN
+    IF to_regclass('history') IS NOT NULL THEN
+        UPDATE history h
+        SET history_area_id = COALESCE((SELECT MIN(area_id) FROM areas
+                                        WHERE lower(area_name) = lower(h.history_area)), 113)
+        WHERE h.history_area_id IS NULL;
+    END IF;
+END $$;
+
+DO $$
+DECLARE
+    area integer;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'vacancies'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+    -- все имеющиеся вакансии загружены по последнему запросу пользователя
+    area := 113;
+    IF to_regclass('history') IS NOT NULL THEN
+        SELECT COALESCE((SELECT history_area_id FROM history ORDER BY history_datetime DESC LIMIT 1), 113)
+        INTO area;
+    END IF;
+
+    ALTER TABLE vacancies RENAME TO vacancies_legacy;
+    ALTER SEQUENCE vacancies_vacancy_id_seq RENAME TO vacancies_legacy_vacancy_id_seq;
+    ALTER TABLE vacancies_legacy RENAME CONSTRAINT pk_vacancies_vacancy_id TO pk_vacancies_legacy_vacancy_id;
+    ALTER TABLE vacancies_legacy RENAME CONSTRAINT uq_vacancies_hh_id TO uq_vacancies_legacy_hh_id;
+
+    -- Таблица "Отобранные вакансии" (как в dbcreatetables.sql)
+    CREATE TABLE vacancies
+    (
+        vacancy_id serial NOT NULL,
+        area_id integer NOT NULL,
+        hh_id bigint NOT NULL,
+        date_publication date NOT NULL,
+        position_employee varchar(200) NOT NULL,
+        employer_id integer NOT NULL,
+        salary_from integer DEFAULT NULL,
+        salary_to integer DEFAULT NULL,
+        currency_id integer NOT NULL,
+        schedule_id integer NOT NULL,
+        employment_id integer NOT NULL,
+        experience_id integer NOT NULL,
+        applicant_requirements text DEFAULT NULL,
+        duties text DEFAULT NULL,
+        employer_address varchar(300) DEFAULT NULL,
+        url varchar(200),
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(position_employee, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(applicant_requirements, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(duties, '')), 'C')) STORED,
+
+        CONSTRAINT pk_vacancies_area_id_vacancy_id PRIMARY KEY (area_id, vacancy_id),
+        CONSTRAINT uq_vacancies_area_id_hh_id UNIQUE (area_id, hh_id),
+        CONSTRAINT fk_vacancies_area_id FOREIGN KEY (area_id) REFERENCES areas(area_id),
+        CONSTRAINT fk_vacancies_employer_id FOREIGN KEY (employer_id) REFERENCES employers(employer_id),
+        CONSTRAINT fk_vacancies_currency_id FOREIGN KEY (currency_id) REFERENCES currency(currency_id),
+        CONSTRAINT fk_vacancies_schedule_id FOREIGN KEY (schedule_id) REFERENCES schedule(schedule_id),
+        CONSTRAINT fk_vacancies_employment_id FOREIGN KEY (employment_id) REFERENCES employment(employment_id),
+        CONSTRAINT fk_vacancies_experience_id FOREIGN KEY (experience_id) REFERENCES experience(experience_id)
+    ) PARTITION BY LIST (area_id);
+    CREATE INDEX IF NOT EXISTS ix_vacancies_search_vector ON vacancies USING GIN (search_vector);
+    CREATE INDEX IF NOT EXISTS ix_vacancies_position_employee_trgm
+        ON vacancies USING GIN (position_employee gin_trgm_ops);
+
+    -- Перенос вакансий в секцию региона/города (id вакансий сохраняются)
+    EXECUTE format('CREATE TABLE vacancies_%s PARTITION OF vacancies FOR VALUES IN (%s)', area, area);
+    INSERT INTO vacancies(vacancy_id, area_id, hh_id, date_publication, position_employee, employer_id,
+                          salary_from, salary_to, currency_id, schedule_id, employment_id, experience_id,
+                          applicant_requirements, duties, employer_address, url)
+    SELECT vacancy_id, area, hh_id, date_publication, position_employee, employer_id,
+           salary_from, salary_to, currency_id, schedule_id, employment_id, experience_id,
+           applicant_requirements, duties, employer_address, url
+    FROM vacancies_legacy;
+    PERFORM setval(pg_get_serial_sequence('vacancies', 'vacancy_id'),
+                   COALESCE((SELECT MAX(vacancy_id) FROM vacancies), 0) + 1, false);
+    DROP TABLE vacancies_legacy;
+
+    -- Загруженные вакансии региона/города обновляются синхронизацией с даты последнего запроса
+    IF to_regclass('history') IS NOT NULL THEN
+        INSERT INTO area_freshness(area_id, freshness_datetime)
+        SELECT area, MAX(history_datetime) FROM history HAVING MAX(history_datetime) IS NOT NULL
+        ON CONFLICT (area_id) DO NOTHING;
+    END IF;
+END $$;
@@ -0,0 +1,21 @@
+-- Миграция 3. Индексы для запросов DBManager и загрузки вакансий.
+-- Индексы секционированной таблицы vacancies создаются во всех секциях (в том числе будущих).
+
+-- Списки вакансий региона/города (все, поиск): порядок вывода и постраничная выборка
+-- по (date_publication, salary_from, vacancy_id), удаление устаревших вакансий по date_publication,
+-- количество вакансий (только индекс)
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_date_salary_id
+    ON vacancies (area_id, date_publication DESC, salary_from DESC, vacancy_id DESC);
+
+-- Вакансии с зарплатой выше средней: salary_from > x OR salary_to > y (объединение двух индексов)
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_salary_from ON vacancies (area_id, salary_from);
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_salary_to ON vacancies (area_id, salary_to);
+
+-- Внешние ключи: соединения со справочниками, группировка в сводной статистике
+-- (только индекс), проверка ссылок при удалении записей справочников
+CREATE INDEX IF NOT EXISTS ix_vacancies_employer_id ON vacancies (employer_id);
+CREATE INDEX IF NOT EXISTS ix_vacancies_currency_id ON vacancies (currency_id);
+CREATE INDEX IF NOT EXISTS ix_vacancies_schedule_id ON vacancies (schedule_id);
+CREATE INDEX IF NOT EXISTS ix_vacancies_employment_id ON vacancies (employment_id);
+CREATE INDEX IF NOT EXISTS ix_vacancies_experience_id ON vacancies (experience_id);
+
@@ -0,0 +1,36 @@
+-- Миграция 4. Журнал загрузок данных (заменяет таблицу history).
+-- Каждая загрузка (полная, синхронизация или переключение на уже загруженный регион/город)
+-- записывается программой загрузки вместе с показателями производительности.
+CREATE TABLE IF NOT EXISTS ingest_runs
+(
+    run_id serial NOT NULL,
+    area_id integer NOT NULL,
+    area_name varchar(100) NOT NULL,
+    run_kind varchar(10) NOT NULL,  -- full - полная загрузка, sync - синхронизация, switch - без загрузки
+    run_status varchar(10) NOT NULL DEFAULT 'running',  -- running, ok, failed
+    started_datetime TIMESTAMP NOT NULL,
+    finished_datetime TIMESTAMP DEFAULT NULL,
+    pages integer NOT NULL DEFAULT 0,  -- получено страниц поиска hh.ru
+    rows_loaded jsonb NOT NULL DEFAULT '{}',  -- загружено строк по таблицам
+    http_requests integer NOT NULL DEFAULT 0,
+    http_seconds double precision NOT NULL DEFAULT 0,  -- суммарное время HTTP-запросов
+    db_seconds double precision NOT NULL DEFAULT 0,  -- суммарное время записи в БД
+
+    CONSTRAINT pk_ingest_runs_run_id PRIMARY KEY (run_id)
+);
+
+-- Последняя успешная загрузка (история запросов пользователя)
+CREATE INDEX IF NOT EXISTS ix_ingest_runs_finished_datetime
+    ON ingest_runs (finished_datetime DESC) WHERE run_status = 'ok';
+
+-- Перенос истории из таблицы history
+DO $$
+BEGIN
+    IF to_regclass('history') IS NOT NULL THEN
+        INSERT INTO ingest_runs(area_id, area_name, run_kind, run_status, started_datetime, finished_datetime)
+        SELECT COALESCE(history_area_id, 113), history_area, 'full', 'ok', history_datetime, history_datetime
+        FROM history
+        ORDER BY history_id;
+        DROP TABLE history;
+    END IF;
+END $$;
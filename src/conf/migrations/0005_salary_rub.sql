@@ -0,0 +1,63 @@
+-- Миграция 5. Зарплаты в рублях (пересчёт по курсам hh.ru при загрузке вакансий).
+-- 0 - зарплата не указана (или нет курса валюты): поля без NULL, постраничная выборка
+-- по (date_publication, salary_from_rub, vacancy_id) сравнивает строки без учёта NULL.
+ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS salary_from_rub integer NOT NULL DEFAULT 0;
+ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS salary_to_rub integer NOT NULL DEFAULT 0;
+
+-- Зарплаты в рублях переносятся сразу, в других валютах - пересчитываются при следующей загрузке
+-- региона/города (CurrencyRates.backfill)
+UPDATE vacancies v
+SET salary_from_rub = COALESCE(v.salary_from, 0),
+    salary_to_rub = COALESCE(v.salary_to, 0)
+FROM currency c
+WHERE c.currency_id = v.currency_id AND c.currency_name = 'RUR';
+
+-- Порядок вывода и постраничная выборка, вакансии с зарплатой выше средней - по зарплате в рублях
+DROP INDEX IF EXISTS ix_vacancies_area_id_date_salary_id;
+DROP INDEX IF EXISTS ix_vacancies_area_id_salary_from;
+DROP INDEX IF EXISTS ix_vacancies_area_id_salary_to;
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_date_salary_rub_id
+    ON vacancies (area_id, date_publication DESC, salary_from_rub DESC, vacancy_id DESC);
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_salary_from_rub ON vacancies (area_id, salary_from_rub);
+CREATE INDEX IF NOT EXISTS ix_vacancies_area_id_salary_to_rub ON vacancies (area_id, salary_to_rub);
+
+-- Сводная статистика по вакансиям региона/города поиска (обновляется после каждой загрузки):
+-- количество вакансий, средняя/минимальная/максимальная зарплата в рублях (от и до),
+-- ТОП-10 работодателей по количеству вакансий и количество вакансий по справочникам.
+DROP MATERIALIZED VIEW IF EXISTS vacancies_summary;
+CREATE MATERIALIZED VIEW vacancies_summary AS
+SELECT v.area_id,
+       COUNT(*) AS vacancies_count,
+       AVG(v.salary_from_rub) FILTER (WHERE v.salary_from_rub > 0) AS avg_salary_from,
+       MIN(v.salary_from_rub) FILTER (WHERE v.salary_from_rub > 0) AS min_salary_from,
+       MAX(v.salary_from_rub) FILTER (WHERE v.salary_from_rub > 0) AS max_salary_from,
+       AVG(v.salary_to_rub) FILTER (WHERE v.salary_to_rub > 0) AS avg_salary_to,
+       MIN(v.salary_to_rub) FILTER (WHERE v.salary_to_rub > 0) AS min_salary_to,
+       MAX(v.salary_to_rub) FILTER (WHERE v.salary_to_rub > 0) AS max_salary_to,
+       (SELECT jsonb_agg(t ORDER BY t.count DESC, t.employer_name)
+        FROM (SELECT employers.employer_name, COUNT(*) AS count, employer_id
+              FROM vacancies INNER JOIN employers USING (employer_id)
+              WHERE vacancies.area_id = v.area_id
+              GROUP BY employers.employer_name, employer_id
+              ORDER BY COUNT(*) DESC, employers.employer_name
+              LIMIT 10) t) AS top_employers,
+       (SELECT jsonb_object_agg(currency_name, count)
+        FROM (SELECT currency_name, COUNT(*) AS count
+              FROM vacancies INNER JOIN currency USING (currency_id)
+              WHERE vacancies.area_id = v.area_id GROUP BY currency_name) t) AS currency_counts,
+       (SELECT jsonb_object_agg(schedule_name, count)
+        FROM (SELECT schedule_name, COUNT(*) AS count
+              FROM vacancies INNER JOIN schedule USING (schedule_id)
+              WHERE vacancies.area_id = v.area_id GROUP BY schedule_name) t) AS schedule_counts,
+       (SELECT jsonb_object_agg(employment_name, count)
+        FROM (SELECT employment_name, COUNT(*) AS count
+              FROM vacancies INNER JOIN employment USING (employment_id)
+              WHERE vacancies.area_id = v.area_id GROUP BY employment_name) t) AS employment_counts,
+       (SELECT jsonb_object_agg(experience_name, count)
+        FROM (SELECT experience_name, COUNT(*) AS count
+              FROM vacancies INNER JOIN experience USING (experience_id)
+              WHERE vacancies.area_id = v.area_id GROUP BY experience_name) t) AS experience_counts
+FROM vacancies v
+GROUP BY v.area_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_vacancies_summary_area_id ON vacancies_summary(area_id);
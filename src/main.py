@@ -1,10 +1,13 @@
 from datetime import datetime
 
 from src.conf.config import config
+from src.utils.dbmanager import DBManager
+from src.utils.dbpool import close_pools
+from src.utils.metrics import metrics
 
 from src.utils.utils import log_json, create_database, update_desired, select_history, \
     print_companies_and_vacancies_count, print_all_vacancies, message_avg_salary, print_vacancies_with_higher_salary, \
-    print_vacancies_with_keyword
+    print_vacancies_with_keyword, export_vacancies, print_salary_analytics
 
 
 def main():
@@ -18,8 +21,10 @@ def main():
 
     while True:
         # Получение данных об истории приложения
-        history_datetime = select_history()[1]
-        history_area = select_history()[2]
+        history = select_history()
+        history_datetime = history[1]
+        history_area = history[2]
+        history_area_id = history[3]
 
         # Прошло количество дней с момента последнего запроса
         date_update = history_datetime
@@ -46,41 +51,55 @@ def main():
             break
 
         if select_update == 1:
-            # Обновление данных в БД
-            update_desired(params)
+            # Обновление данных в БД; дальнейшие запросы - по выбранному региону/городу
+            history_area_id = update_desired(params)
 
         # Получение данных из БД
         # ТОП-10 компаний по количеству вакансий
-        print_companies_and_vacancies_count()
+        print_companies_and_vacancies_count(history_area_id)
 
         # Информация о средней зарплате по всем вакансиям
-        print(message_avg_salary())
+        print(message_avg_salary(history_area_id))
 
         try:
             select_print = int(
                 input('Выберите один из пунктов:\n'
                       '  Все вакансии ........................ - 0\n'
                       '  Вакансии с зарплатой выше средней ... - 1\n'
+                      '  Выгрузка всех вакансий в файл ....... - 2\n'
                       '  Вакансии с поиском по ключевому слову - 3\n'
-                      '  Выйти из программы .................. - 4\n'
+                      '  Статистика зарплат .................. - 4\n'
+                      '  Выйти из программы .................. - 5\n'
                       '  Введите команду: '))
         except ValueError:
-            select_print = 4
+            select_print = 5
 
-        if select_print >= 4 or select_print < 0:
+        if select_print >= 5 or select_print < 0:
             break
 
         if select_print == 0:
             # Вывод на экран выбранного количества вакансий или 10 (по-умолчанию)
-            print_all_vacancies()
+            print_all_vacancies(history_area_id)
 
         if select_print == 1:
             # Вывод на экран вакансий с зарплатой выше средней или 10 (по-умолчанию)
-            print_vacancies_with_higher_salary()
+            print_vacancies_with_higher_salary(history_area_id)
+
+        if select_print == 2:
+            # Выгрузка всех вакансий в файл (CSV, JSON Lines, Parquet, Arrow)
+            export_vacancies(history_area_id)
 
         if select_print == 3:
             # Вывод на экран вакансий по ключевому слову или 10 (по-умолчанию)
-            print_vacancies_with_keyword()
+            print_vacancies_with_keyword(history_area_id)
+
+        if select_print == 4:
+            # Статистика зарплат: процентили, распределение, разбивка по справочникам
+            print_salary_analytics(history_area_id)
+    DBManager.cache.log_stats()
+    metrics().log_summary()  # сводная таблица времени выполнения этапов
+    metrics().export()  # метрики для Prometheus
+    close_pools()
     exit(0)
 
 
@@ -0,0 +1,234 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import NamedTuple
+
+import psycopg2
+from loguru import logger
+
+from src.conf.config import config
+from src.conf.constants import DB_NAME, ID_RUSSIA_HH, AREA_CANDIDATES_MAX, AREA_SIMILARITY
+from src.utils.dbpool import db_pool
+
+# Уточнение в скобках: "Аксай (Ростовская область)"
+_PARENS = re.compile(r'\(([^)]*)\)')
+# Разделители слов: пробелы, дефисы, тире, точки, запятые
+_SEPARATORS = re.compile(r'[\s\-‐-―.,]+')
+
+
+class AreaCandidate(NamedTuple):
+    """
+    Найденный регион/город.
+    """
+    area_id: int
+    area_name: str
+    parent_name: str | None  # регион, в который входит населённый пункт
+    score: float  # степень соответствия запросу (1.0 - полное совпадение названия)
+
+
+class AreaResolver:
+    """
+    Поиск id региона/города по названию без обращения к БД: справочник регионов
+    загружается в память один раз и хранится в виде отсортированного массива
+    нормализованных названий (поиск по началу названия - двоичный поиск).
+    Если по началу названия ничего не найдено, используется нечёткий поиск по триграммам.
+    """
+
+    def __init__(self, db_name: str, params: dict) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__areas: dict[int, tuple[str, int | None]] = {}  # id: (название, id родителя)
+        self.__names: list[str] = []  # нормализованные названия (отсортированы)
+        self.__entries: list[tuple[str, str, int]] = []  # (название, уточнение, id) в порядке __names
+        self.__trigrams: dict[str, list[int]] = {}  # триграмма: индексы __entries
+        self.__sizes: list[int] = []  # количество триграмм названий в порядке __entries
+        self.__depths: dict[int, int] = {}  # id: уровень вложенности
+
+    def load(self) -> None:
+        """
+        Загрузка справочника регионов/населённых пунктов из БД и построение индексов.
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT area_id, area_name, parent_id FROM areas')
+                    rows = cur.fetchall()
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Загрузка справочника регионов ({self.__class__.__name__}): {error}')
+            exit(1)
+        self.build(rows)
+        logger.info(f'Справочник регионов загружен в память: {len(self.__entries)} записей')
+
+    def build(self, rows: list[tuple[int, str, int | None]]) -> None:
+        """
+        Построение индексов поиска.
+        :param rows: Записи справочника (id, название, id родителя), list[tuple].
+        """
+        self.__areas = {area: (name, parent) for area, name, parent in rows}
+        self.__entries = sorted((self.normalize(name), self.qualifier(name), area) for area, name, _ in rows)
+        self.__names = [name for name, _, _ in self.__entries]
+        self.__depths = {area: self.depth(area) for area in self.__areas}
+        self.__trigrams = {}
+        self.__sizes = []
+        for i, (name, _, _) in enumerate(self.__entries):
+            trigrams = self.trigrams(name)
+            self.__sizes.append(len(trigrams))
+            for trigram in trigrams:
+                self.__trigrams.setdefault(trigram, []).append(i)
+
+    def find(self, query: str, limit: int = AREA_CANDIDATES_MAX) -> list[AreaCandidate]:
+        """
+        Поиск регионов/городов по названию (или его началу).
+        Уточнение в скобках ("Аксай (Дагестан)") отбирает населённые пункты
+        по уточнению в названии или по названию региона.
+        :param query: Название, введённое пользователем, str.
+        :param limit: Максимальное количество результатов, int.
+        :return: Список найденных регионов/городов по убыванию соответствия, list[AreaCandidate].
+        """
+        if not self.__entries:
+            self.load()
+        name, qualifier = self.normalize(query), self.qualifier(query)
+        if not name:
+            return []
+
+        lo = bisect_left(self.__names, name)
+        hi = bisect_left(self.__names, name + '\uffff')
+        if lo < hi:
+            # полное совпадение или совпадение начала названия
+            found = [(1.0 if self.__names[i] == name else len(name) / len(self.__names[i]), i)
+                     for i in range(lo, hi)]
+        else:
+            found = self.similar(name)
+        if qualifier:
+            qualified = [(score, i) for score, i in found if self.qualified(i, qualifier)]
+            found = qualified or found
+
+        # при равном соответствии регионы выше населённых пунктов
+        candidates = heapq.nsmallest(limit, ((-score, self.__depths[area], self.__areas[area][0], area)
+                                             for score, area in ((score, self.__entries[i][2]) for score, i in found)))
+        return [AreaCandidate(area, area_name, self.parent_name(area), -score)
+                for score, _, area_name, area in candidates]
+
+    def similar(self, name: str) -> list[tuple[float, int]]:
+        """
+        Нечёткий поиск: названия, сходство которых с запросом (доля общих триграмм)
+        не меньше AREA_SIMILARITY.
+        :param name: Нормализованное название, str.
+        :return: Список пар (сходство, индекс записи), list[tuple[float, int]].
+        """
+        query = self.trigrams(name)
+        shared = Counter(i for trigram in query for i in self.__trigrams.get(trigram, ()))
+        found = []
+        for i, count in shared.items():
+            score = count / (len(query) + self.__sizes[i] - count)
+            if score >= AREA_SIMILARITY:
+                found.append((score, i))
+        return found
+
+    def qualified(self, index: int, qualifier: str) -> bool:
+        """
+        Соответствие записи уточнению: по уточнению в названии или по названию региона.
+        :param index: Индекс записи, int.
+        :param qualifier: Нормализованное уточнение, str.
+        :return: True, если запись соответствует уточнению, bool.
+        """
+        _, own, area = self.__entries[index]
+        parent = self.parent_name(area)
+        return own.startswith(qualifier) or (parent is not None and self.normalize(parent).startswith(qualifier))
+
+    def name(self, area: int) -> str:
+        """
+        Название региона/города по id.
+        :param area: id региона/города, int.
+        :return: Название, str.
+        """
+        if not self.__areas:
+            self.load()
+        return self.__areas[area][0] if area in self.__areas else str(area)
+
+    def parent_name(self, area: int) -> str | None:
+        """
+        Название региона, в который входит населённый пункт (кроме России).
+        :param area: id региона/города, int.
+        :return: Название или None, str | None.
+        """
+        parent = self.__areas[area][1]
+        if parent is None or parent == ID_RUSSIA_HH or parent not in self.__areas:
+            return None
+        return self.__areas[parent][0]
+
+    def depth(self, area: int) -> int:
+        """
+        Уровень вложенности региона/города.
+        :param area: id региона/города, int.
+        :return: Уровень вложенности, int.
+        """
+        depth = 0
+        parent = self.__areas[area][1]
+        while parent is not None and parent in self.__areas and depth < len(self.__areas):
+            depth += 1
+            parent = self.__areas[parent][1]
+        return depth
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """
+        Нормализация названия: нижний регистр, "ё" -> "е", без уточнения в скобках,
+        слова разделены одним пробелом.
+        :param name: Название, str.
+        :return: Нормализованное название, str.
+        """
+        name = _PARENS.sub(' ', name.lower().replace('ё', 'е'))
+        return _SEPARATORS.sub(' ', name).strip()
+
+    @classmethod
+    def qualifier(cls, name: str) -> str:
+        """
+        Нормализованное уточнение в скобках.
+        :param name: Название, str.
+        :return: Уточнение или пустая строка, str.
+        """
+        match = _PARENS.search(name)
+        return cls.normalize(match.group(1)) if match else ''
+
+    @staticmethod
+    def trigrams(name: str) -> set[str]:
+        """
+        Триграммы названия (каждое слово дополняется пробелами, как в pg_trgm).
+        :param name: Нормализованное название, str.
+        :return: Множество триграмм, set[str].
+        """
+        result = set()
+        for word in name.split():
+            word = f'  {word} '
+            result.update(word[i:i + 3] for i in range(len(word) - 2))
+        return result
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __str__(self) -> str:
+        return f'Поиск регионов/городов по названию (БД {self.__db_name})'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(БД {self.__db_name}, записей: {len(self.__entries)}, "
+                f"host: {self.__params['host']}, port: {self.__params['port']})")
+
+
+_resolvers: dict[str, AreaResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def area_resolver(db_name: str = DB_NAME, params: dict | None = None) -> AreaResolver:
+    """
+    Поиск регионов/городов, общий для всех модулей программы (справочник загружается при первом поиске).
+    :param db_name: Имя БД, str.
+    :param params: Параметры подключения к БД, dict.
+    :return: Экземпляр AreaResolver.
+    """
+    with _resolvers_lock:
+        if db_name not in _resolvers:
+            _resolvers[db_name] = AreaResolver(db_name, params if params is not None else config())
+        return _resolvers[db_name]
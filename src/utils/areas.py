@@ -1,8 +1,13 @@
+import hashlib
 import json
 
 import psycopg2
-import requests
 from src.conf.constants import ID_RUSSIA_HH
+from src.utils.bulkloader import BulkLoader
+from src.utils.dbpool import db_pool
+from src.utils.httpclient import http_client
+from src.utils.jsondecode import loads
+from src.utils.metrics import metrics
 from loguru import logger
 
 
@@ -26,7 +31,9 @@ class AreasHH:
         """
         try:
             # Посылаем запрос к API, преобразуем его в словарь, получая список.
-            data_areas = json.loads(requests.get(url=self.__url).text)['areas']
+            data = http_client().fetch(self.__url)
+            with metrics().timer('hh_json_decode_seconds', source='areas'):
+                data_areas = loads(data)['areas']
             logger.info(f'Данные о регионах/населённых пунктах с {self.__url} получены успешно')
             # Преобразование данных и заполнение таблицы areas
             self.db_insert_tables_areas(data_areas)
@@ -36,40 +43,100 @@ class AreasHH:
     def db_insert_tables_areas(self, data_areas: list) -> None:
         """
         Заполнение таблицы areas данными о регионах/городах.
+        Если справочник не изменился с последней загрузки (совпадает отпечаток), таблица не обновляется.
         :param data_areas: Список данных с регионами/городами.
         """
         # формируем список кортежей данных о регионах и городах федерального значения
-        areas = [(113, 'Россия')]
+        areas = [(113, 'Россия', None)]
         for dict_region in data_areas:
             if int(dict_region['parent_id']) == self.__id:
-                areas.append((int(dict_region['id']), dict_region['name'],))
+                areas.append((int(dict_region['id']), dict_region['name'], self.__id))
                 if len(dict_region['areas']) != 0:
                     for dict_city in dict_region['areas']:
-                        areas.append((int(dict_city['id']), dict_city['name'],))
+                        areas.append((int(dict_city['id']), dict_city['name'], int(dict_region['id'])))
 
-        # заполняем таблицу БД areas
-        self.insert_table('areas', 'area_id, area_name', areas)
+        fingerprint = self.fingerprint(areas)
+        if fingerprint == self.select_fingerprint():
+            logger.info('Справочник регионов/городов не изменился, обновление таблицы areas не требуется')
+            return
 
-    def insert_table(self, table: str, columns: str, list_table: list[tuple]) -> None:
+        # обновляем таблицу БД areas
+        self.db_update_tables_areas(areas, fingerprint)
+
+    @staticmethod
+    def fingerprint(areas: list[tuple]) -> str:
+        """
+        Отпечаток справочника регионов/городов (SHA-256).
+        :param areas: Список кортежей (area_id, area_name, parent_id), list[tuple].
+        :return: Хэш справочника, str.
+        """
+        return hashlib.sha256(json.dumps(sorted(areas), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def select_fingerprint(self) -> str | None:
+        """
+        Получение отпечатка справочника регионов/городов, загруженного в БД.
+        :return: Хэш справочника или None, если справочник не загружался, str | None.
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT fingerprint_hash FROM fingerprints WHERE fingerprint_name = 'areas'")
+                    row = cur.fetchone()
+            return row[0] if row else None
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Получение отпечатка справочника регионов ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def db_update_tables_areas(self, areas: list[tuple], fingerprint: str) -> None:
         """
-        Заполнение таблицы БД данными.
-        :param table: Имя заполняемой таблицы, str.
-        :param columns: Имена полей, str.
-        :param list_table: Список картежей с данными для заполнения таблицы, list[tuple].
+        Обновление таблицы areas по разнице с загруженным справочником:
+        добавление новых и переименованных записей (upsert) и удаление исчезнувших,
+        на которые не ссылаются работодатели и вакансии. Отпечаток сохраняется в той же транзакции.
+        :param areas: Список кортежей (area_id, area_name, parent_id), list[tuple].
+        :param fingerprint: Хэш справочника, str.
         """
-        conn = psycopg2.connect(dbname=self.__db_name, **self.__params)
         try:
-            with conn:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
                 with conn.cursor() as cur:
-                    database_request = (f"INSERT INTO  {table}({columns})"
-                                        f"VALUES ({', '.join(['%s'] * len(list_table[0]))})")
-                    cur.executemany(database_request, list_table)
-            logger.info(f'Таблица {table} БД {self.__db_name} заполнена данными успешно')
+                    cur.execute("SELECT area_id, area_name, parent_id FROM areas")
+                    areas_db = {row[0]: row for row in cur.fetchall()}
+                    changed = [area for area in areas if areas_db.get(area[0]) != area]
+                    removed = list(areas_db.keys() - {area[0] for area in areas})
+                    deleted, kept = 0, []
+
+                    if changed and not areas_db:
+                        # первичное заполнение справочника
+                        BulkLoader.copy_rows(cur, 'areas', 'area_id, area_name, parent_id', changed)
+                    elif changed:
+                        BulkLoader.values_rows(cur, 'areas', 'area_id, area_name, parent_id', changed,
+                                               conflict='ON CONFLICT (area_id) DO UPDATE '
+                                                        'SET area_name = EXCLUDED.area_name, '
+                                                        'parent_id = EXCLUDED.parent_id')
+                    if removed:
+                        cur.execute("DELETE FROM areas WHERE area_id = ANY(%s) "
+                                    "AND NOT EXISTS (SELECT 1 FROM employers WHERE employers.area_id = areas.area_id) "
+                                    "AND NOT EXISTS (SELECT 1 FROM vacancies WHERE vacancies.area_id = areas.area_id) "
+                                    "AND NOT EXISTS (SELECT 1 FROM area_freshness "
+                                    "WHERE area_freshness.area_id = areas.area_id) "
+                                    "RETURNING area_id",
+                                    (removed,))
+                        deleted = cur.rowcount
+                        # регионы/города, на которые ссылаются вакансии, работодатели или загрузки, сохраняются
+                        kept = sorted(set(removed) - {row[0] for row in cur.fetchall()})
+                    cur.execute("INSERT INTO fingerprints(fingerprint_name, fingerprint_hash, fingerprint_datetime) "
+                                "VALUES ('areas', %s, now()) "
+                                "ON CONFLICT (fingerprint_name) DO UPDATE "
+                                "SET fingerprint_hash = EXCLUDED.fingerprint_hash, "
+                                "fingerprint_datetime = EXCLUDED.fingerprint_datetime",
+                                (fingerprint,))
+            logger.info(f'Таблица areas БД {self.__db_name} обновлена: добавлено/изменено {len(changed)}, '
+                        f'удалено {deleted}')
+            if kept:
+                logger.info(f'Таблица areas БД {self.__db_name}: сохранено {len(kept)} отсутствующих в справочнике '
+                            f'hh.ru регионов/городов, на которые есть ссылки: {kept}')
         except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f'Заполнение таблицы БД данными ({self.__class__.__name__}): {error}')
+            logger.error(f'Обновление таблицы areas ({self.__class__.__name__}): {error}')
             exit(1)
-        finally:
-            conn.close()
 
     def __str__(self) -> str:
         return (f'Заполнение справочника (таблицы БД) '
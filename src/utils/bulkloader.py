@@ -0,0 +1,188 @@
+import io
+import time
+from collections.abc import Sequence
+from datetime import date
+from typing import Iterable
+
+import psycopg2
+from psycopg2.extras import execute_values
+from loguru import logger
+
+from src.conf.constants import BULK_PAGE_SIZE
+from src.utils.dbpool import db_pool
+from src.utils.metrics import metrics
+
+
+class CopyStream(io.TextIOBase):
+    """
+    Файлоподобный объект, формирующий данные для COPY ... FROM STDIN (текстовый формат)
+    из итератора строк по мере чтения, без накопления всех данных в памяти.
+    """
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        self.__lines = (self.copy_line(row) for row in rows)
+        self.__buffer = ''
+        self.rows = 0  # количество переданных строк
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        """
+        Чтение очередной порции данных.
+        :param size: Размер порции (символов), -1 - все данные, int.
+        :return: Порция данных, str.
+        """
+        chunks = [self.__buffer]
+        length = len(self.__buffer)
+        while size < 0 or length < size:
+            line = next(self.__lines, None)
+            if line is None:
+                break
+            self.rows += 1
+            chunks.append(line)
+            length += len(line)
+        data = ''.join(chunks)
+        if size < 0:
+            self.__buffer = ''
+            return data
+        self.__buffer = data[size:]
+        return data[:size]
+
+    @classmethod
+    def copy_line(cls, row: tuple) -> str:
+        """
+        Строка данных в текстовом формате COPY.
+        :param row: Кортеж значений, tuple.
+        :return: Строка, str.
+        """
+        return '\t'.join(cls.copy_value(value) for value in row) + '\n'
+
+    @staticmethod
+    def copy_value(value) -> str:
+        """
+        Значение в текстовом формате COPY (NULL - \\N, спецсимволы экранируются).
+        :param value: Значение поля.
+        :return: Строка, str.
+        """
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, date):
+            return value.isoformat()
+        return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class BulkLoader:
+    """
+    Массовая загрузка данных в таблицы БД: COPY ... FROM STDIN
+    с переходом на INSERT ... VALUES страницами (execute_values) при ошибке COPY.
+    """
+
+    def __init__(self, db_name: str, params: dict, page_size: int = BULK_PAGE_SIZE) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__page_size = page_size
+
+    def load(self, table: str, columns: str, rows: Iterable[tuple]) -> int:
+        """
+        Загрузка строк в таблицу БД в отдельной транзакции.
+        Переход на execute_values возможен, только если строки переданы последовательностью
+        (итератор после неудачного COPY повторно не читается).
+        :param table: Имя заполняемой таблицы, str.
+        :param columns: Имена полей, str.
+        :param rows: Строки (кортежи) для загрузки, Iterable[tuple].
+        :return: Количество загруженных строк, int.
+        """
+        start = time.perf_counter()
+        with db_pool(self.__db_name, self.__params).connection() as conn:
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        count = self.copy_rows(cur, table, columns, rows)
+            except psycopg2.DatabaseError as error:
+                if not isinstance(rows, Sequence):
+                    raise
+                logger.warning(f'COPY в таблицу {table} не выполнен ({error}), загрузка через INSERT ... VALUES')
+                with conn:
+                    with conn.cursor() as cur:
+                        count = self.values_rows(cur, table, columns, rows, self.__page_size)
+        self.log_rate(table, count, time.perf_counter() - start)
+        return count
+
+    def upsert(self, table: str, columns: str, rows: Iterable[tuple], key: str) -> int:
+        """
+        Загрузка строк с обновлением существующих записей по уникальному ключу:
+        COPY во временную таблицу, затем INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+        :param table: Имя заполняемой таблицы, str.
+        :param columns: Имена полей, str.
+        :param rows: Строки (кортежи) для загрузки, Iterable[tuple].
+        :param key: Поля уникального ключа (через запятую), str.
+        :return: Количество загруженных строк, int.
+        """
+        start = time.perf_counter()
+        names = [column.strip() for column in columns.split(',')]
+        keys = {column.strip() for column in key.split(',')}
+        updates = ', '.join(f'{name} = EXCLUDED.{name}' for name in names if name not in keys)
+        with db_pool(self.__db_name, self.__params).transaction() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f'CREATE TEMP TABLE tmp_{table} ON COMMIT DROP AS '
+                            f'SELECT {columns} FROM {table} WITH NO DATA')
+                count = self.copy_rows(cur, f'tmp_{table}', columns, rows)
+                cur.execute(f'INSERT INTO {table}({columns}) SELECT {columns} FROM tmp_{table} '
+                            f'ON CONFLICT ({key}) DO UPDATE SET {updates}')
+        self.log_rate(table, count, time.perf_counter() - start)
+        return count
+
+    @staticmethod
+    def copy_rows(cur, table: str, columns: str, rows: Iterable[tuple]) -> int:
+        """
+        Загрузка строк командой COPY ... FROM STDIN (один запрос на таблицу).
+        :param cur: Курсор БД.
+        :param table: Имя заполняемой таблицы, str.
+        :param columns: Имена полей, str.
+        :param rows: Строки (кортежи) для загрузки, Iterable[tuple].
+        :return: Количество загруженных строк, int.
+        """
+        stream = CopyStream(rows)
+        cur.copy_expert(f'COPY {table}({columns}) FROM STDIN', stream)
+        return stream.rows
+
+    @staticmethod
+    def values_rows(cur, table: str, columns: str, rows: Iterable[tuple], page_size: int = BULK_PAGE_SIZE,
+                    conflict: str = '') -> int:
+        """
+        Загрузка строк командой INSERT ... VALUES страницами по page_size строк.
+        :param cur: Курсор БД.
+        :param table: Имя заполняемой таблицы, str.
+        :param columns: Имена полей, str.
+        :param rows: Строки (кортежи) для загрузки, Iterable[tuple].
+        :param page_size: Количество строк в одном запросе, int.
+        :param conflict: Предложение ON CONFLICT, str.
+        :return: Количество загруженных строк, int.
+        """
+        rows = rows if isinstance(rows, Sequence) else list(rows)
+        execute_values(cur, f'INSERT INTO {table}({columns}) VALUES %s {conflict}', rows, page_size=page_size)
+        return len(rows)
+
+    @staticmethod
+    def log_rate(table: str, count: int, seconds: float) -> None:
+        """
+        Запись скорости загрузки в лог и метрики.
+        :param table: Имя таблицы, str.
+        :param count: Количество строк, int.
+        :param seconds: Время загрузки, сек., float.
+        """
+        metrics().observe('hh_db_load_seconds', seconds, table=table)
+        metrics().inc('hh_db_rows_total', count, table=table)
+        rate = count / seconds if seconds > 0 else 0
+        logger.info(f'Таблица {table}: загружено строк {count} за {seconds:.3f} с ({rate:.0f} строк/с)')
+
+    def __str__(self) -> str:
+        return f'Массовая загрузка данных в БД {self.__db_name} (COPY)'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(БД {self.__db_name}, page_size: {self.__page_size}, "
+                f"host: {self.__params['host']}, port: {self.__params['port']})")
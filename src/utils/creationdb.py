@@ -1,6 +1,10 @@
+import os
+import re
+
 import psycopg2
 
-from src.conf.constants import DB_NAME
+from src.conf.constants import DB_NAME, PATH_MIGRATIONS, MIGRATIONS_LOCK_ID
+from src.utils.dbpool import db_pool
 from loguru import logger
 
 
@@ -50,17 +54,60 @@ class CreationDB:
         Считывание и запуск sql скрипта из файла .sql
         """
         try:
-            conn = psycopg2.connect(dbname=self.__db_name, **self.__params)
-            try:
-                with conn:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(self.sql_read(path))
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Считывание и запуск sql скрипта из файла .sql ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def migrate(self, path_migrations: str = PATH_MIGRATIONS) -> None:
+        """
+        Применение версионных миграций схемы БД (файлы NNNN_описание.sql).
+        Применённые версии хранятся в таблице schema_version, каждая миграция
+        выполняется в отдельной транзакции вместе с записью о её применении.
+        """
+        try:
+            pool = db_pool(self.__db_name, self.__params)
+            with pool.transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute('CREATE TABLE IF NOT EXISTS schema_version '
+                                '(version integer NOT NULL, migration_name varchar(100) NOT NULL, '
+                                'applied_datetime timestamp NOT NULL DEFAULT now(), '
+                                'CONSTRAINT pk_schema_version_version PRIMARY KEY (version))')
+            applied = 0
+            for version, name, path in self.migrations(path_migrations):
+                with pool.transaction() as conn:
                     with conn.cursor() as cur:
+                        # блокировка до конца транзакции: миграцию применяет только один процесс
+                        cur.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATIONS_LOCK_ID,))
+                        cur.execute('SELECT 1 FROM schema_version WHERE version = %s', (version,))
+                        if cur.fetchone() is not None:
+                            continue
                         cur.execute(self.sql_read(path))
-            finally:
-                conn.close()
+                        cur.execute('INSERT INTO schema_version(version, migration_name) VALUES (%s, %s)',
+                                    (version, name))
+                applied += 1
+                logger.info(f'БД {self.__db_name}: применена миграция {version} ({name})')
+            logger.info(f'Схема БД {self.__db_name} актуальна (применено миграций: {applied})')
         except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f'Считывание и запуск sql скрипта из файла .sql ({self.__class__.__name__}): {error}')
+            logger.error(f'Применение миграций схемы БД ({self.__class__.__name__}): {error}')
             exit(1)
 
+    @staticmethod
+    def migrations(path_migrations: str) -> list[tuple[int, str, str]]:
+        """
+        Список миграций схемы БД в порядке номеров версий.
+        :param path_migrations: Каталог миграций, str.
+        :return: Список (версия, имя миграции, путь к файлу), list[tuple[int, str, str]].
+        """
+        migrations = []
+        for file_name in os.listdir(path_migrations):
+            match = re.fullmatch(r'(\d+)_(\w+)\.sql', file_name)
+            if match:
+                migrations.append((int(match.group(1)), match.group(2), os.path.join(path_migrations, file_name)))
+        return sorted(migrations)
+
     @staticmethod
     def sql_read(path: str) -> str:
         """
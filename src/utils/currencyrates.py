@@ -0,0 +1,123 @@
+import threading
+
+import psycopg2
+from loguru import logger
+
+from src.conf.constants import URL_DICTIONARIES_HH, CURRENCY_RUB
+from src.utils.dbpool import db_pool
+from src.utils.httpclient import http_client
+from src.utils.jsondecode import loads
+
+
+class CurrencyRates:
+    """
+    Курсы валют hh.ru (справочник https://api.hh.ru/dictionaries, поле currency):
+    rate - количество единиц валюты за 1 рубль. Курсы загружаются заново при каждой загрузке
+    вакансий (см. reset; ответ API кэшируется HTTP-клиентом) и используются для пересчёта зарплат
+    в рубли (поля salary_from_rub, salary_to_rub таблицы vacancies).
+    """
+
+    def __init__(self) -> None:
+        self.__rates: dict[str, float] | None = None
+        self.__unknown: set[str] = set()  # валюты без курса (предупреждение - один раз)
+        self.__lock = threading.Lock()
+
+    def rates(self) -> dict[str, float]:
+        """
+        Курсы валют (загружаются при первом обращении).
+        Если справочник не получен, пересчитываются только зарплаты в рублях.
+        :return: Словарь: код валюты - количество единиц валюты за 1 рубль, dict[str, float].
+        """
+        with self.__lock:
+            if self.__rates is None:
+                try:
+                    currencies = loads(http_client().fetch(URL_DICTIONARIES_HH))['currency']
+                    self.__rates = {currency['code']: float(currency['rate'])
+                                    for currency in currencies if currency.get('rate')}
+                    logger.info(f'Курсы валют hh.ru получены: {self.__rates}')
+                except Exception as error:
+                    logger.error(f'Получение курсов валют с {URL_DICTIONARIES_HH} ({self.__class__.__name__}): '
+                                 f'{error}')
+                    self.__rates = {}
+                self.__rates.setdefault(CURRENCY_RUB, 1.0)
+            return self.__rates
+
+    def update(self, rates: dict[str, float]) -> None:
+        """
+        Установка курсов валют (вместо загрузки с hh.ru).
+        :param rates: Словарь: код валюты - количество единиц валюты за 1 рубль, dict[str, float].
+        """
+        with self.__lock:
+            self.__rates = dict(rates)
+            self.__rates.setdefault(CURRENCY_RUB, 1.0)
+
+    def reset(self) -> None:
+        """
+        Сброс курсов валют: при следующем обращении они загружаются с hh.ru заново.
+        Выполняется в начале каждой загрузки вакансий, чтобы зарплаты не пересчитывались
+        по устаревшим курсам в долго работающей программе.
+        """
+        with self.__lock:
+            self.__rates = None
+            self.__unknown.clear()
+
+    def to_rub(self, salary: int | None, currency: str) -> int:
+        """
+        Пересчёт зарплаты в рубли.
+        :param salary: Зарплата в валюте, int.
+        :param currency: Код валюты hh.ru, str.
+        :return: Зарплата в рублях (0 - если зарплаты или курса валюты нет), int.
+        """
+        if not salary:
+            return 0
+        rate = self.rates().get(currency)
+        if not rate:
+            if currency not in self.__unknown:
+                self.__unknown.add(currency)
+                logger.warning(f'Нет курса валюты {currency}: зарплаты в ней не пересчитываются в рубли')
+            return 0
+        return round(salary / rate)
+
+    def backfill(self, db_name: str, params: dict, area_id: int) -> int:
+        """
+        Пересчёт в рубли зарплат вакансий региона/города, загруженных до появления полей
+        salary_from_rub, salary_to_rub (или при отсутствии курса валюты).
+        :param db_name: Имя БД, str.
+        :param params: Параметры подключения к БД, dict.
+        :param area_id: id региона/города, int.
+        :return: Количество обновлённых вакансий, int.
+        """
+        rates = self.rates()
+        try:
+            with db_pool(db_name, params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("UPDATE vacancies v "
+                                "SET salary_from_rub = COALESCE(round(v.salary_from / r.rate), 0), "
+                                "salary_to_rub = COALESCE(round(v.salary_to / r.rate), 0) "
+                                "FROM currency c, unnest(%s::text[], %s::float8[]) AS r(code, rate) "
+                                "WHERE v.area_id = %s "
+                                "AND c.currency_id = v.currency_id AND c.currency_name = r.code "
+                                "AND ((v.salary_from > 0 AND v.salary_from_rub = 0) "
+                                "OR (v.salary_to > 0 AND v.salary_to_rub = 0))",
+                                (list(rates), list(rates.values()), area_id))
+                    count = cur.rowcount
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Пересчёт зарплат в рубли ({self.__class__.__name__}): {error}')
+            exit(1)
+        if count:
+            logger.info(f'Зарплаты пересчитаны в рубли: {count} вакансий')
+        return count
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rates: {self.__rates})"
+
+
+_currency_rates = CurrencyRates()
+
+
+def currency_rates() -> CurrencyRates:
+    """
+    Курсы валют, общие для всех модулей программы.
+    :return: Экземпляр CurrencyRates.
+    """
+    return _currency_rates
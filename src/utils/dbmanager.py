@@ -1,140 +1,472 @@
+import threading
+from collections import OrderedDict
+from typing import IO, Iterator
+
 from loguru import logger
 
 import psycopg2
+from psycopg2.extensions import encodings
+
+from src.conf.constants import QUERY_CACHE_SIZE, QUERY_CACHE_ROWS, BULK_PAGE_SIZE
+from src.utils.dbpool import db_pool
+from src.utils.metrics import metrics
+
+
+class QueryCache:
+    """
+    Кэш результатов запросов к БД (LRU ограниченного размера).
+    Размер ограничен количеством результатов и суммарным количеством строк в них:
+    результат, в котором строк больше допустимого (полный список вакансий крупного региона),
+    не кэшируется. Ключ включает версию данных, поэтому после загрузки новых данных
+    старые результаты не используются и со временем вытесняются.
+    """
+
+    def __init__(self, size: int = QUERY_CACHE_SIZE, max_rows: int = QUERY_CACHE_ROWS) -> None:
+        self.__size = size
+        self.__max_rows = max_rows
+        self.__items: OrderedDict[tuple, tuple[list[dict], int]] = OrderedDict()  # ключ: (результат, строк)
+        self.__rows = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> list[dict] | None:
+        """
+        Получение результата запроса из кэша.
+        :param key: Ключ (версия данных, запрос, параметры), tuple.
+        :return: Результат запроса или None, list[dict] | None.
+        """
+        with self.__lock:
+            if key in self.__items:
+                self.__items.move_to_end(key)
+                self.hits += 1
+                return self.__items[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, result: list[dict]) -> None:
+        """
+        Сохранение результата запроса в кэш с вытеснением давно не использованных.
+        :param key: Ключ (версия данных, запрос, параметры), tuple.
+        :param result: Результат запроса (список строк или один объект - одна строка), list[dict].
+        """
+        rows = len(result) if isinstance(result, list) else 1
+        with self.__lock:
+            if key in self.__items:
+                self.__rows -= self.__items.pop(key)[1]
+            if rows > self.__max_rows:
+                return
+            self.__items[key] = (result, rows)
+            self.__rows += rows
+            while len(self.__items) > self.__size or self.__rows > self.__max_rows:
+                self.__rows -= self.__items.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        """
+        Очистка кэша.
+        """
+        with self.__lock:
+            self.__items.clear()
+            self.__rows = 0
+
+    def log_stats(self) -> None:
+        """
+        Запись счётчиков кэша в лог.
+        """
+        logger.info(f'Кэш запросов к БД: попаданий {self.hits}, промахов {self.misses}, '
+                    f'записей {len(self.__items)} из {self.__size}, строк {self.__rows} из {self.__max_rows}')
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(size: {self.__size}, max_rows: {self.__max_rows}, "
+                f"hits: {self.hits}, misses: {self.misses})")
 
 
 class DBManager:
-    def __init__(self, db_name: str, params: dict) -> None:
+    # Кэш результатов запросов, общий для всех экземпляров
+    cache = QueryCache()
+
+    # Выборка вакансий с данными справочников
+    VACANCIES_FIELDS = ("date_publication, position_employee, employers.employer_name, "
+                        "salary_from, salary_to, salary_from_rub, salary_to_rub, currency.currency_name, "
+                        "schedule.schedule_name, employment.employment_name, "
+                        "experience.experience_name, applicant_requirements, duties, employer_address, url, "
+                        "vacancy_id")
+    VACANCIES_FROM = ("vacancies "
+                      "INNER JOIN employers USING (employer_id) "
+                      "INNER JOIN currency USING (currency_id) "
+                      "INNER JOIN schedule USING (schedule_id) "
+                      "INNER JOIN employment USING (employment_id) "
+                      "INNER JOIN experience USING (experience_id)")
+    # Порядок вакансий (по убыванию, зарплата - в рублях), он же ключ постраничной выборки
+    VACANCIES_ORDER = ('date_publication', 'salary_from_rub', 'vacancy_id')
+    # Релевантность вакансии поисковому запросу: полнотекстовый ранг + близость названия должности
+    SEARCH_RANK = ("round((ts_rank_cd(search_vector, websearch_to_tsquery('russian', %s)) "
+                   "+ word_similarity(%s, position_employee))::numeric, 6)")
+    VACANCIES_COLUMNS = ['date_publication', 'position_employee', 'employer_name',
+                         'salary_from', 'salary_to', 'salary_from_rub', 'salary_to_rub',
+                         'currency_name', 'schedule_name',
+                         'employment_name', 'experience_name', 'applicant_requirements',
+                         'duties', 'employer_address', 'url', 'vacancy_id']
+    VACANCIES_LOG = {'all': 'Данные обо всех вакансиях получены успешно',
+                     'higher': 'Данные о вакансиях с зарплатой выше среднего получены успешно',
+                     'keyword': 'Данные о вакансиях по поисковому запросу получены успешно'}
+
+    def __init__(self, db_name: str, params: dict, area_id: int) -> None:
         self.__db_name = db_name
         self.__params = params
+        self.__area_id = area_id  # регион/город, по которому выбираются данные
+        self.__version: int | None = None  # версия данных (id последней успешной загрузки)
 
-    def get_db(self, database_request: str, columns_list: list, log: str) -> list[dict]:
+    def data_version(self) -> int:
+        """
+        Версия данных БД: id последней успешной загрузки вакансий в журнале загрузок ingest_runs.
+        Переключение региона/города без загрузки (switch) и незавершённые или неудачные загрузки
+        данные не меняют и версию не увеличивают. Запрашивается один раз на экземпляр.
+        :return: Версия данных, int.
+        """
+        if self.__version is None:
+            try:
+                with db_pool(self.__db_name, self.__params).transaction() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT COALESCE(MAX(run_id), 0) FROM ingest_runs "
+                                    "WHERE run_status = 'ok' AND run_kind <> 'switch'")
+                        self.__version = cur.fetchone()[0]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f'Получение версии данных ({self.__class__.__name__}): {error}')
+                exit(1)
+        return self.__version
+
+    def get_db(self, database_request: str, columns_list: list, log: str,
+               query_params: tuple | None = None) -> list[dict]:
         """
         Получение списка словарей по SQL-запросу.
+        Результат берётся из кэша, если запрос с теми же параметрами выполнялся для текущей версии данных.
         :param database_request: SQL-запрос, str.
         :param columns_list: Список ключей словаря (полей таблицы БД), list.
         :param log: Лог выполненного запроса, str.
+        :param query_params: Параметры SQL-запроса, tuple.
         :return: Список словарей по SQL-запросу, list[dict]
         """
-        conn = psycopg2.connect(dbname=self.__db_name, **self.__params)
+        key = (self.__db_name, self.data_version(), database_request, query_params)
+        result = self.cache.get(key)
+        if result is not None:
+            metrics().inc('hh_db_query_cache_total', result='hit')
+            logger.info(f'{log} (из кэша)')
+            return result
+        metrics().inc('hh_db_query_cache_total', result='miss')
         try:
-            with conn:
+            with db_pool(self.__db_name, self.__params).transaction() as conn, \
+                    metrics().timer('hh_db_query_seconds', query=log):
                 with conn.cursor() as cur:
                     # Формируем запрос
-                    cur.execute(database_request)
+                    cur.execute(database_request, query_params)
                     # Формируем список словарей
                     fetch = cur.fetchall()
                     result = []
                     for row in fetch:
                         result.append(dict(zip(columns_list, row)))
+            self.cache.put(key, result)
             logger.info(log)
             return result
         except (Exception, psycopg2.DatabaseError) as error:
             logger.error(
                 f'Получение данных данных по запросу ({self.__class__.__name__}): {error}')
             exit(1)
-        finally:
-            conn.close()
+
+    def get_summary(self) -> dict:
+        """
+        Получает сводную статистику по вакансиям региона/города (одна строка vacancies_summary):
+        количество вакансий, средняя/минимальная/максимальная зарплата (от и до),
+        ТОП-10 работодателей и количество вакансий по справочникам.
+        """
+        database_request = ("SELECT vacancies_count, avg_salary_from, min_salary_from, max_salary_from, "
+                            "avg_salary_to, min_salary_to, max_salary_to, top_employers, "
+                            "currency_counts, schedule_counts, employment_counts, experience_counts "
+                            "FROM vacancies_summary WHERE area_id = %s")
+        columns_list = ['vacancies_count', 'avg_salary_from', 'min_salary_from', 'max_salary_from',
+                        'avg_salary_to', 'min_salary_to', 'max_salary_to', 'top_employers',
+                        'currency_counts', 'schedule_counts', 'employment_counts', 'experience_counts']
+        log = 'Сводные данные о вакансиях получены успешно'
+        summary = self.get_db(database_request, columns_list, log, (self.__area_id,))
+        if summary:
+            return summary[0]
+        # по региону/городу нет вакансий
+        return dict.fromkeys(columns_list, None) | {'vacancies_count': 0, 'top_employers': []}
 
     def get_companies_and_vacancies_count(self) -> list[dict]:
         """
-        Получает список всех компаний и количество вакансий у каждой из них.
+        Получает список всех компаний и количество вакансий у каждой из них (ТОП-10, из сводной статистики).
         """
-        database_request = ("SELECT employers.employer_name, COUNT(*), employer_id  FROM vacancies "
-                            "INNER JOIN employers USING(employer_id) "
-                            "GROUP BY employers.employer_name, employer_id "
-                            "ORDER BY COUNT(*) DESC, employers.employer_name "
-                            "LIMIT 10")
-        columns_list = ['employer_name', 'count', 'employer_id']
-        log = 'Данные о количестве вакансий в компаниях (ТОП-10) получены успешно'
-        return self.get_db(database_request, columns_list, log)
+        return self.get_summary()['top_employers'] or []
 
     def get_all_vacancies(self):
         """
         Получает список всех вакансий с указанием названия компании,
         названия вакансии и зарплаты и ссылки на вакансию.
         """
-        database_request = ("SELECT date_publication, position_employee, employers.employer_name, "
-                            "salary_from, salary_to, currency.currency_name, "
-                            "schedule.schedule_name, employment.employment_name, "
-                            "experience.experience_name, applicant_requirements, duties, employer_address, url "
-                            "FROM vacancies "
-                            "INNER JOIN employers USING (employer_id) "
-                            "INNER JOIN currency USING (currency_id) "
-                            "INNER JOIN schedule USING (schedule_id) "
-                            "INNER JOIN employment USING (employment_id) "
-                            "INNER JOIN experience USING (experience_id) "
-                            "ORDER BY date_publication desc, salary_from desc, employers.employer_name")
-        columns_list = ['date_publication', 'position_employee', 'employer_name',
-                        'salary_from', 'salary_to', 'currency_name', 'schedule_name',
-                        'employment_name', 'experience_name', 'applicant_requirements',
-                        'duties', 'employer_address', 'url']
-        log = 'Данные обо всех вакансиях получены успешно'
-        return self.get_db(database_request, columns_list, log)
+        return self.get_vacancies('all')
 
     def get_avg_salary(self):
         """
-        Получает среднюю зарплату по вакансиям (от и до)
+        Получает среднюю зарплату по вакансиям (от и до) из сводной статистики.
         """
-        database_request = ("SELECT avg(salary_from) as avg_salary FROM vacancies "
-                            "WHERE salary_from > 0 "
-                            "UNION ALL "
-                            "SELECT avg(salary_to) as avg_salary FROM vacancies "
-                            "WHERE salary_to > 0")
-        columns_list = ['avg_salary']
-        log = 'Данные о средней заработной плате (от и до)'
-        return self.get_db(database_request, columns_list, log)
+        summary = self.get_summary()
+        return [{'avg_salary': summary['avg_salary_from'] or 0},
+                {'avg_salary': summary['avg_salary_to'] or 0}]
 
     def get_vacancies_with_higher_salary(self):
         """
         Получает список всех вакансий, у которых зарплата выше средней по всем вакансиям.
         """
-        avg_salary_from = round(self.get_avg_salary()[0]['avg_salary'], 2)
-        avg_salary_to = round(self.get_avg_salary()[1]['avg_salary'], 2)
-        database_request = (f"SELECT date_publication, position_employee, employers.employer_name, "
-                            f"salary_from, salary_to, currency.currency_name, "
-                            f"schedule.schedule_name, employment.employment_name, "
-                            f"experience.experience_name, applicant_requirements, duties, employer_address, url "
-                            f"FROM vacancies "
-                            f"INNER JOIN employers USING (employer_id) "
-                            f"INNER JOIN currency USING (currency_id) "
-                            f"INNER JOIN schedule USING (schedule_id) "
-                            f"INNER JOIN employment USING (employment_id) "
-                            f"INNER JOIN experience USING (experience_id) "
-                            f"WHERE salary_from > {avg_salary_from} OR salary_to > {avg_salary_to} "
-                            f"ORDER BY date_publication desc, salary_from desc, employers.employer_name")
-        columns_list = ['date_publication', 'position_employee', 'employer_name',
-                        'salary_from', 'salary_to', 'currency_name', 'schedule_name',
-                        'employment_name', 'experience_name', 'applicant_requirements',
-                        'duties', 'employer_address', 'url']
-        log = 'Данные о вакансиях с зарплатой выше среднего получены успешно'
-        return self.get_db(database_request, columns_list, log)
+        return self.get_vacancies('higher')
 
     def get_vacancies_with_keyword(self, word: str):
         """
-        Получает список всех вакансий, в названии которых содержатся переданные в метод слова, например python.
-        """
-        database_request = (f"SELECT date_publication, position_employee, employers.employer_name, "
-                            f"salary_from, salary_to, currency.currency_name, "
-                            f"schedule.schedule_name, employment.employment_name, "
-                            f"experience.experience_name, applicant_requirements, duties, employer_address, url "
-                            f"FROM vacancies "
-                            f"INNER JOIN employers USING (employer_id) "
-                            f"INNER JOIN currency USING (currency_id) "
-                            f"INNER JOIN schedule USING (schedule_id) "
-                            f"INNER JOIN employment USING (employment_id) "
-                            f"INNER JOIN experience USING (experience_id) "
-                            f"WHERE position_employee ~~* '%{word}%' "
-                            f"ORDER BY salary_from desc, date_publication desc")
-        columns_list = ['date_publication', 'position_employee', 'employer_name',
-                        'salary_from', 'salary_to', 'currency_name', 'schedule_name',
-                        'employment_name', 'experience_name', 'applicant_requirements',
-                        'duties', 'employer_address', 'url']
-        log = 'Данные о вакансиях с зарплатой по ключевому слову получены успешно'
-        return self.get_db(database_request, columns_list, log)
+        Получает список всех вакансий, в названии, требованиях или обязанностях которых содержатся
+        переданные в метод слова, например python (по убыванию релевантности).
+        """
+        return self.get_vacancies('keyword', word)
+
+    def vacancies_filter(self, kind: str, word: str | None = None) -> tuple[str, tuple]:
+        """
+        Условие отбора вакансий региона/города для выборки заданного вида.
+        :param kind: Вид выборки: 'all' - все вакансии, 'higher' - с зарплатой выше средней,
+        'keyword' - поиск по словам в названии должности, требованиях и обязанностях, str.
+        :param word: Поисковый запрос (для kind='keyword'), str.
+        :return: Условие WHERE и его параметры, tuple[str, tuple].
+        """
+        if kind == 'all':
+            return 'vacancies.area_id = %s', (self.__area_id,)
+        if kind == 'higher':
+            # средняя зарплата (vacancies_summary) и сравнение - в рублях
+            avg_salary = self.get_avg_salary()
+            return ('vacancies.area_id = %s AND (salary_from_rub > %s OR salary_to_rub > %s)',
+                    (self.__area_id, round(avg_salary[0]['avg_salary'], 2), round(avg_salary[1]['avg_salary'], 2)))
+        if kind == 'keyword':
+            # полнотекстовый поиск (все слова запроса, с учётом словоформ), поиск по подстроке
+            # и нечёткий поиск в названии должности (опечатки); все условия используют GIN-индексы
+            return ("vacancies.area_id = %s AND (search_vector @@ websearch_to_tsquery('russian', %s) "
+                    "OR position_employee ~~* %s OR %s <%% position_employee)",
+                    (self.__area_id, word, f'%{word}%', word))
+        raise ValueError(f'Неизвестный вид выборки вакансий: {kind}')
+
+    def order_keys(self, kind: str) -> tuple[str, ...]:
+        """
+        Поля порядка вакансий заданного вида (по убыванию): результаты поиска
+        упорядочены сначала по релевантности.
+        :param kind: Вид выборки вакансий, str.
+        :return: Имена полей, tuple[str, ...].
+        """
+        if kind == 'keyword':
+            return ('rank',) + self.VACANCIES_ORDER
+        return self.VACANCIES_ORDER
+
+    def vacancies_select(self, kind: str, word: str | None = None) -> tuple[str, tuple, list[str]]:
+        """
+        Запрос вакансий заданного вида (см. vacancies_filter) с данными справочников.
+        :return: Запрос, его параметры и список полей результата, tuple[str, tuple, list[str]].
+        """
+        where, query_params = self.vacancies_filter(kind, word)
+        if kind == 'keyword':
+            return (f"SELECT {self.VACANCIES_FIELDS}, {self.SEARCH_RANK} AS rank "
+                    f"FROM {self.VACANCIES_FROM} WHERE {where}",
+                    (word, word) + query_params, self.VACANCIES_COLUMNS + ['rank'])
+        return (f"SELECT {self.VACANCIES_FIELDS} FROM {self.VACANCIES_FROM} WHERE {where}",
+                query_params, self.VACANCIES_COLUMNS)
+
+    def ordered_select(self, kind: str, word: str | None = None) -> tuple[str, tuple, list[str]]:
+        """
+        Запрос вакансий заданного вида (см. vacancies_select), упорядоченных по полям order_keys по убыванию.
+        :return: Запрос, его параметры и список полей результата, tuple[str, tuple, list[str]].
+        """
+        database_request, query_params, columns_list = self.vacancies_select(kind, word)
+        order = ', '.join(f'{key} DESC' for key in self.order_keys(kind))
+        return f"SELECT * FROM ({database_request}) v ORDER BY {order}", query_params, columns_list
+
+    def get_vacancies(self, kind: str, word: str | None = None) -> list[dict]:
+        """
+        Получает полный список вакансий заданного вида (см. vacancies_filter).
+        :return: Список вакансий, list[dict].
+        """
+        database_request, query_params, columns_list = self.ordered_select(kind, word)
+        return self.get_db(database_request, columns_list, self.VACANCIES_LOG[kind], query_params)
+
+    def count_vacancies(self, kind: str, word: str | None = None) -> int:
+        """
+        Количество вакансий заданного вида (см. vacancies_filter).
+        :return: Количество вакансий, int.
+        """
+        where, query_params = self.vacancies_filter(kind, word)
+        database_request = f"SELECT COUNT(*) FROM vacancies WHERE {where}"
+        log = f'{self.VACANCIES_LOG[kind]} (количество)'
+        return self.get_db(database_request, ['count'], log, query_params)[0]['count']
+
+    def get_vacancies_page(self, kind: str, limit: int, after: tuple | None = None,
+                           before: tuple | None = None, word: str | None = None) -> list[dict]:
+        """
+        Страница списка вакансий заданного вида (см. vacancies_filter).
+        Вакансии упорядочены по полям order_keys по убыванию; страница выбирается
+        по ключу граничной вакансии (keyset), а не через OFFSET,
+        поэтому время получения любой страницы не зависит от её номера.
+        :param limit: Количество вакансий на странице, int.
+        :param after: Ключ последней вакансии предыдущей страницы (следующая страница), tuple.
+        :param before: Ключ первой вакансии текущей страницы (предыдущая страница), tuple.
+        :return: Список вакансий страницы, list[dict].
+        """
+        database_request, query_params, columns_list = self.page_select(kind, limit, after, before, word)
+        log = f'{self.VACANCIES_LOG[kind]} (страница)'
+        page = self.get_db(database_request, columns_list, log, query_params)
+        # предыдущая страница выбирается в обратном порядке
+        return page if before is None or after is not None else page[::-1]
+
+    def page_select(self, kind: str, limit: int, after: tuple | None = None,
+                    before: tuple | None = None, word: str | None = None) -> tuple[str, tuple, list[str]]:
+        """
+        Запрос страницы списка вакансий (см. get_vacancies_page).
+        :return: Запрос, его параметры и список полей результата, tuple[str, tuple, list[str]].
+        """
+        database_request, query_params, columns_list = self.vacancies_select(kind, word)
+        keys = self.order_keys(kind)
+        row_key = f"({', '.join(keys)})"
+        placeholders = f"({', '.join(['%s'] * len(keys))})"
+        where, direction = '', 'DESC'
+        if after is not None:
+            where = f' WHERE {row_key} < {placeholders}'
+            query_params += tuple(after)
+        elif before is not None:
+            # предыдущая страница: выборка в обратном порядке от первой вакансии текущей страницы
+            where = f' WHERE {row_key} > {placeholders}'
+            query_params += tuple(before)
+            direction = 'ASC'
+        order = ', '.join(f'{key} {direction}' for key in keys)
+        database_request = f"SELECT * FROM ({database_request}) v{where} ORDER BY {order} LIMIT %s"
+        return database_request, query_params + (limit,), columns_list
+
+    def page_key(self, kind: str, vacancy: dict) -> tuple:
+        """
+        Ключ вакансии для постраничной выборки (keyset).
+        :param kind: Вид выборки вакансий, str.
+        :param vacancy: Вакансия, dict.
+        :return: Значения полей order_keys, tuple.
+        """
+        return tuple(vacancy[key] for key in self.order_keys(kind))
+
+    def iter_vacancies(self, kind: str, word: str | None = None,
+                       itersize: int = BULK_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Потоковое получение вакансий заданного вида (см. vacancies_filter) через именованный
+        (серверный) курсор: в памяти одновременно находится не более itersize строк.
+        Результат не кэшируется.
+        :param itersize: Количество строк, получаемых с сервера за один раз, int.
+        :return: Итератор вакансий, Iterator[dict].
+        """
+        columns_list = self.ordered_select(kind, word)[2]
+        count = 0
+        for batch in self.iter_vacancy_batches(kind, word, itersize):
+            count += len(batch)
+            yield from (dict(zip(columns_list, row)) for row in batch)
+        logger.info(f'{self.VACANCIES_LOG[kind]} (потоково): {count}')
+
+    def iter_vacancy_batches(self, kind: str, word: str | None = None,
+                             size: int = BULK_PAGE_SIZE) -> Iterator[list[tuple]]:
+        """
+        Потоковое получение вакансий заданного вида пакетами строк (кортежей) через именованный
+        (серверный) курсор: в памяти одновременно находится не более size строк.
+        Поля строк - в порядке ordered_select. Результат не кэшируется.
+        :param size: Количество строк в пакете, int.
+        :return: Итератор пакетов строк, Iterator[list[tuple]].
+        """
+        database_request, query_params, _ = self.ordered_select(kind, word)
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor(name=f'vacancies_{kind}') as cur:
+                    cur.execute(database_request, query_params)
+                    while batch := cur.fetchmany(size):
+                        yield batch
+        except psycopg2.DatabaseError as error:
+            logger.error(f'Потоковое получение вакансий ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def copy_vacancies(self, kind: str, file: IO, word: str | None = None) -> int:
+        """
+        Выгрузка вакансий заданного вида в файл в формате CSV (с заголовком) командой
+        COPY ... TO STDOUT: строки формируются сервером и записываются в файл по мере получения.
+        :param file: Файл, открытый для записи, IO.
+        :return: Количество выгруженных вакансий, int.
+        """
+        database_request, query_params, _ = self.ordered_select(kind, word)
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    query = cur.mogrify(database_request, query_params).decode(encodings[conn.encoding])
+                    cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", file)
+                    return cur.rowcount
+        except psycopg2.DatabaseError as error:
+            logger.error(f'Выгрузка вакансий ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def explain(self, database_request: str, query_params: tuple | None = None, seqscan: bool = True) -> list[str]:
+        """
+        План выполнения запроса (EXPLAIN) - для проверки использования индексов.
+        :param database_request: SQL-запрос, str.
+        :param query_params: Параметры SQL-запроса, tuple.
+        :param seqscan: False - полный просмотр таблиц запрещён (enable_seqscan = off): план показывает,
+        может ли запрос использовать индекс, независимо от количества строк в таблице, bool.
+        :return: Строки плана выполнения, list[str].
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    if not seqscan:
+                        cur.execute('SET LOCAL enable_seqscan = off')
+                    cur.execute(f'EXPLAIN {database_request}', query_params)
+                    plan = [row[0] for row in cur.fetchall()]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Получение плана выполнения запроса ({self.__class__.__name__}): {error}')
+            exit(1)
+        return plan
+
+    def explain_queries(self, word: str = 'python', seqscan: bool = True) -> dict[str, list[str]]:
+        """
+        Планы выполнения запросов списков вакансий (количество и первая страница каждого вида)
+        и сводной статистики региона/города.
+        :param word: Поисковый запрос для kind='keyword', str.
+        :param seqscan: False - полный просмотр таблиц запрещён (см. explain), bool.
+        :return: Словарь: имя запроса - строки плана выполнения, dict[str, list[str]].
+        """
+        plans = {'summary': self.explain('SELECT * FROM vacancies_summary WHERE area_id = %s',
+                                         (self.__area_id,), seqscan)}
+        for kind in self.VACANCIES_LOG:
+            where, query_params = self.vacancies_filter(kind, word)
+            plans[f'count_{kind}'] = self.explain(f"SELECT COUNT(*) FROM vacancies WHERE {where}", query_params,
+                                                  seqscan)
+            database_request, query_params, _ = self.page_select(kind, 10, word=word)
+            plans[f'page_{kind}'] = self.explain(database_request, query_params, seqscan)
+        return plans
+
+    def index_names(self, index: str) -> set[str]:
+        """
+        Имена индекса и индексов секций, созданных по нему (индекс секционированной таблицы
+        создаётся в каждой секции под своим именем) - для сравнения с планом выполнения (queryplan.plan_indexes).
+        :param index: Имя индекса, str.
+        :return: Имена индексов (только index, если такого индекса нет), set[str].
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT relid::regclass::text FROM pg_partition_tree(to_regclass(%s))', (index,))
+                    names = {row[0] for row in cur.fetchall()}
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Получение индексов секций ({self.__class__.__name__}): {error}')
+            exit(1)
+        return names | {index}
 
     def __str__(self) -> str:
         return 'Получение данных из БД vacancies'
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}. БД {self.__db_name}, host: {self.__params[0]}, port: {self.__params[3]}"
+        return (f"{self.__class__.__name__}. БД {self.__db_name}, регион: {self.__area_id}, "
+                f"host: {self.__params[0]}, port: {self.__params[3]}")
@@ -0,0 +1,130 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from loguru import logger
+
+from src.conf.config import config
+from src.conf.constants import DB_NAME, DB_POOL_MIN, DB_POOL_MAX
+
+
+class DBPool:
+    """
+    Пул соединений с БД, общий для всех модулей программы.
+    Если все соединения заняты, поток ожидает освобождения соединения.
+    Ведётся учёт выдачи соединений и времени ожидания.
+    """
+
+    def __init__(self, db_name: str, params: dict, minconn: int = DB_POOL_MIN, maxconn: int = DB_POOL_MAX) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__maxconn = maxconn
+        self.__pool = ThreadedConnectionPool(minconn, maxconn, dbname=db_name, **params)
+        self.__slots = threading.BoundedSemaphore(maxconn)
+        self.__lock = threading.Lock()
+        self.__stats = {'checkouts': 0, 'in_use': 0, 'in_use_max': 0, 'wait': 0.0, 'wait_max': 0.0}
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """
+        Получение соединения из пула (возвращается в пул при выходе из блока with).
+        :return: Соединение с БД.
+        """
+        start = time.perf_counter()
+        self.__slots.acquire()
+        wait = time.perf_counter() - start
+        try:
+            conn = self.__pool.getconn()
+        except BaseException:
+            self.__slots.release()
+            raise
+        with self.__lock:
+            self.__stats['checkouts'] += 1
+            self.__stats['in_use'] += 1
+            self.__stats['in_use_max'] = max(self.__stats['in_use_max'], self.__stats['in_use'])
+            self.__stats['wait'] += wait
+            self.__stats['wait_max'] = max(self.__stats['wait_max'], wait)
+        try:
+            yield conn
+        finally:
+            with self.__lock:
+                self.__stats['in_use'] -= 1
+            self.__pool.putconn(conn, close=bool(conn.closed))
+            self.__slots.release()
+
+    @contextmanager
+    def transaction(self) -> Iterator:
+        """
+        Получение соединения из пула в рамках транзакции:
+        фиксация при успешном выполнении блока with, откат - при исключении.
+        :return: Соединение с БД.
+        """
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def stats(self) -> dict:
+        """
+        Счётчики пула: количество выдач соединений, занятые соединения (текущее и максимальное),
+        суммарное и максимальное время ожидания соединения.
+        :return: Словарь счётчиков, dict.
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    def log_stats(self) -> None:
+        """
+        Запись счётчиков пула в лог.
+        """
+        stats = self.stats()
+        logger.info(f'Пул соединений БД {self.__db_name}: выдано соединений {stats["checkouts"]}, '
+                    f'одновременно занято до {stats["in_use_max"]} из {self.__maxconn}, '
+                    f'ожидание {stats["wait"]:.3f} с (макс. {stats["wait_max"]:.3f} с)')
+
+    def close(self) -> None:
+        """
+        Закрытие всех соединений пула.
+        """
+        self.__pool.closeall()
+
+    def __str__(self) -> str:
+        return f'Пул соединений с БД {self.__db_name}'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(БД {self.__db_name}, maxconn: {self.__maxconn}, "
+                f"host: {self.__params['host']}, port: {self.__params['port']})")
+
+
+_pools: dict[str, DBPool] = {}
+_pools_lock = threading.Lock()
+
+
+def db_pool(db_name: str = DB_NAME, params: dict | None = None) -> DBPool:
+    """
+    Пул соединений с БД, общий для всех модулей программы (создаётся при первом обращении).
+    :param db_name: Имя БД, str.
+    :param params: Параметры подключения к БД (по-умолчанию - из database.ini), dict.
+    :return: Экземпляр DBPool.
+    """
+    with _pools_lock:
+        if db_name not in _pools:
+            try:
+                _pools[db_name] = DBPool(db_name, params if params is not None else config())
+            except psycopg2.DatabaseError as error:
+                logger.error(f'Создание пула соединений с БД {db_name}: {error}')
+                raise
+        return _pools[db_name]
+
+
+def close_pools() -> None:
+    """
+    Запись счётчиков и закрытие всех пулов соединений.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.log_stats()
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from datetime import date
+from decimal import Decimal
+
+from loguru import logger
+
+from src.conf.constants import EXPORT_BATCH_SIZE
+from src.utils.dbmanager import DBManager
+from src.utils.metrics import metrics
+
+try:  # запись файлов Parquet/Arrow (необязательная зависимость)
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class VacancyExporter:
+    """
+    Выгрузка вакансий (с данными справочников) в файлы CSV, JSON Lines, Parquet и Arrow.
+    CSV формируется сервером БД (COPY ... TO STDOUT), остальные форматы - из пакетов строк
+    серверного курсора; в памяти одновременно находится не более batch_size строк,
+    поэтому объём выгрузки не ограничен памятью.
+    """
+
+    FORMATS = {'csv': 'csv', 'jsonl': 'jsonl', 'parquet': 'parquet', 'arrow': 'arrow'}  # формат: расширение файла
+    # Типы полей в файлах Parquet/Arrow (остальные поля - строки)
+    ARROW_TYPES = {'date_publication': 'date32', 'salary_from': 'int32', 'salary_to': 'int32',
+                   'salary_from_rub': 'int32', 'salary_to_rub': 'int32', 'vacancy_id': 'int32', 'rank': 'float64'}
+
+    def __init__(self, db: DBManager, batch_size: int = EXPORT_BATCH_SIZE) -> None:
+        self.__db = db
+        self.__batch_size = batch_size
+
+    def export(self, path: str, kind: str = 'all', word: str | None = None, fmt: str | None = None) -> dict:
+        """
+        Выгрузка вакансий заданного вида (см. DBManager.vacancies_filter) в файл.
+        Файл записывается под временным именем и переименовывается после окончания записи.
+        :param path: Путь к файлу, str.
+        :param kind: Вид выборки вакансий, str.
+        :param word: Ключевое слово (для kind='keyword'), str.
+        :param fmt: Формат файла (по-умолчанию - по расширению файла): csv, jsonl, parquet, arrow, str.
+        :return: Показатели выгрузки: path, format, rows, seconds, rows_per_sec, dict.
+        :raise ValueError: Если формат не поддерживается (или для него не установлен pyarrow).
+        """
+        fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in self.FORMATS:
+            raise ValueError(f'Неизвестный формат выгрузки: {fmt} (допустимые: {", ".join(self.FORMATS)})')
+        if fmt in ('parquet', 'arrow') and pyarrow is None:
+            raise ValueError(f'Для выгрузки в формат {fmt} требуется пакет pyarrow')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        start = time.perf_counter()
+        with metrics().timer('hh_export_seconds', format=fmt):
+            if fmt == 'csv':
+                with open(f'{path}.tmp', 'w', encoding='utf8', newline='') as file:
+                    rows = self.__db.copy_vacancies(kind, file, word)
+            elif fmt == 'jsonl':
+                rows = self.write_jsonl(f'{path}.tmp', kind, word)
+            else:
+                rows = self.write_arrow(f'{path}.tmp', kind, word, fmt)
+            os.replace(f'{path}.tmp', path)
+        seconds = time.perf_counter() - start
+        metrics().inc('hh_export_rows_total', rows, format=fmt)
+        stats = {'path': path, 'format': fmt, 'rows': rows, 'seconds': seconds,
+                 'rows_per_sec': rows / seconds if seconds > 0 else 0}
+        logger.info(f'Выгружено вакансий в файл {path}: {rows} за {seconds:.2f} с '
+                    f'({stats["rows_per_sec"]:.0f} строк/с)')
+        return stats
+
+    def write_jsonl(self, path: str, kind: str, word: str | None = None) -> int:
+        """
+        Запись вакансий в файл JSON Lines (одна вакансия - один объект JSON в строке).
+        :return: Количество записанных вакансий, int.
+        """
+        columns_list = self.__db.ordered_select(kind, word)[2]
+        rows = 0
+        with open(path, 'w', encoding='utf8') as file:
+            for batch in self.__db.iter_vacancy_batches(kind, word, self.__batch_size):
+                file.writelines(json.dumps(dict(zip(columns_list, row)), ensure_ascii=False,
+                                           default=self.json_default) + '\n' for row in batch)
+                rows += len(batch)
+        return rows
+
+    def write_arrow(self, path: str, kind: str, word: str | None = None, fmt: str = 'parquet') -> int:
+        """
+        Запись вакансий в файл Parquet или Arrow (IPC): каждый пакет строк - группа строк (record batch).
+        :return: Количество записанных вакансий, int.
+        """
+        columns_list = self.__db.ordered_select(kind, word)[2]
+        schema = self.arrow_schema(columns_list)
+        writer = (pyarrow.parquet.ParquetWriter(path, schema) if fmt == 'parquet'
+                  else pyarrow.ipc.new_file(path, schema))
+        rows = 0
+        try:
+            for batch in self.__db.iter_vacancy_batches(kind, word, self.__batch_size):
+                columns = [list(column) for column in zip(*batch)]
+                if 'rank' in columns_list:  # релевантность (numeric) - число с плавающей точкой
+                    i = columns_list.index('rank')
+                    columns[i] = [float(value) for value in columns[i]]
+                arrays = [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)]
+                writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+                rows += len(batch)
+        finally:
+            writer.close()
+        return rows
+
+    def arrow_schema(self, columns_list: list[str]) -> 'pyarrow.Schema':
+        """
+        Схема файлов Parquet/Arrow.
+        :param columns_list: Список полей, list[str].
+        :return: Схема, pyarrow.Schema.
+        """
+        return pyarrow.schema([(column, getattr(pyarrow, self.ARROW_TYPES.get(column, 'string'))())
+                               for column in columns_list])
+
+    @staticmethod
+    def json_default(value: object) -> object:
+        """
+        Преобразование значений, не поддерживаемых json (дата, numeric).
+        """
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        raise TypeError(f'Значение типа {type(value).__name__} не преобразуется в JSON')
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(db: {self.__db!r}, batch_size: {self.__batch_size})"
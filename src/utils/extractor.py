@@ -0,0 +1,206 @@
+import re
+from typing import Callable
+
+from src.conf.constants import NOT_DATA, EXTRACT_CACHE_SIZE
+
+HTML_TAG = re.compile(r'\<[^>]*\>')  # html-теги (в выдаче поиска - подсветка найденных слов)
+
+
+def clean_text(txt: str) -> str:
+    """
+    Удаление html-тегов и лишних пробелов (в начале, в конце, двойных), между словами - по одному пробелу.
+    :param txt: Строка для обработки, str.
+    :return: Строка, str.
+    """
+    if '<' in txt:
+        txt = HTML_TAG.sub('', txt)
+    # строка уже без лишних пробелов (нет пробельных символов, кроме одиночных пробелов между словами)
+    if txt.isprintable() and '  ' not in txt and txt[:1] != ' ' and txt[-1:] != ' ':
+        return txt
+    return ' '.join(txt.split())
+
+
+class FieldExtractor:
+    """
+    Извлечение полей вакансии из выдачи поиска hh.ru по описанию (спецификации) полей.
+    Описание один раз преобразуется в список функций получения значений полей (по одной на поле):
+    при обработке вакансии путь к значению и вид поля не разбираются, каждое поле вычисляется один раз,
+    значения справочников берутся из уже вычисленных полей. Значения справочников hh.ru и ссылка на вакансию
+    (в них нет html-тегов и лишних пробелов) не обрабатываются, обработанные значения повторяющихся полей
+    (должность, работодатель, адрес) запоминаются.
+    Результат совпадает с результатом прежнего поштучного разбора полей (benchmarks/legacy.py).
+    """
+
+    # Поле таблицы vacancies: (вид значения, путь к значению в словаре вакансии)
+    # date - дата публикации; text - строка без html-тегов и лишних пробелов (нет значения - NOT_DATA);
+    # name - повторяющаяся строка (как text, обработанные значения запоминаются);
+    # code - значение справочника hh.ru или ссылка на вакансию (строка - без обработки, иначе - как text);
+    # salary - зарплата (нет значения - 0); employer - (id региона, наименование работодателя); id - число
+    FIELDS = {
+        'date_publication': ('date', ('published_at',)),
+        'position_employee': ('name', ('name',)),
+        'employer': ('employer', ('employer', 'name')),
+        'salary_from': ('salary', ('salary', 'from')),
+        'salary_to': ('salary', ('salary', 'to')),
+        'currency': ('code', ('salary', 'currency')),
+        'schedule': ('code', ('schedule', 'name')),
+        'employment': ('code', ('employment', 'name')),
+        'experience': ('code', ('experience', 'name')),
+        'requirements': ('text', ('snippet', 'requirement')),
+        'duties': ('text', ('snippet', 'responsibility')),
+        'address': ('name', ('address', 'raw')),
+        'vacancy_url': ('code', ('alternate_url',)),
+        'hh_id': ('id', ('id',)),
+    }
+
+    # Справочная таблица: поле vacancies, значение которого - естественный ключ записи справочника
+    DIMENSIONS = {
+        'employers': 'employer',
+        'currency': 'currency',
+        'schedule': 'schedule',
+        'employment': 'employment',
+        'experience': 'experience',
+    }
+
+    def __init__(self) -> None:
+        self.__getters: list[Callable[[dict], object]] = [self.getter(kind, path)
+                                                          for kind, path in self.FIELDS.values()]
+        # ключи справочников: (номер поля в строке vacancies, значение поля - готовый ключ (работодатель))
+        fields = list(self.FIELDS)
+        self.__keys: list[tuple[int, bool]] = [(fields.index(field), self.FIELDS[field][0] == 'employer')
+                                               for field in self.DIMENSIONS.values()]
+
+    @property
+    def tables(self) -> tuple[str, ...]:
+        """
+        Справочные таблицы в порядке ключей, возвращаемых extract.
+        """
+        return tuple(self.DIMENSIONS)
+
+    def extract(self, item: dict) -> tuple[list, list[tuple]]:
+        """
+        Извлечение полей вакансии.
+        :param item: Вакансия из выдачи поиска hh.ru, dict.
+        :return: Строка таблицы vacancies и естественные ключи справочников (в порядке tables),
+        tuple[list, list[tuple]].
+        """
+        row = [getter(item) for getter in self.__getters]
+        return row, [row[i] if whole else (row[i],) for i, whole in self.__keys]
+
+    @classmethod
+    def getter(cls, kind: str, path: tuple[str, ...]) -> Callable[[dict], object]:
+        """
+        Функция получения значения поля из словаря вакансии.
+        Значение получается и преобразуется в одной функции (строки и числа - без вызова преобразования).
+        :param kind: Вид значения: date, text, name, code, salary, employer, id, str.
+        :param path: Ключи словаря вакансии (1 или 2 уровня вложенности), tuple[str, ...].
+        :return: Функция: словарь вакансии - значение поля, Callable[[dict], object].
+        """
+        if kind == 'date':
+            key = path[0]
+            return lambda item: item[key].split('T')[0]
+        if kind == 'id':
+            key = path[0]
+            return lambda item: int(item[key])
+        converters = {'text': cls.text, 'name': cls.text, 'code': cls.code, 'salary': cls.salary,
+                      'employer': cls.text}
+        if kind not in converters:
+            raise ValueError(f'Неизвестный вид значения поля: {kind}')
+        convert = converters[kind]
+        clean = cls.cached_clean() if kind in ('name', 'employer') else clean_text
+        # значение без обработки: строка справочника hh.ru (code), число (salary)
+        same_type = {'code': str, 'salary': int}.get(kind)
+        if len(path) == 1:
+            key = path[0]
+
+            def first_level(item: dict) -> object:
+                value = item.get(key)
+                if type(value) is same_type:
+                    return value
+                return clean(value) if type(value) is str else convert(value)
+            return first_level
+        key_1, key_2 = path
+        nested = cls.nested
+
+        def value(item: dict) -> object:
+            parent = item.get(key_1)
+            value = parent.get(key_2) if type(parent) is dict else nested(parent, key_2)
+            if type(value) is same_type:
+                return value
+            return clean(value) if type(value) is str else convert(value)
+        if kind == 'employer':
+            return lambda item: (int(item['area']['id']), value(item))
+        return value
+
+    @staticmethod
+    def cached_clean() -> Callable[[str], str]:
+        """
+        Функция обработки строки (clean_text) с запоминанием результатов: значения повторяются
+        в вакансиях (одни и те же работодатели, должности, адреса). Запоминается не больше
+        EXTRACT_CACHE_SIZE значений (при превышении запомненные значения удаляются).
+        :return: Функция: строка - строка без html-тегов и лишних пробелов, Callable[[str], str].
+        """
+        cache: dict[str, str] = {}
+
+        def clean(txt: str) -> str:
+            cleaned = cache.get(txt)
+            if cleaned is None:
+                if len(cache) >= EXTRACT_CACHE_SIZE:
+                    cache.clear()
+                cleaned = cache[txt] = clean_text(txt)
+            return cleaned
+        return clean
+
+    @staticmethod
+    def nested(parent: object, key: str) -> object:
+        """
+        Значение 2-го уровня вложенности, если значение 1-го уровня - не словарь (None, если его нет).
+        """
+        if parent is None:
+            return None
+        try:
+            return parent.get(key)
+        except AttributeError:
+            return None
+
+    @staticmethod
+    def text(value: object) -> str | None:
+        """
+        Строковое значение: без html-тегов и лишних пробелов, NOT_DATA - если значения нет.
+        Значения других типов обрабатываются так же, как при прежнем поштучном разборе полей
+        (все элементы непустые - обработка строки, иначе None).
+        """
+        if type(value) is str:
+            return clean_text(value)
+        if value is None:
+            return NOT_DATA
+        try:
+            if all(value):
+                return clean_text(value)
+        except (TypeError, AttributeError):
+            return NOT_DATA
+        return None
+
+    @classmethod
+    def code(cls, value: object) -> str | None:
+        """
+        Значение справочника hh.ru или ссылка на вакансию: строка возвращается без обработки
+        (html-тегов и лишних пробелов в них нет), значения других типов обрабатываются как text.
+        """
+        if type(value) is str:
+            return value
+        return cls.text(value)
+
+    @staticmethod
+    def salary(value: object) -> object:
+        """
+        Зарплата: 0, если значения нет.
+        """
+        if type(value) is int:
+            return value
+        if value is None or str(value) == 'None':
+            return 0
+        return value
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(fields: {len(self.FIELDS)}, dimensions: {len(self.DIMENSIONS)})"
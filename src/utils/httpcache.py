@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from loguru import logger
+
+from src.conf.constants import PATH_CACHE, CACHE_TTL, CACHE_SIZE
+
+
+class CacheMissError(requests.RequestException):
+    """
+    Ответ отсутствует в кэше (в режиме работы без сети).
+    """
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов API hh.ru (SQLite): ключ - URL с параметрами запроса,
+    тело ответа хранится сжатым (zlib), время жизни задаётся по адресу запроса,
+    при превышении размера кэша удаляются давно не использованные записи (LRU).
+    """
+
+    def __init__(self, path: str = PATH_CACHE, ttl: dict[str, int] = CACHE_TTL, size: int = CACHE_SIZE) -> None:
+        self.__path = path
+        self.__ttl = ttl  # время жизни ответа по префиксу адреса, сек.
+        self.__size = size  # допустимый размер кэша (сжатые тела ответов), байт
+        self.__lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        with self.__conn:
+            self.__conn.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                "key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                                "etag TEXT, last_modified TEXT, "
+                                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            self.__conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses(accessed_at)")
+
+    @staticmethod
+    def key(url: str, params: dict | None = None) -> str:
+        """
+        Ключ кэша: URL запроса с параметрами.
+        :param url: Адрес запроса, str.
+        :param params: Параметры запроса, dict.
+        :return: Ключ, str.
+        """
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def ttl(self, key: str) -> int:
+        """
+        Время жизни ответа: по самому длинному совпадающему префиксу адреса.
+        :param key: Ключ кэша, str.
+        :return: Время жизни, сек., int.
+        """
+        prefixes = [prefix for prefix in self.__ttl if key.startswith(prefix)]
+        return self.__ttl[max(prefixes, key=len)] if prefixes else 0
+
+    def get(self, key: str) -> dict | None:
+        """
+        Получение ответа из кэша.
+        :param key: Ключ кэша, str.
+        :return: Словарь (body, etag, last_modified, fresh) или None, если ответа нет, dict | None.
+        """
+        now = time.time()
+        with self.__lock:
+            row = self.__conn.execute("SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                                      (key,)).fetchone()
+            if row is None:
+                return None
+            with self.__conn:
+                self.__conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        body, etag, last_modified, stored_at = row
+        return {'body': zlib.decompress(body), 'etag': etag, 'last_modified': last_modified,
+                'fresh': now - stored_at < self.ttl(key)}
+
+    def put(self, key: str, body: bytes, etag: str | None = None, last_modified: str | None = None) -> None:
+        """
+        Сохранение ответа в кэш с последующим вытеснением давно не использованных записей.
+        :param key: Ключ кэша, str.
+        :param body: Тело ответа, bytes.
+        :param etag: Заголовок ETag ответа, str.
+        :param last_modified: Заголовок Last-Modified ответа, str.
+        """
+        data = zlib.compress(body)
+        now = time.time()
+        with self.__lock:
+            with self.__conn:
+                self.__conn.execute("INSERT OR REPLACE INTO responses "
+                                    "(key, body, size, etag, last_modified, stored_at, accessed_at) "
+                                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    (key, data, len(data), etag, last_modified, now, now))
+            self.evict()
+
+    def touch(self, key: str) -> None:
+        """
+        Продление времени жизни ответа (сервер подтвердил, что ответ не изменился).
+        :param key: Ключ кэша, str.
+        """
+        now = time.time()
+        with self.__lock:
+            with self.__conn:
+                self.__conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                                    (now, now, key))
+
+    def evict(self) -> None:
+        """
+        Удаление давно не использованных записей, пока размер кэша превышает допустимый.
+        Вызывается под блокировкой.
+        """
+        total = self.__conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.__size:
+            return
+        keys = []
+        for key, size in self.__conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.__size:
+                break
+            keys.append((key,))
+            total -= size
+        with self.__conn:
+            self.__conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        logger.info(f'Из кэша HTTP-ответов удалено записей: {len(keys)}')
+
+    def clear(self) -> None:
+        """
+        Очистка кэша.
+        """
+        with self.__lock:
+            with self.__conn:
+                self.__conn.execute("DELETE FROM responses")
+
+    def __str__(self) -> str:
+        return f'Кэш ответов API hh.ru ({self.__path})'
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path: {self.__path}, size: {self.__size})"
@@ -0,0 +1,268 @@
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from src.conf.constants import HEADERS_HH, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF, HTTP_BACKOFF_MAX, \
+    HTTP_POOL_SIZE, RATE_LIMIT_HH, RATE_BURST_HH, CACHE_ENABLED, HTTP_OFFLINE
+from src.utils.httpcache import ResponseCache, CacheMissError
+from src.utils.metrics import metrics
+
+# Статусы ответа, при которых запрос повторяется
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Числовые идентификаторы в адресе запроса
+_ID_PATH = re.compile(r'/\d+(?=/|$)')
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов ("маркерная корзина"), общий для всех потоков.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.__rate = rate  # скорость пополнения корзины, маркеров/сек.
+        self.__capacity = capacity  # максимальное количество маркеров (допустимый "всплеск")
+        self.__tokens = float(capacity)
+        self.__timestamp = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Получение маркера. Если корзина пуста, поток ожидает её пополнения.
+        :return: Время ожидания маркера, сек., float.
+        """
+        waited = 0.0
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__timestamp) * self.__rate)
+                self.__timestamp = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return waited
+                delay = (1 - self.__tokens) / self.__rate
+            time.sleep(delay)
+            waited += delay
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate: {self.__rate}, capacity: {self.__capacity})"
+
+
+class HttpClient:
+    """
+    HTTP-клиент для обращения к API hh.ru: пул соединений (keep-alive),
+    повтор запросов с экспоненциальной задержкой, ограничение частоты запросов,
+    кэширование ответов и счётчики времени выполнения запросов.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_HH, burst: int = RATE_BURST_HH, retries: int = HTTP_RETRIES,
+                 backoff: float = HTTP_BACKOFF, timeout: float = HTTP_TIMEOUT, pool_size: int = HTTP_POOL_SIZE,
+                 cache: ResponseCache | None = None, offline: bool = False) -> None:
+        self.__cache = cache
+        self.__offline = offline  # ответы берутся только из кэша
+        self.__cache_stats = {'hits': 0, 'misses': 0, 'revalidated': 0}
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__timeout = timeout
+        self.__limiter = TokenBucket(rate, burst)
+        self.__session = requests.Session()
+        self.__session.headers.update(HEADERS_HH)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.__session.mount('https://', adapter)
+        self.__session.mount('http://', adapter)
+        self.__stats: dict[str, dict] = {}
+        self.__lock = threading.Lock()
+
+    def fetch(self, url: str, params: dict | None = None) -> bytes:
+        """
+        Получение тела ответа с использованием кэша.
+        Актуальный ответ берётся из кэша, устаревший - проверяется на сервере
+        условным запросом (If-None-Match/If-Modified-Since).
+        :param url: Адрес запроса, str.
+        :param params: Параметры запроса, dict.
+        :return: Тело ответа, bytes.
+        :raise requests.RequestException: Если запрос не выполнен после всех повторов
+        или ответа нет в кэше при работе без сети.
+        """
+        if self.__cache is None:
+            return self.get(url, params).content
+
+        key = self.__cache.key(url, params)
+        cached = self.__cache.get(key)
+        if cached is not None and (cached['fresh'] or self.__offline):
+            self.__count_cache('hits')
+            return cached['body']
+        if self.__offline:
+            self.__count_cache('misses')
+            raise CacheMissError(f'Ответ на запрос {key} отсутствует в кэше (работа без сети)')
+
+        headers = {}
+        if cached is not None and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached is not None and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = self.get(url, params, headers)
+        if response.status_code == 304 and cached is not None:
+            self.__cache.touch(key)
+            self.__count_cache('revalidated')
+            return cached['body']
+        self.__count_cache('misses')
+        self.__cache.put(key, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.content
+
+    def get(self, url: str, params: dict | None = None, headers: dict | None = None) -> requests.Response:
+        """
+        GET-запрос с повторами при ошибках соединения и статусах 429/5xx.
+        :param url: Адрес запроса, str.
+        :param params: Параметры запроса, dict.
+        :param headers: Дополнительные заголовки запроса, dict.
+        :return: Ответ сервера, requests.Response.
+        :raise requests.RequestException: Если запрос не выполнен после всех повторов.
+        """
+        attempt = 0
+        while True:
+            wait = self.__limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.__session.get(url, params=params, headers=headers, timeout=self.__timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                self.__count(url, time.perf_counter() - start, wait, error=True)
+                if attempt >= self.__retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f'Повтор запроса к {url} через {delay:.2f} с ({error})')
+            else:
+                self.__count(url, time.perf_counter() - start, wait, error=response.status_code >= 400)
+                metrics().inc('hh_http_received_bytes_total', len(response.content), endpoint=self.endpoint(url))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.__retries:
+                    response.raise_for_status()
+                    return response
+                delay = self.retry_after(response) or self.backoff_delay(attempt)
+                logger.warning(f'Повтор запроса к {url} через {delay:.2f} с (статус {response.status_code})')
+            self.__count_retry(url)
+            time.sleep(delay)
+            attempt += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Экспоненциальная задержка перед повтором запроса (со случайной добавкой).
+        :param attempt: Номер попытки, int.
+        :return: Задержка, сек., float.
+        """
+        delay = self.__backoff * 2 ** attempt
+        return min(HTTP_BACKOFF_MAX, delay + random.uniform(0, delay / 2))
+
+    @staticmethod
+    def retry_after(response: requests.Response) -> float | None:
+        """
+        Задержка из заголовка Retry-After (секунды или дата HTTP).
+        :param response: Ответ сервера, requests.Response.
+        :return: Задержка, сек., float или None, если заголовка нет.
+        """
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return min(HTTP_BACKOFF_MAX, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return min(HTTP_BACKOFF_MAX, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+    def __count(self, url: str, latency: float, wait: float, error: bool) -> None:
+        """
+        Учёт времени выполнения запроса.
+        """
+        with self.__lock:
+            stat = self.__stats.setdefault(url, {'requests': 0, 'errors': 0, 'retries': 0,
+                                                 'latency': 0.0, 'latency_max': 0.0, 'wait': 0.0})
+            stat['requests'] += 1
+            stat['errors'] += int(error)
+            stat['latency'] += latency
+            stat['latency_max'] = max(stat['latency_max'], latency)
+            stat['wait'] += wait
+        metrics().observe('hh_http_request_seconds', latency, endpoint=self.endpoint(url))
+        if error:
+            metrics().inc('hh_http_errors_total', endpoint=self.endpoint(url))
+
+    def __count_retry(self, url: str) -> None:
+        """
+        Учёт повторных запросов.
+        """
+        with self.__lock:
+            self.__stats[url]['retries'] += 1
+        metrics().inc('hh_http_retries_total', endpoint=self.endpoint(url))
+
+    def __count_cache(self, counter: str) -> None:
+        """
+        Учёт обращений к кэшу.
+        """
+        with self.__lock:
+            self.__cache_stats[counter] += 1
+        metrics().inc('hh_http_cache_total', result=counter)
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        """
+        Адрес запроса без идентификаторов (метка метрик), например https://api.hh.ru/areas/{id}.
+        :param url: Адрес запроса, str.
+        :return: Адрес без идентификаторов, str.
+        """
+        return _ID_PATH.sub('/{id}', url)
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Счётчики запросов по адресам: количество, ошибки, повторы,
+        суммарное, среднее и максимальное время запроса, время ожидания в ограничителе.
+        :return: Словарь счётчиков, dict[str, dict].
+        """
+        with self.__lock:
+            result = {}
+            for url, stat in self.__stats.items():
+                result[url] = dict(stat, latency_avg=stat['latency'] / stat['requests'])
+            return result
+
+    def log_stats(self) -> None:
+        """
+        Запись счётчиков запросов в лог.
+        """
+        for url, stat in self.stats().items():
+            logger.info(f'HTTP {url}: запросов {stat["requests"]}, ошибок {stat["errors"]}, '
+                        f'повторов {stat["retries"]}, время {stat["latency"]:.2f} с '
+                        f'(среднее {stat["latency_avg"]:.3f} с, макс. {stat["latency_max"]:.3f} с), '
+                        f'ожидание лимита {stat["wait"]:.2f} с')
+        if self.__cache is not None:
+            logger.info(f'Кэш HTTP: попаданий {self.__cache_stats["hits"]}, промахов {self.__cache_stats["misses"]}, '
+                        f'подтверждено сервером {self.__cache_stats["revalidated"]}')
+
+    def __str__(self) -> str:
+        return 'HTTP-клиент API hh.ru (пул соединений, повторы, ограничение частоты запросов)'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(retries: {self.__retries}, backoff: {self.__backoff}, "
+                f"timeout: {self.__timeout}, limiter: {self.__limiter!r}, cache: {self.__cache!r}, "
+                f"offline: {self.__offline})")
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def http_client() -> HttpClient:
+    """
+    HTTP-клиент, общий для всех обращений к API hh.ru в процессе.
+    :return: Экземпляр HttpClient.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(cache=ResponseCache() if CACHE_ENABLED or HTTP_OFFLINE else None,
+                                 offline=HTTP_OFFLINE)
+        return _client
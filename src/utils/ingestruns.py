@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+
+import psycopg2
+from loguru import logger
+
+from src.utils.dbpool import db_pool
+from src.utils.httpclient import http_client
+
+
+class IngestRun:
+    """
+    Запись журнала загрузок (таблица ingest_runs): регион/город, вид загрузки,
+    время начала и окончания, количество страниц и строк по таблицам,
+    количество и время HTTP-запросов, время записи в БД.
+    """
+
+    def __init__(self, db_name: str, params: dict, area_id: int, area_name: str, kind: str) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__area_id = area_id
+        self.__area_name = area_name
+        self.__kind = kind  # full - полная загрузка, sync - синхронизация, switch - без загрузки
+        self.__run_id: int | None = None
+        self.__http: tuple[int, float] = (0, 0.0)  # счётчики HTTP-клиента на начало загрузки
+
+    @property
+    def run_id(self) -> int | None:
+        return self.__run_id
+
+    def start(self) -> int:
+        """
+        Запись о начале загрузки.
+        :return: id загрузки, int.
+        """
+        self.__http = self.http_totals()
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute('INSERT INTO ingest_runs(area_id, area_name, run_kind, started_datetime) '
+                                'VALUES (%s, %s, %s, %s) RETURNING run_id',
+                                (self.__area_id, self.__area_name, self.__kind, datetime.now().replace(microsecond=0)))
+                    self.__run_id = cur.fetchone()[0]
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Заполнение таблицы ingest_runs ({self.__class__.__name__}): {error}')
+            exit(1)
+        logger.info(f'Загрузка {self.__run_id} ({self.__kind}): {self.__area_name}, id = {self.__area_id}')
+        return self.__run_id
+
+    def finish(self, stats: dict | None = None, status: str = 'ok') -> None:
+        """
+        Запись об окончании загрузки.
+        :param stats: Показатели загрузки: pages - количество страниц, rows - строк по таблицам (dict),
+        db_seconds - время записи в БД, dict.
+        :param status: Результат загрузки: ok, failed, str.
+        """
+        stats = stats or {}
+        requests_start, seconds_start = self.__http
+        requests_end, seconds_end = self.http_totals()
+        http_requests, http_seconds = requests_end - requests_start, seconds_end - seconds_start
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute('UPDATE ingest_runs SET run_status = %s, finished_datetime = %s, pages = %s, '
+                                'rows_loaded = %s, http_requests = %s, http_seconds = %s, db_seconds = %s '
+                                'WHERE run_id = %s',
+                                (status, datetime.now().replace(microsecond=0), stats.get('pages', 0),
+                                 json.dumps(stats.get('rows', {})), http_requests, http_seconds,
+                                 stats.get('db_seconds', 0.0), self.__run_id))
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Заполнение таблицы ingest_runs ({self.__class__.__name__}): {error}')
+            exit(1)
+        logger.info(f'Загрузка {self.__run_id} завершена ({status}): страниц {stats.get("pages", 0)}, '
+                    f'строк {stats.get("rows", {})}, HTTP-запросов {http_requests} ({http_seconds:.2f} с), '
+                    f'запись в БД {stats.get("db_seconds", 0.0):.2f} с')
+
+    @staticmethod
+    def http_totals() -> tuple[int, float]:
+        """
+        Суммарные счётчики HTTP-клиента по всем адресам.
+        :return: Количество запросов и их суммарное время, сек., tuple[int, float].
+        """
+        stats = http_client().stats().values()
+        return sum(stat['requests'] for stat in stats), sum(stat['latency'] for stat in stats)
+
+    def __str__(self) -> str:
+        return f'Загрузка данных {self.__run_id}: {self.__area_name}'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(run_id: {self.__run_id}, area_id: {self.__area_id}, "
+                f"kind: {self.__kind}, БД {self.__db_name})")
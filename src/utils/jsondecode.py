@@ -0,0 +1,91 @@
+import json
+import re
+import time
+from typing import Iterator
+
+from src.utils.metrics import metrics
+
+try:  # быстрый разбор JSON (необязательная зависимость)
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'  # используемая библиотека разбора JSON
+
+_DECODER = json.JSONDecoder()
+_SPACES = re.compile(r'[ \t\n\r]*')
+
+
+def loads(data: bytes | str) -> object:
+    """
+    Разбор JSON из тела ответа (без предварительного преобразования в строку).
+    Используется orjson, если установлен, иначе - стандартный модуль json.
+    :param data: Тело ответа, bytes.
+    :return: Объект JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_items(data: bytes, key: str = 'items', source: str = 'vacancies') -> Iterator[dict]:
+    """
+    Поэлементный разбор массива key объекта JSON (страницы поиска hh.ru): элементы возвращаются
+    по одному, словарь страницы целиком не создаётся; остальные поля объекта после массива не разбираются.
+    С orjson страница разбирается целиком (это быстрее поэлементного разбора).
+    Время разбора учитывается в метрике hh_json_decode_seconds.
+    :param data: Тело ответа, bytes.
+    :param key: Имя массива, str.
+    :param source: Источник данных (метка метрики), str.
+    :return: Итератор элементов массива, Iterator[dict].
+    :raise json.JSONDecodeError: Если тело ответа - не объект JSON.
+    :raise KeyError: Если в объекте нет массива key.
+    """
+    seconds = 0.0
+    start = time.perf_counter()  # None - разбор приостановлен (элемент передан вызывающему коду)
+    try:
+        if orjson is not None:
+            items = orjson.loads(data)[key]
+            seconds, start = time.perf_counter() - start, None
+            yield from items
+            return
+        text = data.decode('utf-8') if isinstance(data, bytes) else data
+        end = _expect(text, _SPACES.match(text).end(), '{')
+        while text[end:end + 1] != '}':
+            name, end = _DECODER.raw_decode(text, end)
+            end = _expect(text, end, ':')
+            if name != key:
+                _, end = _DECODER.raw_decode(text, end)
+                end = _SPACES.match(text, end).end()
+                if text[end:end + 1] == ',':
+                    end = _SPACES.match(text, end + 1).end()
+                continue
+            end = _expect(text, end, '[')
+            separator = ',' if text[end:end + 1] != ']' else ']'
+            while separator == ',':
+                item, end = _DECODER.raw_decode(text, end)
+                end = _SPACES.match(text, end).end()
+                separator = text[end:end + 1]
+                if separator not in (',', ']'):
+                    raise json.JSONDecodeError("Expecting ',' delimiter", text, end)
+                end = _SPACES.match(text, end + 1).end()
+                seconds, start = seconds + time.perf_counter() - start, None
+                yield item
+                start = time.perf_counter()
+            return
+        raise KeyError(key)
+    finally:
+        if start is not None:
+            seconds += time.perf_counter() - start
+        metrics().observe('hh_json_decode_seconds', seconds, source=source)
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    """
+    Проверка символа в позиции pos (после пробелов).
+    :return: Позиция следующего значащего символа, int.
+    """
+    pos = _SPACES.match(text, pos).end()
+    if text[pos:pos + 1] != char:
+        raise json.JSONDecodeError(f"Expecting '{char}'", text, pos)
+    return _SPACES.match(text, pos + 1).end()
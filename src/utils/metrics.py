@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from loguru import logger
+
+from src.conf.constants import PATH_METRICS, METRICS_BUCKETS
+
+
+class Histogram:
+    """
+    Гистограмма значений (времени выполнения): количество значений по интервалам,
+    сумма и максимум.
+    """
+
+    def __init__(self, buckets: tuple = METRICS_BUCKETS) -> None:
+        self.buckets = buckets  # верхние границы интервалов
+        self.counts = [0] * (len(buckets) + 1)  # последний интервал - больше всех границ
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Учёт значения.
+        :param value: Значение, float.
+        """
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Оценка квантиля по гистограмме (верхняя граница интервала, в который попадает квантиль).
+        :param q: Уровень квантиля (0..1), float.
+        :return: Значение квантиля, float.
+        """
+        rank = q * self.count
+        total = 0
+        for i, count in enumerate(self.counts):
+            total += count
+            if total >= rank and count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count: {self.count}, sum: {self.sum:.3f}, max: {self.max:.3f})"
+
+
+class Metrics:
+    """
+    Метрики выполнения программы: счётчики (строки, байты, повторы, попадания в кэш)
+    и гистограммы времени выполнения этапов (HTTP-запросы, разбор JSON, преобразование,
+    получение id справочников, запись в БД, запросы DBManager).
+    Метрика определяется именем и метками (например, таблицей БД).
+    """
+
+    def __init__(self) -> None:
+        self.__counters: dict[tuple, float] = {}
+        self.__histograms: dict[tuple, Histogram] = {}
+        self.__lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Увеличение счётчика.
+        :param name: Имя метрики, str.
+        :param value: Приращение, float.
+        :param labels: Метки метрики.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Учёт значения в гистограмме.
+        :param name: Имя метрики, str.
+        :param value: Значение (время выполнения, сек.), float.
+        :param labels: Метки метрики.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            if key not in self.__histograms:
+                self.__histograms[key] = Histogram()
+            self.__histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """
+        Измерение времени выполнения блока with (учитывается и при исключении).
+        :param name: Имя метрики, str.
+        :param labels: Метки метрики.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def export(self, path: str = PATH_METRICS) -> None:
+        """
+        Запись метрик в файл в текстовом формате Prometheus.
+        Файл заменяется целиком, поэтому читатель не видит частично записанных данных.
+        :param path: Путь к файлу, str.
+        """
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            histograms = sorted(self.__histograms.items(), key=lambda item: item[0])
+        lines = []
+        for name in sorted({key[0] for key, _ in counters}):
+            lines.append(f'# TYPE {name} counter')
+            lines.extend(f'{name}{self.labels_str(labels)} {value:g}' for (metric, labels), value in counters
+                         if metric == name)
+        for name in sorted({key[0] for key, _ in histograms}):
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, labels), histogram in histograms:
+                if metric != name:
+                    continue
+                total = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    total += count
+                    lines.append(f'{name}_bucket{self.labels_str(labels + (("le", f"{bound:g}"),))} {total}')
+                lines.append(f'{name}_bucket{self.labels_str(labels + (("le", "+Inf"),))} {histogram.count}')
+                lines.append(f'{name}_sum{self.labels_str(labels)} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{self.labels_str(labels)} {histogram.count}')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f'{path}.tmp', 'w', encoding='utf8') as file:
+                file.write('\n'.join(lines) + '\n')
+            os.replace(f'{path}.tmp', path)
+            logger.info(f'Метрики записаны в файл {path}')
+        except OSError as error:
+            logger.error(f'Запись метрик в файл {path} ({self.__class__.__name__}): {error}')
+
+    def summary(self) -> str:
+        """
+        Сводная таблица метрик: для гистограмм - количество, суммарное, среднее,
+        медианное (p50), p95 и максимальное время; для счётчиков - значение.
+        :return: Таблица, str.
+        """
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            histograms = sorted(self.__histograms.items(), key=lambda item: -item[1].sum)
+        names = ([name + self.labels_str(labels) for (name, labels), _ in histograms]
+                 + [name + self.labels_str(labels) for (name, labels), _ in counters])
+        width = max([len(name) for name in names] + [10])
+        rows = [f'{"Этап":<{width}} {"кол-во":>8} {"всего, с":>10} {"сред., мс":>10} '
+                f'{"p50, мс":>9} {"p95, мс":>9} {"макс., мс":>10}']
+        for name, (_, histogram) in zip(names, histograms):
+            rows.append(f'{name:<{width}} {histogram.count:>8} {histogram.sum:>10.3f} '
+                        f'{histogram.sum / histogram.count * 1000:>10.2f} {histogram.quantile(0.5) * 1000:>9.2f} '
+                        f'{histogram.quantile(0.95) * 1000:>9.2f} {histogram.max * 1000:>10.2f}')
+        rows.append(f'{"Счётчик":<{width}} {"значение":>8}')
+        for name, (_, value) in zip(names[len(histograms):], counters):
+            rows.append(f'{name:<{width}} {value:>8g}')
+        return '\n'.join(rows)
+
+    def log_summary(self) -> None:
+        """
+        Запись сводной таблицы метрик в лог.
+        """
+        logger.info(f'Метрики выполнения программы:\n{self.summary()}')
+
+    def clear(self) -> None:
+        """
+        Сброс всех метрик.
+        """
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    @staticmethod
+    def labels_str(labels: tuple) -> str:
+        """
+        Метки метрики в формате Prometheus: {name="value",...}.
+        :param labels: Пары (имя, значение), tuple.
+        :return: Строка, str.
+        """
+        if not labels:
+            return ''
+        values = []
+        for name, value in labels:
+            value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+            values.append(f'{name}="{value}"')
+        return '{' + ','.join(values) + '}'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(counters: {len(self.__counters)}, "
+                f"histograms: {len(self.__histograms)})")
+
+
+_metrics = Metrics()
+
+
+def metrics() -> Metrics:
+    """
+    Метрики, общие для всех модулей программы.
+    :return: Экземпляр Metrics.
+    """
+    return _metrics
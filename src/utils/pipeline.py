@@ -0,0 +1,125 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable
+
+from src.conf.constants import PIPELINE_QUEUE_SIZE
+
+# Признак окончания данных в очереди
+_END = object()
+
+
+class _Failure:
+    """
+    Исключение, возникшее на одном из этапов конвейера и передаваемое следующим этапам.
+    """
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Pipeline:
+    """
+    Конвейер обработки данных: источник -> этапы преобразования -> приёмник.
+    Источник и каждый этап выполняются в отдельных потоках, приёмник - в вызывающем потоке.
+    Этапы связаны очередями ограниченного размера, поэтому в памяти одновременно находится
+    не более queue_size элементов на каждый этап независимо от общего объёма данных.
+    """
+
+    def __init__(self, source: Iterable, stages: list[Callable[[Any], Any]], sink: Callable[[Any], None],
+                 queue_size: int = PIPELINE_QUEUE_SIZE) -> None:
+        self.__source = source
+        self.__stages = stages
+        self.__sink = sink
+        self.__queue_size = queue_size
+        self.__stop = threading.Event()
+
+    def run(self) -> None:
+        """
+        Запуск конвейера. Возвращает управление после обработки всех данных приёмником.
+        Исключение любого этапа прерывает конвейер и передаётся в вызывающий поток.
+        """
+        queues = [queue.Queue(maxsize=self.__queue_size) for _ in range(len(self.__stages) + 1)]
+        threads = [threading.Thread(target=self.produce, args=(queues[0],), daemon=True)]
+        for i, stage in enumerate(self.__stages):
+            threads.append(threading.Thread(target=self.process, args=(stage, queues[i], queues[i + 1]), daemon=True))
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _END:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                self.__sink(item)
+        finally:
+            self.__stop.set()
+            for thread in threads:
+                thread.join()
+
+    def produce(self, output: queue.Queue) -> None:
+        """
+        Поток источника данных.
+        :param output: Выходная очередь, queue.Queue.
+        """
+        try:
+            for item in self.__source:
+                if not self.put(output, item):
+                    return
+        except BaseException as error:
+            self.put(output, _Failure(error))
+            return
+        self.put(output, _END)
+
+    def process(self, stage: Callable[[Any], Any], source: queue.Queue, output: queue.Queue) -> None:
+        """
+        Поток этапа преобразования.
+        :param stage: Функция преобразования элемента, Callable.
+        :param source: Входная очередь, queue.Queue.
+        :param output: Выходная очередь, queue.Queue.
+        """
+        while True:
+            item = self.get(source)
+            if item is None:
+                return
+            if item is _END or isinstance(item, _Failure):
+                self.put(output, item)
+                return
+            try:
+                result = stage(item)
+            except BaseException as error:
+                self.put(output, _Failure(error))
+                return
+            if not self.put(output, result):
+                return
+
+    def put(self, output: queue.Queue, item: Any) -> bool:
+        """
+        Помещение элемента в очередь с ожиданием свободного места.
+        :return: False, если конвейер остановлен, bool.
+        """
+        while not self.__stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, source: queue.Queue) -> Any:
+        """
+        Получение элемента из очереди с ожиданием.
+        :return: Элемент или None, если конвейер остановлен, Any.
+        """
+        while not self.__stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def __str__(self) -> str:
+        return f'Конвейер обработки данных из {len(self.__stages) + 2} этапов'
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(stages: {len(self.__stages)}, queue_size: {self.__queue_size})"
@@ -0,0 +1,24 @@
+import re
+
+# Узел плана, читающий индекс: Index Scan, Index Scan Backward, Index Only Scan, Bitmap Index Scan
+INDEX_SCAN = re.compile(r'Index (?:Only )?Scan (?:Backward )?using (\S+)|Bitmap Index Scan on (\S+)')
+
+
+def uses_index(plan: list[str], table: str = 'vacancies') -> bool:
+    """
+    Проверка плана выполнения (EXPLAIN): таблица (и её секции) читается без полного просмотра.
+    :param plan: Строки плана выполнения, list[str].
+    :param table: Имя таблицы, str.
+    :return: True, если полного просмотра таблицы нет, bool.
+    """
+    return not any(re.search(rf'Seq Scan on {table}(_\d+)?\b', line) for line in plan)
+
+
+def plan_indexes(plan: list[str]) -> set[str]:
+    """
+    Индексы, которые читает план выполнения (EXPLAIN). Для секционированной таблицы
+    в плане указываются индексы секций (см. DBManager.index_names).
+    :param plan: Строки плана выполнения, list[str].
+    :return: Имена индексов, set[str].
+    """
+    return {scan.group(1) or scan.group(2) for line in plan for scan in INDEX_SCAN.finditer(line)}
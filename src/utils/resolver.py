@@ -0,0 +1,126 @@
+from typing import Iterable
+
+import psycopg2
+from psycopg2.extras import execute_values
+from loguru import logger
+
+from src.conf.constants import BULK_PAGE_SIZE
+from src.utils.dbpool import db_pool
+from src.utils.metrics import metrics
+
+
+class DimensionResolver:
+    """
+    Получение id записей справочных таблиц (работодатели, валюта, график, занятость, опыт)
+    по их естественным ключам. Ключи хранятся в словарях в памяти, отсутствующие
+    записи добавляются в БД одним запросом на пакет (INSERT ... ON CONFLICT ... RETURNING).
+    """
+
+    # Справочник: (поле id, поля естественного ключа)
+    DIMENSIONS = {
+        'employers': ('employer_id', ('area_id', 'employer_name')),
+        'currency': ('currency_id', ('currency_name',)),
+        'schedule': ('schedule_id', ('schedule_name',)),
+        'employment': ('employment_id', ('employment_name',)),
+        'experience': ('experience_id', ('experience_name',)),
+    }
+
+    def __init__(self, db_name: str, params: dict) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__cache: dict[str, dict[tuple, int]] = {name: {} for name in self.DIMENSIONS}
+        self.__inserted: dict[str, int] = dict.fromkeys(self.DIMENSIONS, 0)  # добавлено записей в БД
+
+    def preload(self) -> None:
+        """
+        Загрузка в память всех записей справочных таблиц.
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    for table, (id_col, key_cols) in self.DIMENSIONS.items():
+                        cur.execute(f"SELECT {id_col}, {', '.join(key_cols)} FROM {table}")
+                        self.__cache[table] = {tuple(row[1:]): row[0] for row in cur.fetchall()}
+            logger.info(f'Справочники загружены в память: '
+                        f'{", ".join(f"{table} - {len(keys)}" for table, keys in self.__cache.items())}')
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Загрузка справочников ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def resolve(self, table: str, keys: Iterable[tuple]) -> dict[tuple, int]:
+        """
+        Получение id записей справочника по естественным ключам.
+        Отсутствующие в памяти ключи добавляются в БД одним пакетом.
+        :param table: Имя справочной таблицы, str.
+        :param keys: Естественные ключи (кортежи), Iterable[tuple].
+        :return: Словарь: ключ - id записи, dict[tuple, int].
+        """
+        with metrics().timer('hh_resolve_seconds', table=table):
+            cache = self.__cache[table]
+            keys = list(dict.fromkeys(keys))
+            misses = [key for key in keys if key not in cache]
+            if misses:
+                self.insert_keys(table, misses)
+            metrics().inc('hh_resolve_keys_total', len(keys) - len(misses), table=table, result='hit')
+            metrics().inc('hh_resolve_keys_total', len(misses), table=table, result='miss')
+            return {key: cache[key] for key in keys}
+
+    def key(self, table: str, key: tuple) -> int:
+        """
+        Получение id записи справочника по естественному ключу.
+        :param table: Имя справочной таблицы, str.
+        :param key: Естественный ключ, tuple.
+        :return: id записи, int.
+        """
+        cache = self.__cache[table]
+        if key not in cache:
+            self.insert_keys(table, [key])
+        return cache[key]
+
+    def insert_keys(self, table: str, keys: list[tuple]) -> None:
+        """
+        Добавление записей в справочник и получение их id.
+        Для уже существующих записей (добавленных другим процессом) id также возвращается.
+        :param table: Имя справочной таблицы, str.
+        :param keys: Естественные ключи (кортежи), отсутствующие в памяти, list[tuple].
+        """
+        id_col, key_cols = self.DIMENSIONS[table]
+        columns = ', '.join(key_cols)
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    # DO UPDATE (а не DO NOTHING), чтобы RETURNING вернул id и существующих записей
+                    rows = execute_values(cur, f"INSERT INTO {table}({columns}) VALUES %s "
+                                               f"ON CONFLICT ({columns}) DO UPDATE SET {key_cols[-1]} = EXCLUDED.{key_cols[-1]} "
+                                               f"RETURNING {id_col}, {columns}",
+                                          sorted(keys), page_size=BULK_PAGE_SIZE, fetch=True)
+            for row in rows:
+                self.__cache[table][tuple(row[1:])] = row[0]
+            self.__inserted[table] += len(keys)
+            logger.info(f'Таблица {table} БД {self.__db_name}: добавлено записей {len(keys)}')
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Добавление записей в справочник {table} ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def size(self, table: str) -> int:
+        """
+        Количество записей справочника в памяти.
+        :param table: Имя справочной таблицы, str.
+        :return: Количество записей, int.
+        """
+        return len(self.__cache[table])
+
+    def inserted(self, table: str) -> int:
+        """
+        Количество записей, добавленных в справочник экземпляром.
+        :param table: Имя справочной таблицы, str.
+        :return: Количество записей, int.
+        """
+        return self.__inserted[table]
+
+    def __str__(self) -> str:
+        return f'Получение id записей справочных таблиц БД {self.__db_name}'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(БД {self.__db_name}, "
+                f"host: {self.__params['host']}, port: {self.__params['port']})")
@@ -0,0 +1,266 @@
+import psycopg2
+from loguru import logger
+
+from src.conf.constants import ANALYTICS_BINS, ANALYTICS_TOP_EMPLOYERS
+from src.utils.dbmanager import DBManager
+from src.utils.dbpool import db_pool
+from src.utils.metrics import metrics
+
+try:  # векторные вычисления (необязательная зависимость)
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SalaryAnalytics:
+    """
+    Статистика зарплат (от и до) по вакансиям региона/города: количество, среднее, процентили
+    (p10, p25, медиана, p75, p90), минимум, максимум, гистограмма и разбивка по опыту, графику,
+    занятости и работодателям (ТОП по количеству вакансий). Зарплаты - в рублях (пересчитаны при загрузке
+    по курсам hh.ru), учитываются зарплаты больше 0.
+    С NumPy зарплаты и id справочников получаются одним запросом и обрабатываются векторно,
+    без NumPy статистика вычисляется в БД (percentile_cont ... WITHIN GROUP, GROUPING SETS).
+    Результат кэшируется для текущей версии данных.
+    """
+
+    SALARIES = ('salary_from_rub', 'salary_to_rub')
+    # Процентили (процентиль p99 - верхняя граница гистограммы)
+    QUANTILES = {'min': 0.0, 'p10': 0.1, 'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p90': 0.9, 'p99': 0.99, 'max': 1.0}
+    # Разбивка: (поле vacancies, справочная таблица, поле наименования)
+    BREAKDOWNS = {
+        'experience': ('experience_id', 'experience', 'experience_name'),
+        'schedule': ('schedule_id', 'schedule', 'schedule_name'),
+        'employment': ('employment_id', 'employment', 'employment_name'),
+        'employer': ('employer_id', 'employers', 'employer_name'),
+    }
+
+    def __init__(self, db_name: str, params: dict, area_id: int, bins: int = ANALYTICS_BINS,
+                 top_employers: int = ANALYTICS_TOP_EMPLOYERS) -> None:
+        self.__db_name = db_name
+        self.__params = params
+        self.__area_id = area_id
+        self.__bins = bins
+        self.__top_employers = top_employers
+        self.__db = DBManager(db_name, params, area_id)
+
+    def stats(self) -> dict:
+        """
+        Статистика зарплат (из кэша, если она уже вычислялась для текущей версии данных).
+        :return: Словарь: salary_from_rub, salary_to_rub - статистика с гистограммой (histogram: edges, counts);
+        breakdowns - разбивка: вид - список {id, name, vacancies, salary_from_rub, salary_to_rub}, dict.
+        """
+        backend = 'numpy' if numpy is not None else 'sql'
+        key = (self.__db_name, self.__db.data_version(), 'salary_analytics', self.__area_id, backend,
+               self.__bins, self.__top_employers)
+        result = DBManager.cache.get(key)
+        if result is not None:
+            logger.info('Статистика зарплат получена (из кэша)')
+            return result
+        with metrics().timer('hh_salary_analytics_seconds', backend=backend):
+            result = self.numpy_stats() if numpy is not None else self.sql_stats()
+        DBManager.cache.put(key, result)
+        logger.info(f'Статистика зарплат получена ({backend})')
+        return result
+
+    def numpy_stats(self) -> dict:
+        """
+        Статистика зарплат: данные получаются одним запросом, процентили всех групп
+        вычисляются векторно (по отсортированным по группе и зарплате значениям).
+        """
+        columns = [column for column, _, _ in self.BREAKDOWNS.values()]
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {', '.join(self.SALARIES)}, {', '.join(columns)} "
+                                f"FROM vacancies WHERE area_id = %s", (self.__area_id,))
+                    data = numpy.array(cur.fetchall(), dtype=float).reshape(-1, len(self.SALARIES) + len(columns))
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Получение зарплат ({self.__class__.__name__}): {error}')
+            exit(1)
+        salaries = {salary: numpy.nan_to_num(data[:, i]) for i, salary in enumerate(self.SALARIES)}
+        result = {}
+        for salary, values in salaries.items():
+            values = values[values > 0]
+            stats = self.group_stats(numpy.zeros(len(values), dtype=int), values)
+            result[salary] = stats.get(0, self.empty_stats())
+            result[salary]['histogram'] = self.histogram(values, result[salary])
+        result['breakdowns'] = {}
+        for j, name in enumerate(self.BREAKDOWNS):
+            # вакансии без значения справочника (NULL - NaN) в разбивку не входят
+            known = ~numpy.isnan(data[:, len(self.SALARIES) + j])
+            groups = data[known, len(self.SALARIES) + j].astype(int)
+            ids, vacancies = numpy.unique(groups, return_counts=True)
+            counts = dict(zip(ids.tolist(), vacancies.tolist()))
+            by_salary = {salary: self.group_stats(groups[values[known] > 0], values[known][values[known] > 0])
+                         for salary, values in salaries.items()}
+            result['breakdowns'][name] = self.breakdown(name, counts, by_salary)
+        return result
+
+    def sql_stats(self) -> dict:
+        """
+        Статистика зарплат средствами БД: процентили по региону/городу и по всем разбивкам -
+        одним запросом (GROUPING SETS), гистограммы - вторым.
+        """
+        columns = [column for column, _, _ in self.BREAKDOWNS.values()]
+        aggregates = ', '.join(f"COUNT({salary}), AVG({salary}), "
+                               f"percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY {salary})"
+                               for salary in self.SALARIES)
+        salaries = ', '.join(f'CASE WHEN {salary} > 0 THEN {salary} END AS {salary}' for salary in self.SALARIES)
+        database_request = (f"SELECT {', '.join(f'GROUPING({column})' for column in columns)}, "
+                            f"{', '.join(columns)}, COUNT(*), {aggregates} "
+                            f"FROM (SELECT {', '.join(columns)}, {salaries} FROM vacancies WHERE area_id = %s) v "
+                            f"GROUP BY GROUPING SETS ((), {', '.join(f'({column})' for column in columns)})")
+        quantiles = list(self.QUANTILES.values())
+        query_params = (quantiles,) * len(self.SALARIES) + (self.__area_id,)
+        rows = self.fetch(database_request, query_params)
+        result = {}
+        counts = {name: {} for name in self.BREAKDOWNS}
+        by_salary = {name: {salary: {} for salary in self.SALARIES} for name in self.BREAKDOWNS}
+        n = len(columns)
+        for row in rows:
+            grouping, ids, vacancies, aggregates = row[:n], row[n:2 * n], row[2 * n], row[2 * n + 1:]
+            stats = {salary: self.sql_group_stats(*aggregates[3 * i:3 * i + 3])
+                     for i, salary in enumerate(self.SALARIES)}
+            if all(grouping):  # все вакансии региона/города
+                result.update({salary: stats[salary] or self.empty_stats() for salary in self.SALARIES})
+                continue
+            j = grouping.index(0)
+            if ids[j] is None:  # вакансии без значения справочника в разбивку не входят
+                continue
+            name = list(self.BREAKDOWNS)[j]
+            counts[name][ids[j]] = vacancies
+            for salary in self.SALARIES:
+                if stats[salary]:
+                    by_salary[name][salary][ids[j]] = stats[salary]
+        for salary in self.SALARIES:
+            result.setdefault(salary, self.empty_stats())
+        self.sql_histograms(result)
+        result['breakdowns'] = {name: self.breakdown(name, counts[name], by_salary[name]) for name in self.BREAKDOWNS}
+        return result
+
+    def sql_histograms(self, result: dict) -> None:
+        """
+        Гистограммы зарплат средствами БД (width_bucket) по границам, вычисленным sql_stats.
+        :param result: Статистика зарплат (дополняется гистограммами), dict.
+        """
+        requests, query_params = [], ()
+        for salary in self.SALARIES:
+            stats = result[salary]
+            result[salary]['histogram'] = self.histogram_edges(stats)
+            if len(result[salary]['histogram']['edges']) > 2:
+                requests.append(f"SELECT %s, LEAST(width_bucket(LEAST({salary}, %s), %s, %s, %s), %s), COUNT(*) "
+                                f"FROM vacancies WHERE area_id = %s AND {salary} > 0 GROUP BY 2")
+                query_params += (salary, stats['p99'], stats['min'], stats['p99'], self.__bins, self.__bins,
+                                 self.__area_id)
+        if requests:
+            for salary, bucket, count in self.fetch(' UNION ALL '.join(requests), query_params):
+                result[salary]['histogram']['counts'][bucket - 1] = count
+
+    def fetch(self, database_request: str, query_params: tuple) -> list[tuple]:
+        """
+        Выполнение запроса статистики.
+        :return: Строки результата, list[tuple].
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(database_request, query_params)
+                    return cur.fetchall()
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Получение статистики зарплат ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def group_stats(self, groups: 'numpy.ndarray', values: 'numpy.ndarray') -> dict[int, dict]:
+        """
+        Статистика значений по группам: значения сортируются по группе и величине,
+        процентили (с линейной интерполяцией, как percentile_cont) вычисляются для всех групп сразу.
+        :param groups: id групп, numpy.ndarray.
+        :param values: Значения, numpy.ndarray.
+        :return: Словарь: id группы - статистика, dict[int, dict].
+        """
+        if not len(values):
+            return {}
+        order = numpy.lexsort((values, groups))
+        groups, values = groups[order], values[order]
+        ids, starts, counts = numpy.unique(groups, return_index=True, return_counts=True)
+        means = numpy.add.reduceat(values, starts) / counts
+        positions = starts[:, None] + numpy.array(list(self.QUANTILES.values()))[None, :] * (counts[:, None] - 1)
+        lower = numpy.floor(positions).astype(int)
+        upper = numpy.ceil(positions).astype(int)
+        quantiles = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+        return {group: {'count': count, 'mean': mean, **dict(zip(self.QUANTILES, row))}
+                for group, count, mean, row in zip(ids.tolist(), counts.tolist(), means.tolist(), quantiles.tolist())}
+
+    def sql_group_stats(self, count: int, mean: object, quantiles: list[float] | None) -> dict | None:
+        """
+        Статистика группы по агрегатам БД (None, если в группе нет зарплат).
+        """
+        if not count:
+            return None
+        return {'count': count, 'mean': float(mean), **dict(zip(self.QUANTILES, quantiles))}
+
+    def histogram(self, values: 'numpy.ndarray', stats: dict) -> dict:
+        """
+        Гистограмма значений: bins равных интервалов от минимума до p99,
+        последний интервал включает и все значения больше p99.
+        :return: Словарь: edges - границы интервалов, counts - количество значений, dict.
+        """
+        histogram = self.histogram_edges(stats)
+        if len(histogram['edges']) > 2:
+            edges = numpy.array(histogram['edges'])
+            histogram['counts'] = numpy.histogram(numpy.minimum(values, stats['p99']), bins=edges)[0].tolist()
+        return histogram
+
+    def histogram_edges(self, stats: dict) -> dict:
+        """
+        Границы интервалов гистограммы (количество значений: 0 - для вычисления, если интервалов несколько).
+        """
+        if not stats['count']:
+            return {'edges': [], 'counts': []}
+        low, high = stats['min'], stats['p99']
+        if low == high:
+            return {'edges': [low, high], 'counts': [stats['count']]}
+        return {'edges': [low + (high - low) * i / self.__bins for i in range(self.__bins + 1)],
+                'counts': [0] * self.__bins}
+
+    def breakdown(self, name: str, counts: dict[int, int], by_salary: dict[str, dict[int, dict]]) -> list[dict]:
+        """
+        Разбивка статистики по значениям справочника (по убыванию количества вакансий;
+        для работодателей - ТОП top_employers).
+        :param name: Вид разбивки (см. BREAKDOWNS), str.
+        :param counts: Количество вакансий по id значения справочника, dict[int, int].
+        :param by_salary: Статистика зарплат по id значения справочника, dict[str, dict[int, dict]].
+        :return: Список {id, name, vacancies, salary_from_rub, salary_to_rub}, list[dict].
+        """
+        ids = sorted(counts, key=lambda i: (-counts[i], i))
+        if name == 'employer':
+            ids = ids[:self.__top_employers]
+        names = self.names(name, ids)
+        return [{'id': i, 'name': names.get(i), 'vacancies': counts[i],
+                 **{salary: by_salary[salary].get(i, self.empty_stats()) for salary in self.SALARIES}}
+                for i in ids]
+
+    def names(self, name: str, ids: list[int]) -> dict[int, str]:
+        """
+        Наименования значений справочника.
+        :param name: Вид разбивки (см. BREAKDOWNS), str.
+        :param ids: id значений справочника, list[int].
+        :return: Словарь: id - наименование, dict[int, str].
+        """
+        if not ids:
+            return {}
+        column, table, name_column = self.BREAKDOWNS[name]
+        rows = self.__db.get_db(f"SELECT {column}, {name_column} FROM {table} WHERE {column} IN %s",
+                                ['id', 'name'], f'Наименования справочника {table} получены успешно',
+                                (tuple(ids),))
+        return {row['id']: row['name'] for row in rows}
+
+    def empty_stats(self) -> dict:
+        """
+        Статистика при отсутствии зарплат.
+        """
+        return {'count': 0, 'mean': None, **dict.fromkeys(self.QUANTILES)}
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(area_id: {self.__area_id}, bins: {self.__bins}, "
+                f"backend: {'numpy' if numpy is not None else 'sql'}, БД {self.__db_name})")
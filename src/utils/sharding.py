@@ -0,0 +1,187 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable
+
+from loguru import logger
+
+from src.conf.constants import URL_AREAS_ID_HH, DEPTH_CAP_HH, MAX_WORKERS_HH, SHARD_PERIOD_DAYS, \
+    SHARD_MIN_WINDOW, SHARD_MAX_DEPTH, SHARD_DEADLINE
+from src.utils.httpclient import http_client
+from src.utils.jsondecode import loads
+from src.utils.metrics import metrics
+
+
+class ShardPlanner:
+    """
+    Разбиение поискового запроса hh.ru на части ("шарды"), каждая из которых
+    умещается в ограничение глубины выдачи (не более 2000 вакансий).
+    Запрос делится по дочерним регионам/населённым пунктам, если они покрывают
+    все вакансии родителя, иначе - по интервалам даты публикации (date_from/date_to).
+    """
+
+    def __init__(self, request_page: Callable[[int, dict | None], dict], area: int,
+                 max_workers: int = MAX_WORKERS_HH, max_depth: int = SHARD_MAX_DEPTH,
+                 deadline: float = SHARD_DEADLINE, date_from: datetime | None = None) -> None:
+        self.__request_page = request_page  # функция получения страницы поиска (page, shard) -> dict
+        self.__area = area
+        self.__date_from = date_from  # начало периода публикации (для получения только новых вакансий)
+        self.__max_workers = max(1, max_workers)
+        self.__max_depth = max_depth
+        self.__deadline = deadline  # ограничение времени построения плана, сек.
+        self.__start = 0.0
+
+    def plan(self) -> list[tuple[dict, dict]]:
+        """
+        Построение плана загрузки.
+        :return: Список пар (параметры шарда, первая страница выдачи шарда), list[tuple[dict, dict]].
+        """
+        self.__start = time.monotonic()
+        shard = {'area': self.__area}
+        if self.__date_from is not None:
+            shard['date_from'] = self.__date_from.astimezone().strftime('%Y-%m-%dT%H:%M:%S%z')
+            shard['date_to'] = datetime.now().astimezone().strftime('%Y-%m-%dT%H:%M:%S%z')
+        js_first = self.__request_page(0, shard)
+        plan = self.split(shard, js_first, 0)
+        self.log_plan(plan)
+        return plan
+
+    def split(self, shard: dict, js_first: dict, depth: int) -> list[tuple[dict, dict]]:
+        """
+        Рекурсивное разбиение шарда, пока количество вакансий в нём превышает глубину выдачи.
+        :param shard: Параметры шарда, dict.
+        :param js_first: Первая страница выдачи шарда, dict.
+        :param depth: Глубина рекурсии, int.
+        :return: Список пар (параметры шарда, первая страница выдачи шарда), list[tuple[dict, dict]].
+        """
+        if js_first['found'] <= DEPTH_CAP_HH:
+            return [(shard, js_first)]
+        if depth >= self.__max_depth or time.monotonic() - self.__start > self.__deadline:
+            logger.warning(f'Шард {self.shard_str(shard)} не разбит (ограничение глубины/времени): '
+                           f'будет получено {DEPTH_CAP_HH} из {js_first["found"]} вакансий')
+            return [(shard, js_first)]
+
+        # дочерние шарды с первыми страницами выдачи (по регионам они уже получены при проверке покрытия)
+        children = self.split_area(shard, js_first['found'])
+        if not children:
+            shards = self.split_dates(shard)
+            children = list(zip(shards, self.probe(shards)))
+            self.log_lost(shard, js_first['found'], children)
+        if not children:
+            logger.warning(f'Шард {self.shard_str(shard)} не может быть разбит: '
+                           f'будет получено {DEPTH_CAP_HH} из {js_first["found"]} вакансий')
+            return [(shard, js_first)]
+
+        plan = []
+        for child, js_child in children:
+            if js_child['found'] > 0:
+                plan.extend(self.split(child, js_child, depth + 1))
+        return plan
+
+    def split_area(self, shard: dict, found: int) -> list[tuple[dict, dict]]:
+        """
+        Разбиение шарда по дочерним регионам/населённым пунктам.
+        Используется, только если дочерние регионы покрывают все вакансии шарда.
+        :param shard: Параметры шарда, dict.
+        :param found: Количество вакансий в шарде, int.
+        :return: Список пар (дочерний шард, первая страница его выдачи) или пустой список,
+        list[tuple[dict, dict]].
+        """
+        if 'date_from' in shard:
+            return []
+        try:
+            data = http_client().fetch(URL_AREAS_ID_HH.format(shard['area']))
+            with metrics().timer('hh_json_decode_seconds', source='areas_children'):
+                areas = loads(data)['areas']
+        except Exception as error:
+            logger.error(f'Получение дочерних регионов для {shard["area"]} ({self.__class__.__name__}): {error}')
+            return []
+        children = [dict(shard, area=int(area['id'])) for area in areas]
+        if not children:
+            return []
+        probed = list(zip(children, self.probe(children)))
+        found_children = sum(js['found'] for _, js in probed)
+        if found_children < found:
+            logger.info(f'Дочерние регионы {shard["area"]} покрывают {found_children} из {found} вакансий, '
+                        f'разбиение по датам публикации')
+            return []
+        return probed
+
+    @staticmethod
+    def split_dates(shard: dict) -> list[dict]:
+        """
+        Разбиение шарда на два по интервалу даты публикации.
+        :param shard: Параметры шарда, dict.
+        :return: Список из двух дочерних шардов или пустой список, если интервал минимален, list[dict].
+        """
+        if 'date_from' in shard:
+            date_from = datetime.strptime(shard['date_from'], '%Y-%m-%dT%H:%M:%S%z')
+            date_to = datetime.strptime(shard['date_to'], '%Y-%m-%dT%H:%M:%S%z')
+        else:
+            date_to = datetime.now().astimezone().replace(microsecond=0)
+            date_from = date_to - timedelta(days=SHARD_PERIOD_DAYS)
+        if date_to - date_from <= timedelta(seconds=SHARD_MIN_WINDOW):
+            return []
+        middle = date_from + (date_to - date_from) / 2
+        middle = middle.replace(microsecond=0)
+        # Границы интервалов включаются в выдачу hh.ru, поэтому интервалы не пересекаются по секундам.
+        return [dict(shard, date_from=date_from.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                     date_to=middle.strftime('%Y-%m-%dT%H:%M:%S%z')),
+                dict(shard, date_from=(middle + timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S%z'),
+                     date_to=date_to.strftime('%Y-%m-%dT%H:%M:%S%z'))]
+
+    @staticmethod
+    def log_lost(shard: dict, found: int, children: list[tuple[dict, dict]]) -> None:
+        """
+        Запись в лог количества вакансий шарда, не попавших в дочерние шарды по датам публикации
+        (опубликованных раньше последних SHARD_PERIOD_DAYS дней, если в шарде не задан период).
+        :param shard: Параметры шарда, dict.
+        :param found: Количество вакансий в шарде, int.
+        :param children: Список пар (дочерний шард, первая страница его выдачи), list[tuple[dict, dict]].
+        """
+        if not children:
+            return
+        lost = found - sum(js['found'] for _, js in children)
+        if lost > 0:
+            logger.warning(f'Шард {ShardPlanner.shard_str(shard)}: {lost} из {found} вакансий вне интервалов '
+                           f'даты публикации {children[0][0]["date_from"]} - {children[-1][0]["date_to"]} '
+                           f'не будут получены')
+            metrics().inc('hh_shard_lost_vacancies_total', lost)
+
+    def probe(self, shards: list[dict]) -> list[dict]:
+        """
+        Параллельное получение первых страниц выдачи шардов.
+        :param shards: Список шардов, list[dict].
+        :return: Первые страницы выдачи в порядке шардов, list[dict].
+        """
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            return list(executor.map(lambda shard: self.__request_page(0, shard), shards))
+
+    def log_plan(self, plan: list[tuple[dict, dict]]) -> None:
+        """
+        Запись плана загрузки в лог.
+        :param plan: Список пар (параметры шарда, первая страница выдачи шарда), list[tuple[dict, dict]].
+        """
+        found = sum(js['found'] for _, js in plan)
+        logger.info(f'План загрузки: {len(plan)} шард(ов), {found} вакансий, '
+                    f'построен за {time.monotonic() - self.__start:.2f} с')
+        for shard, js in plan:
+            logger.info(f'Шард {self.shard_str(shard)}: {js["found"]} вакансий')
+
+    @staticmethod
+    def shard_str(shard: dict) -> str:
+        """
+        Строковое представление шарда для лога.
+        :param shard: Параметры шарда, dict.
+        :return: Строка, str.
+        """
+        if 'date_from' in shard:
+            return f'area={shard["area"]} [{shard["date_from"]} - {shard["date_to"]}]'
+        return f'area={shard["area"]}'
+
+    def __str__(self) -> str:
+        return 'Разбиение запроса к hh.ru на части в пределах ограничения глубины выдачи'
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(area: {self.__area}, max_workers: {self.__max_workers}, "
+                f"max_depth: {self.__max_depth}, deadline: {self.__deadline}, date_from: {self.__date_from})")
@@ -1,13 +1,22 @@
+import os
+from datetime import datetime, timedelta
+
 import psycopg2
 from loguru import logger
 
 from src.conf.config import config
 from src.conf.constants import PATH_LOGS, URL_AREAS_HH, DB_NAME, SCRIPT_DBCREATE, SCRIPT_DBCREATETABLES, \
-    LOG_FULL, LOG_USER, LOG_NOUPDATE, ID_RUSSIA_HH
+    PATH_MIGRATIONS, LOG_FULL, LOG_USER, LOG_NOUPDATE, ID_RUSSIA_HH, SYNC_OVERLAP_MINUTES, AREA_FRESH_HOURS, \
+    PATH_EXPORT
 from src.utils.dbmanager import DBManager
+from src.utils.dbpool import db_pool
 
 from src.utils.areas import AreasHH
+from src.utils.arearesolver import area_resolver
 from src.utils.creationdb import CreationDB
+from src.utils.exporter import VacancyExporter
+from src.utils.salaryanalytics import SalaryAnalytics
+from src.utils.ingestruns import IngestRun
 from src.utils.vacancies import VacHH
 
 
@@ -39,12 +48,15 @@ def create_database(params: dict) -> None:
             # Создание БД, таблиц, заполнение некоторых таблиц справочными данными
             db.create_database(SCRIPT_DBCREATE)
             db.create_tables(SCRIPT_DBCREATETABLES)
+            db.migrate(PATH_MIGRATIONS)
 
             # Заполнение таблиц
             areas_update(params)  # Регионы/населённые пункты
             vacancies_update(params)  # Работодатели, вакансии
             logger.info(LOG_FULL)  # Лог: полное обновление прошло успешно
-            save_history()  # запись истории в БД
+        else:
+            # Обновление схемы существующей БД
+            db.migrate(PATH_MIGRATIONS)
         conn.commit()
         conn.close()
 
@@ -53,85 +65,58 @@ def create_database(params: dict) -> None:
         exit(1)
 
 
-def save_history() -> None:
+def select_history() -> tuple:
     """
-    Чтение .log-файла, поиск последней записи, содержащей информацию
-    об обновлении БД и запись данных в таблицу history.
+    Извлечение данных о последней успешной загрузке из журнала загрузок (таблица ingest_runs).
+    :return: Кортеж (id загрузки, дата и время окончания, регион/город, id региона/города), tuple.
     """
-    with open(PATH_LOGS, 'r', encoding='utf8') as file:
-        lines = [line for line in file]
-
-    # Ищем нужную строку
-    data_log = []
-    for str_log in reversed(lines):
-        try:
-            text = str_log.split(' :: ')
-            log_text = text[-1].strip()  # текст лога, str
-            log_timestamp = text[0].strip()  # дата и время, str
-
-            if log_text == LOG_FULL or log_text == LOG_USER or log_text == LOG_NOUPDATE:
-                if len(data_log) == 0:
-                    data_log.append(log_timestamp)
-            if 'Поиск по запросу : ' in str_log or 'Поиск по-умолчанию : ' in str_log:
-                if len(data_log) == 1:
-                    data_log.append(str_log.split(' : ')[1].strip())
-                data = tuple(data_log)
-                insert_history(data)
-                break
-        except Exception as error:
-            logger.error(f'Чтение лога и запись данных в таблицу history: {error}')
-            continue
+    params = config()  # параметры подключения к БД
+    try:
+        with db_pool(DB_NAME, params).transaction() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT run_id, finished_datetime, area_name, area_id FROM ingest_runs "
+                            "WHERE run_status = 'ok' ORDER BY finished_datetime DESC LIMIT 1")
+                return cur.fetchone() or ()
+    except (Exception, psycopg2.DatabaseError) as error:
+        logger.error(f'Запрос к таблице ingest_runs: {error}')
+        exit(1)
 
 
-def insert_history(data: tuple) -> None:
+def select_freshness(id_area: int) -> datetime | None:
     """
-    Сохранение записи о запросе пользователя в таблицу БД.
-    :param data: Кортеж с данными, tuple.
+    Получение даты и времени последней загрузки вакансий по региону/городу.
+    :param id_area: id региона/города, int.
+    :return: Дата и время загрузки или None, если данные по региону не загружались, datetime | None.
     """
     params = config()  # параметры подключения к БД
-    conn = psycopg2.connect(dbname=DB_NAME, **params)
     try:
-        with conn:
+        with db_pool(DB_NAME, params).transaction() as conn:
             with conn.cursor() as cur:
-                if len(data) > 2:
-                    data = data[len(data) - 2:]
-                database_request = (f"INSERT INTO  history(history_datetime, history_area)"
-                                    f"VALUES ({', '.join(['%s'] * len(data))})")
-                cur.execute(database_request, data)
-        logger.info('История запроса сохранена в БД')
+                cur.execute('SELECT freshness_datetime FROM area_freshness WHERE area_id = %s', (id_area,))
+                row = cur.fetchone()
+                return row[0] if row else None
     except (Exception, psycopg2.DatabaseError) as error:
-        logger.error(f'Заполнение таблицы history: {error}')
+        logger.error(f'Запрос к таблице area_freshness: {error}')
         exit(1)
-    finally:
-        conn.close()
 
 
-def select_history() -> tuple:
+def save_freshness(id_area: int, freshness: datetime) -> None:
     """
-    Извлечение данных о последнем событии из таблицы history.
-    :return: Кортеж с последними данными из таблицы history, tuple.
+    Сохранение даты и времени загрузки вакансий по региону/городу.
+    :param id_area: id региона/города, int.
+    :param freshness: Дата и время начала загрузки, datetime.
     """
     params = config()  # параметры подключения к БД
-    conn = psycopg2.connect(dbname=DB_NAME, **params)
     try:
-        with conn:
+        with db_pool(DB_NAME, params).transaction() as conn:
             with conn.cursor() as cur:
-                database_request = ('SELECT * FROM history '
-                                    'ORDER BY history_datetime DESC '
-                                    'LIMIT 1')
-                cur.execute(database_request)
-                # Распаковка полученных данных
-                data = cur.fetchall()
-                history_cur = []
-                for i in data:
-                    for j in range(len(i)):
-                        history_cur.append(i[j])
-                return tuple(history_cur)
+                cur.execute('INSERT INTO area_freshness(area_id, freshness_datetime) VALUES (%s, %s) '
+                            'ON CONFLICT (area_id) DO UPDATE SET freshness_datetime = EXCLUDED.freshness_datetime',
+                            (id_area, freshness))
+        logger.info(f'Актуальность данных по региону/городу id = {id_area} сохранена в БД')
     except (Exception, psycopg2.DatabaseError) as error:
-        logger.error(f'Запрос к таблице history: {error}')
+        logger.error(f'Заполнение таблицы area_freshness: {error}')
         exit(1)
-    finally:
-        conn.close()
 
 
 def areas_update(params: dict) -> None:
@@ -143,96 +128,115 @@ def areas_update(params: dict) -> None:
     try:
         areas = AreasHH(URL_AREAS_HH, 'Россия', DB_NAME, params)
         areas.request_to_api()
+        area_resolver(DB_NAME, params).load()  # поиск регионов/городов по обновлённому справочнику
     except (Exception, psycopg2.DatabaseError) as error:
         logger.error(f'Заполнение таблицы areas: {error}')
         exit(1)
 
 
-def vacancies_update(params: dict) -> None:
+def vacancies_update(params: dict, id_area: int | None = None, date_from: datetime | None = None) -> None:
     """
-    Заполнение данных о работодателях и вакансиях.
+    Заполнение данных о работодателях и вакансиях с записью в журнал загрузок.
     :param params:  Параметры запроса к БД, dict.
+    :param id_area: id региона/города (если не указан, запрашивается у пользователя), int.
+    :param date_from: Начало периода публикации: загружаются только новые и изменённые вакансии, datetime.
     """
-    area = input('Введите название региона/города: ').strip().lower()
-    # Поиск id
-    id_area = area_id(area, params)
+    if id_area is None:
+        area = input('Введите название региона/города: ').strip().lower()
+        # Поиск id
+        id_area = area_id(area, params)
 
     # Поиск данных, заполнение таблиц
+    run = IngestRun(DB_NAME, params, id_area, area_resolver(DB_NAME, params).name(id_area),
+                    'full' if date_from is None else 'sync')
+    run.start()
+    vac = VacHH(db_name=DB_NAME, params=params, area=id_area, date_from=date_from)
     try:
-        vac = VacHH(db_name=DB_NAME, params=params, area=id_area)
+        start = datetime.now().replace(microsecond=0)
         vac.vacancies_all()
+        if date_from is not None:
+            vac.delete_expired()
+        vac.refresh_summary()
+        save_freshness(id_area, start)
     except (Exception, psycopg2.DatabaseError) as error:
         logger.error(f'Заполнение таблицы vacancies: {error}')
+        run.finish(vac.stats(), 'failed')
         exit(1)
+    run.finish(vac.stats())
 
 
 def area_id(area: str, params: dict) -> int:
     """
-    Поиск id региона/города.
+    Поиск id региона/города (по справочнику в памяти, без запроса к БД).
+    Если название неоднозначно, пользователю предлагается выбрать один из найденных вариантов.
     :param area: Регион/город, указанный пользователем.
     :param params:  Параметры запроса к БД, dict.
     :return: ID для поиска данных по конкретному региону.
     """
-    # Поиск id региона/города в БД
-    conn = psycopg2.connect(dbname=DB_NAME, **params)
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                sql_query = f"SELECT area_id FROM areas WHERE area_name ~~* '{area}%'"
-                cur.execute(sql_query)
-                for i in cur.fetchall():
-                    id_area = i[0]
+    candidates = area_resolver(DB_NAME, params).find(area)
+    exact = [candidate for candidate in candidates if candidate.score == 1.0]
+    if len(exact) == 1 or len(candidates) == 1:
+        id_area = (exact or candidates)[0].area_id
+    elif candidates:
+        print('Найдено несколько регионов/городов:')
+        for number, candidate in enumerate(candidates, 1):
+            parent = f' - {candidate.parent_name}' if candidate.parent_name else ''
+            print(f'{number:>2}. {candidate.area_name}{parent}')
         try:
-            logger.info(f'Поиск по запросу : {area} : id = {id_area})')
-            return id_area
-        except:
-            print('Введены некорректные данные. Ищем для Вас вакансии на территории России.')
-            id_area = ID_RUSSIA_HH
-            logger.info(f'Поиск по-умолчанию : Россия : id = {id_area})')
-            return id_area
-    except (Exception, psycopg2.DatabaseError) as error:
-        logger.error(f'Поиск id региона/города (таблица areas): {error}')
-        exit(1)
-    finally:
-        conn.close()
-
-
-def truncate_tables_full(db_name: str, params: dict, tables: str) -> None:
-    """
-    Удаление данных из всех таблиц.
-    :param db_name: Имя БД, str.
-    :param params: Параметры подключения к БД, dict.
-    :param tables: Перечень очищаемых таблиц, str.
-    """
-    conn = psycopg2.connect(dbname=db_name, **params)
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(f'TRUNCATE {tables} RESTART IDENTITY')
-        logger.info(f'Таблицы {tables} БД {db_name} очищены')
-    except (Exception, psycopg2.DatabaseError) as error:
-        logger.error(f'Удаление данных из всех таблиц: {error}')
-        exit(1)
-    finally:
-        conn.close()
+            number = int(input('Введите номер региона/города: '))
+            if not 1 <= number <= len(candidates):
+                raise IndexError(f'номер вне списка: {number}')
+            id_area = candidates[number - 1].area_id
+        except (ValueError, IndexError) as error:
+            id_area = candidates[0].area_id
+            logger.error(f'Выбор региона/города: {error}')
+            print(f'Ищем для Вас вакансии: {candidates[0].area_name}.')
+    else:
+        print('Введены некорректные данные. Ищем для Вас вакансии на территории России.')
+        id_area = ID_RUSSIA_HH
+        logger.info(f'Поиск по-умолчанию : Россия : id = {id_area})')
+        return id_area
+    logger.info(f'Поиск по запросу : {area} : id = {id_area})')
+    return id_area
 
 
-def update_desired(params: dict) -> None:
+def update_desired(params: dict) -> int:
     """
     Обновление БД по запросу пользователя.
+    Данные по каждому региону/городу хранятся отдельно:
+    - регион/город загружается впервые - загружаются все вакансии;
+    - данные по другому региону/городу актуальны (AREA_FRESH_HOURS) - переключение без загрузки;
+    - иначе загружаются только вакансии, опубликованные (изменённые) после последней загрузки.
     :param params: Параметры подключения к БД, dict.
+    :return: id выбранного региона/города, int.
     """
     print('Подождите, пожалуйста, обновляем данные...')
-    # Удаление данных из всех таблиц.
-    truncate_tables_full(DB_NAME, params, 'areas, employers, '
-                                          'currency, schedule, employment, '
-                                          'experience, vacancies')
-
-    # Обновление данных в БД
+    # Обновление справочника регионов (по разнице)
     areas_update(params)
-    vacancies_update(params)
-    logger.info(LOG_USER)  # Лог: полное обновление прошло успешно
-    save_history()  # запись истории в БД
+
+    area = input('Введите название региона/города: ').strip().lower()
+    id_area = area_id(area, params)
+    history = select_history()
+    freshness = select_freshness(id_area)
+
+    if freshness is None:
+        # Регион/город загружается впервые
+        vacancies_update(params, id_area)
+        logger.info(LOG_USER)  # Лог: полное обновление прошло успешно
+    elif (len(history) > 3 and history[3] != id_area
+          and datetime.now() - freshness < timedelta(hours=AREA_FRESH_HOURS)):
+        # Данные по региону/городу уже загружены и актуальны
+        run = IngestRun(DB_NAME, params, id_area, area_resolver(DB_NAME, params).name(id_area), 'switch')
+        run.start()
+        run.finish()
+        logger.info(LOG_NOUPDATE)
+    else:
+        # Синхронизация: новые и изменённые вакансии с момента последней загрузки
+        date_from = freshness - timedelta(minutes=SYNC_OVERLAP_MINUTES)
+        logger.info(f'Синхронизация вакансий с {date_from}')
+        vacancies_update(params, id_area, date_from)
+        logger.info(LOG_USER)  # Лог: обновление прошло успешно
+    return id_area
 
 
 def coord_words_num(digit) -> str:
@@ -249,12 +253,13 @@ def coord_words_num(digit) -> str:
         return f'{digit} вакансий'
 
 
-def print_companies_and_vacancies_count() -> None:
+def print_companies_and_vacancies_count(id_area: int) -> None:
     """
     Выводит на экран ТОП-10 компаний, сгруппированных по количеству вакансий.
+    :param id_area: id региона/города, int.
     """
     params = config()
-    db = DBManager(DB_NAME, params)
+    db = DBManager(DB_NAME, params, id_area)
     lst_top10 = db.get_companies_and_vacancies_count()
     print('---------------------------------------\n'
           'ТОП-10 компаний по количеству вакансий:\n'
@@ -263,58 +268,128 @@ def print_companies_and_vacancies_count() -> None:
         print(f'{company["count"]:<3} - {company["employer_name"]:<15}')
 
 
-def print_all_vacancies() -> None:
+def print_all_vacancies(id_area: int) -> None:
     """
     Вывод информации и вакансий на экран вакансий.
+    :param id_area: id региона/города, int.
     """
     params = config()
-    db = DBManager(DB_NAME, params)
-    vacancies = db.get_all_vacancies()
-    on_screen(vacancies)
+    db = DBManager(DB_NAME, params, id_area)
+    on_screen(db, 'all')
 
 
-def print_vacancies_with_higher_salary() -> None:
+def print_vacancies_with_higher_salary(id_area: int) -> None:
     """
     Вывод на экран списка всех вакансий, у которых зарплата выше средней по всем вакансиям.
+    :param id_area: id региона/города, int.
     """
     params = config()
-    db = DBManager(DB_NAME, params)
-    vacancies = db.get_vacancies_with_higher_salary()
-    on_screen(vacancies)
+    db = DBManager(DB_NAME, params, id_area)
+    on_screen(db, 'higher')
 
 
-def print_vacancies_with_keyword() -> None:
+def print_vacancies_with_keyword(id_area: int) -> None:
     """
     Вывод на экран вакансий, найденных по ключевому слову.
+    :param id_area: id региона/города, int.
     """
-    word = input('Введите ключевое слово: ')
+    word = input('Введите ключевые слова (поиск по должности, требованиям и обязанностям): ')
     params = config()
-    db = DBManager(DB_NAME, params)
-    vacancies = db.get_vacancies_with_keyword(word)
-    if len(vacancies) != 0:
-        on_screen(vacancies)
+    db = DBManager(DB_NAME, params, id_area)
+    if db.count_vacancies('keyword', word) != 0:
+        on_screen(db, 'keyword', word)
     else:
         print('Мы не нашли вакансии по Вашему запросу')
 
 
-def on_screen(vacancies: list[dict]) -> None:
+def export_vacancies(id_area: int) -> None:
     """
-    Вывод вакансий на экран.
-    :param vacancies: Список словарей с вакансиями, list[dict].
+    Выгрузка всех вакансий региона/города в файл (CSV, JSON Lines, Parquet, Arrow) в папку PATH_EXPORT.
+    :param id_area: id региона/города, int.
     """
+    formats = list(VacancyExporter.FORMATS)
     try:
-        number_of_vacancies = int(input(f'\nПо запросу найдено всего {coord_words_num(len(vacancies))}.\n'
-                                        f'Какое количество вакансий Вы хотите увидеть? '))
-        vacancies = vacancies[:int(number_of_vacancies)]
-        print_vacancies(vacancies)
-        logger.info(f'Выведено на экран {coord_words_num(len(vacancies))}')
-    except (Exception, psycopg2.DatabaseError) as error:
-        if len(vacancies) < 10:
-            print_vacancies(vacancies)
-        else:
-            print_vacancies(vacancies[:10])
+        fmt = formats[int(input(f'Формат файла: {", ".join(f"{fmt} - {i}" for i, fmt in enumerate(formats))}: '))]
+    except (ValueError, IndexError) as error:
+        fmt = formats[0]
+        logger.error(f'Выбор формата выгрузки: {error}')
+    path = os.path.join(PATH_EXPORT, f'vacancies_{id_area}_{datetime.now():%Y%m%d_%H%M%S}.'
+                                     f'{VacancyExporter.FORMATS[fmt]}')
+    params = config()
+    db = DBManager(DB_NAME, params, id_area)
+    try:
+        stats = VacancyExporter(db).export(path, fmt=fmt)
+        print(f'Выгружено {coord_words_num(stats["rows"])} в файл {os.path.abspath(path)} '
+              f'за {stats["seconds"]:.2f} с ({stats["rows_per_sec"]:.0f} строк/с)\n')
+    except (ValueError, OSError) as error:
+        logger.error(f'Выгрузка вакансий: {error}')
+        print(f'Выгрузка не выполнена: {error}\n')
+
+
+def print_salary_analytics(id_area: int) -> None:
+    """
+    Вывод на экран статистики зарплат в рублях: процентили, гистограмма зарплаты "от",
+    медианы зарплат по опыту, графику, занятости и ТОП работодателей.
+    :param id_area: id региона/города, int.
+    """
+    params = config()
+    stats = SalaryAnalytics(DB_NAME, params, id_area).stats()
+    titles = {'salary_from_rub': 'от', 'salary_to_rub': 'до'}
+    columns = ['count', 'mean', 'min', 'p10', 'p25', 'p50', 'p75', 'p90', 'max']
+    print(f'\nСтатистика зарплат:\n{"":<4}' + ''.join(f'{column:>10}' for column in columns))
+    for salary, title in titles.items():
+        print(f'{title:<4}' + ''.join(f'{round(stats[salary][column] or 0):>10}' for column in columns))
+
+    histogram = stats['salary_from_rub']['histogram']
+    if histogram['counts']:
+        print('\nРаспределение зарплат "от":')
+        peak = max(histogram['counts'])
+        for low, count in zip(histogram['edges'], histogram['counts']):
+            print(f'{round(low):>10} {"#" * round(40 * count / peak):<40} {count}')
+
+    titles_breakdowns = {'experience': 'Опыт работы', 'schedule': 'График работы',
+                         'employment': 'Занятость', 'employer': 'ТОП работодателей'}
+    for name, title in titles_breakdowns.items():
+        print(f'\n{title:<50}{"вакансий":>10}{"медиана от":>12}{"медиана до":>12}')
+        for row in stats['breakdowns'][name]:
+            print(f'{str(row["name"])[:49]:<50}{row["vacancies"]:>10}'
+                  f'{round(row["salary_from_rub"]["p50"] or 0):>12}{round(row["salary_to_rub"]["p50"] or 0):>12}')
+    print()
+
+
+def on_screen(db: DBManager, kind: str, word: str | None = None) -> None:
+    """
+    Постраничный вывод вакансий на экран. Страницы запрашиваются из БД по мере перехода
+    (следующая/предыдущая), весь список в память не загружается.
+    :param db: Экземпляр DBManager, DBManager.
+    :param kind: Вид выборки вакансий (см. DBManager.vacancies_filter), str.
+    :param word: Ключевое слово (для kind='keyword'), str.
+    """
+    total = db.count_vacancies(kind, word)
+    try:
+        limit = int(input(f'\nПо запросу найдено всего {coord_words_num(total)}.\n'
+                          f'Сколько вакансий выводить на одной странице? '))
+        if limit <= 0:
+            raise ValueError(f'количество вакансий на странице должно быть больше 0: {limit}')
+    except ValueError as error:
+        limit = 10
         logger.error(f'Выбор количества вакансий для отображения: {error}')
-        logger.info(f'Выведено на экран {coord_words_num(len(vacancies))}')
+    pages = -(-total // limit)
+    number = 1
+    page = db.get_vacancies_page(kind, limit, word=word)
+    while page:
+        print_vacancies(page)
+        logger.info(f'Выведено на экран {coord_words_num(len(page))} (страница {number} из {pages})')
+        command = input(f'Страница {number} из {pages}. '
+                        f'Следующая страница - 1, предыдущая - 2, выход в меню - любая другая клавиша: ').strip()
+        if command == '1' and number < pages:
+            page = db.get_vacancies_page(kind, limit, after=db.page_key(kind, page[-1]), word=word)
+            number += 1
+        elif command == '2' and number > 1:
+            page = db.get_vacancies_page(kind, limit, before=db.page_key(kind, page[0]), word=word)
+            number -= 1
+        elif command not in ('1', '2'):
+            break
 
 
 def print_vacancies(vacancies: list[dict]) -> None:
@@ -328,6 +403,8 @@ def print_vacancies(vacancies: list[dict]) -> None:
                   'salary_from': 'Зарплата от: ',
                   'salary_to': 'Зарплата до: ',
                   'currency_name': 'Валюта: ',
+                  'salary_from_rub': 'От, руб.: ',
+                  'salary_to_rub': 'До, руб.: ',
                   'schedule_name': 'График: ',
                   'employment_name': 'Занятость: ',
                   'experience_name': 'Опыт: ',
@@ -343,19 +420,20 @@ def print_vacancies(vacancies: list[dict]) -> None:
         print('=' * 14)
 
 
-def message_avg_salary() -> str:
+def message_avg_salary(id_area: int) -> str:
     """
     Вывод информации о средней зарплате по всем вакансиям.
+    :param id_area: id региона/города, int.
     :return: Сообщение о средней зарплате, str.
     """
     try:
         params = config()
-        db = DBManager(DB_NAME, params)
-        vacancies = db.get_all_vacancies()
-        avg_salary_from = round(db.get_avg_salary()[0]['avg_salary'], 2)
-        avg_salary_to = round(db.get_avg_salary()[1]['avg_salary'], 2)
+        db = DBManager(DB_NAME, params, id_area)
+        summary = db.get_summary()
+        avg_salary_from = round(summary['avg_salary_from'] or 0, 2)
+        avg_salary_to = round(summary['avg_salary_to'] or 0, 2)
         avg_salary = round((avg_salary_from + avg_salary_to) / 2, 2)
-        message = (f'\nВсего найдено {coord_words_num(len(vacancies))} '
+        message = (f'\nВсего найдено {coord_words_num(summary["vacancies_count"])} '
                    f'cо средней зарплатой {avg_salary} '
                    f'(от {avg_salary_from} до {avg_salary_to}) руб.\n')
         return message
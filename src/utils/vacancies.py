@@ -1,14 +1,26 @@
-import json
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any
+from itertools import islice
+from typing import Iterator
 
 import psycopg2
 import requests
-from src.conf.constants import ID_RUSSIA_HH, NOT_DATA
+from src.conf.constants import ID_RUSSIA_HH, URL_VACANCIES_HH, MAX_PAGES_HH, MAX_WORKERS_HH, \
+    VACANCY_LIFETIME_DAYS
+from src.utils.bulkloader import BulkLoader
+from src.utils.currencyrates import currency_rates
+from src.utils.dbpool import db_pool
+from src.utils.extractor import FieldExtractor
+from src.utils.httpclient import http_client
+from src.utils.jsondecode import loads, iter_items
+from src.utils.metrics import metrics
+from src.utils.pipeline import Pipeline
+from src.utils.resolver import DimensionResolver
+from src.utils.sharding import ShardPlanner
 from loguru import logger
-from tqdm import trange
-import re
+from tqdm import tqdm
 
 
 class Mixin:
@@ -16,94 +28,6 @@ class Mixin:
     Класс примеси содержит статические методы, позволяющие выполнять различные задачи наследникам.
     """
 
-    def one_level(self, dict_vak: dict, key_1: str) -> str:
-        """
-        Проверка и обработка данных из исходного словаря.
-        Один уровень вложенности ключей в словаре.
-        :param dict_vak: Словарь вакансии (анализируемый), dict.
-        :param key_1: Ключ 1-го уровня вложенности анализируемого словаря, str.
-        :return: Строковые данные, str.
-        """
-        try:
-            if all(dict_vak.get(key_1)):
-                return self.del_space(self.del_html_tag(dict_vak[key_1]))
-        except (TypeError, AttributeError):
-            return NOT_DATA
-
-    def two_levels(self, dict_vak: dict, key_1: str, key_2: str) -> str:
-        """
-        Проверка и обработка данных из исходного словаря.
-        Два уровня вложенности ключей в словаре.
-        :param dict_vak: Словарь вакансии (анализируемый), dict.
-        :param key_1: Ключ 1-го уровня вложенности анализируемого словаря, str.
-        :param key_2: Ключ 2-го уровня вложенности анализируемого словаря, str.
-        :return: Строковые данные, str.
-        """
-        try:
-            if all(dict_vak.get(key_1).get(key_2)):
-                return self.del_space(self.del_html_tag(dict_vak[key_1][key_2]))
-        except (TypeError, AttributeError):
-            return NOT_DATA
-
-    @staticmethod
-    def one_level_salary(dict_vak: dict, key_1: str) -> int:
-        """
-        Проверка и обработка данных по зарплате из исходного словаря.
-        Один уровень вложенности ключей в словаре.
-        :param dict_vak: Словарь вакансии (анализируемый), dict.
-        :param key_1: Ключ 1-го уровня вложенности анализируемого словаря, str.
-        :return: Выводит данные о зарплате, int.
-        """
-        salary = 0
-        try:
-            if dict_vak.get(key_1) != 0:
-                salary = dict_vak[key_1]
-        except (TypeError, AttributeError):
-            pass
-        return salary
-
-    @staticmethod
-    def two_levels_salary(dict_vak: dict, key_1: str, key_2: str) -> int:
-        """
-        Проверка и обработка данных по зарплате из исходного словаря.
-        Два уровня вложенности ключей в словаре.
-        :param dict_vak: Словарь вакансии (анализируемый), dict.
-        :param key_1: Ключ 1-го уровня вложенности анализируемого словаря, str.
-        :param key_2: Ключ 2-го уровня вложенности анализируемого словаря, str.
-        :return: Выводит данные о зарплате, 0.
-        """
-        salary = 0
-        try:
-            if all(str(dict_vak.get(key_1).get(key_2))):
-                if str(dict_vak.get(key_1).get(key_2)) != 'None':
-                    salary = dict_vak[key_1][key_2]
-        except (TypeError, AttributeError):
-            pass
-        return salary
-
-    @staticmethod
-    def del_space(txt: str) -> str:
-        """
-        Удаляет лишние пробелы в тексте.
-        :param txt: Строка для анализа, str.
-        :return: Строка с одинарными пробелами, str.
-        """
-        # Удаляем лишние пробелы в тексте (в начале, в конце, двойные, тройные),
-        # оставляя по одному между словами.
-        txt = ' '.join(txt.strip().split())
-        # txt = re.sub(r'\s+', ' ', txt.strip())
-        return txt
-
-    @staticmethod
-    def del_html_tag(txt: str) -> str:
-        """
-        Удаляет все html-теги из текста.
-        :param txt: Строка для анализа, str.
-        :return: Строка без html-тегов, str.
-        """
-        txt = re.sub(r'\<[^>]*\>', '', txt)
-        return txt
-
     @staticmethod
     def coord_words_num(digit) -> str:
         """
@@ -118,45 +42,39 @@ class Mixin:
         else:
             return f'{digit} вакансий'
 
-    @staticmethod
-    def foreign_key(ref_list: list[dict], string: str, id_col: str, val_col: str) -> int:
-        """
-        Возвращает вторичный ключ связанной таблицы.
-        :param ref_list: Список словарей связанной таблицы, list[dict].
-        :param string: Проверяемое значение, str.
-        :param id_col: Наименования поля id, str.
-        :param val_col: Наименование сравниваемого поля, str.
-        :return: id вторичного ключа, int.
-        """
-        try:
-            for dict_value in ref_list:
-                if dict_value[val_col] == string:
-                    return int(dict_value[id_col])
-        except (TypeError, AttributeError):
-            return -1
-
 
 class VacHH(Mixin):
     """
     Получение данных по API с hh.ru, их обработка и сохранение.
     """
 
+    EXTRACTOR = FieldExtractor()  # извлечение полей вакансий (функции полей создаются один раз)
+
     def __init__(self, db_name: str, params: dict, area: int = ID_RUSSIA_HH, only_with_salary: bool = True,
-                 salary: int = 1, per_page: int = 100) -> None:
-        self.__url = 'https://api.hh.ru/vacancies'
+                 salary: int = 1, per_page: int = 100, max_workers: int = MAX_WORKERS_HH,
+                 date_from: datetime | None = None) -> None:
+        self.__url = URL_VACANCIES_HH
         self.__area = area  # Поиск по-умолчанию осуществляется по вакансиям России (id=113)
         self.__only_with_salary = only_with_salary
         self.__salary = salary
         self.__per_page = per_page
+        self.__max_workers = max(1, max_workers)  # 1 - последовательная загрузка страниц
+        self.__date_from = date_from  # если указано - загружаются только вакансии, опубликованные после
         self.size_dict = 0  # Счётчик количества словарей с вакансиями
+        self.__vacancy_ids: set[str] = set()  # id полученных вакансий hh.ru
+        self.__resolver: DimensionResolver | None = None  # id записей справочных таблиц
+        self.__stats = {'pages': 0, 'vacancies': 0, 'db_seconds': 0.0}  # показатели загрузки
         self.__db_name = db_name
         self.__params = params
 
-    def request_to_api(self, page: int = 0) -> str:
+    def request_to_api(self, page: int = 0, shard: dict | None = None) -> bytes:
         """
         Получение запроса по api
         :page: Индекс страницы поиска HH.
-        :return: ответ запроса, <class 'requests.models.Response'>.
+        :shard: Параметры части запроса (area, date_from, date_to), заменяющие параметры по-умолчанию.
+        :return: Тело ответа запроса, bytes.
+        :raise requests.RequestException: Если запрос не выполнен после всех повторов
+        (или ответа нет в кэше при работе без сети).
         """
         try:
             parameters = {
@@ -166,128 +84,191 @@ class VacHH(Mixin):
                 'salary': self.__salary,
                 'only_with_salary': self.__only_with_salary
             }
+            if shard:
+                parameters.update(shard)
 
             # Отправляем запрос к API
-            data_prof = requests.get(url=self.__url, params=parameters).text
-            logger.info(f'{self.size_dict + 1 if self.size_dict == 0 else self.size_dict // 100 + 1}. '
-                        f'Запрос к АPI hh.ru ({self.__url}) выполнен успешно')
+            data_prof = http_client().fetch(self.__url, params=parameters)
+            logger.info(f'{page + 1}. Запрос к АPI hh.ru ({self.__url}) выполнен успешно')
             return data_prof
-        except Exception as e:
+        except requests.RequestException as e:
             logger.error(f'Ошибка при получении данных с {self.__url} ({self.__class__.__name__}). {e}')
+            raise
 
-    def vacancies_all(self) -> None:
+    def request_page(self, page: int, shard: dict | None = None) -> dict:
         """
-        Считывает первые 2000 вакансий и сохраняет их в базу данных.
+        Получение страницы поиска hh.ru в виде словаря.
+        :param page: Индекс страницы поиска HH, int.
+        :param shard: Параметры части запроса, dict.
+        :return: Страница поиска, dict.
         """
-        employers: list[tuple] = []  # работодатели
-        currency: list[tuple] = []  # валюта
-        schedule: list[tuple] = []  # график работы
-        employment: list[tuple] = []  # занятость
-        experience: list[tuple] = []  # опыт работы
-        vak_db = []  # список вакансий
-        try:
-            for page in trange(20, desc='Подождите, пожалуйста. Собираем данные', initial=1):
-                # Преобразуем текст ответа запроса в словарь Python.
-                js_obj = json.loads(self.request_to_api(page))
-
-                # Получем количество записей
-                self.size_dict += len(js_obj['items'])
-
-                for value in js_obj['items']:
-                    row_db = [
-                        value["published_at"].split('T')[0],  # дата публикации
-                        self.one_level(value, "name"),  # должность
-                        self.two_levels(value, "employer", "name"),  # работодатель
-                        self.two_levels_salary(value, "salary", "from"),  # зарплата от
-                        self.two_levels_salary(value, "salary", "to"),  # зарплата до
-                        self.two_levels(value, "salary", "currency"),  # валюта
-                        self.two_levels(value, "schedule", "name"),  # график работы
-                        self.two_levels(value, "employment", "name"),  # занятость
-                        self.two_levels(value, "experience", "name"),  # опыт работы
-                        # требования к соискателю
-                        self.two_levels(value, "snippet", "requirement"),
-                        # обязанности
-                        self.two_levels(value, "snippet", "responsibility"),
-                        self.two_levels(value, "address", 'raw'),  # адрес
-                        self.one_level(value, "alternate_url"),  # URL
-                    ]
-                    vak_db.append(row_db)
+        data = self.request_to_api(page, shard)
+        with metrics().timer('hh_json_decode_seconds', source='vacancies'):
+            return loads(data)
 
-                    # Работодатели, валюта, график, занятость, опыт.
-                    employers.append((int(value["area"]["id"]),
-                                      self.two_levels(value, "employer", "name")))
-                    currency.append((self.two_levels(value, "salary", "currency"),))
-                    schedule.append((self.two_levels(value, "schedule", "name"),))
-                    employment.append((self.two_levels(value, "employment", "name"),))
-                    experience.append((self.two_levels(value, "experience", "name"),))
-
-                # Проверка на последнюю страницу, если вакансий меньше 2000
-                if (js_obj['pages'] - page) <= 1:
-                    break
-
-                # Задержка, чтобы не нагружать сервисы hh.
-                time.sleep(0.03)
+    def pages_iter(self) -> Iterator[dict | bytes]:
+        """
+        Загрузка всех страниц поиска.
+        Первые страницы загружаются при построении плана (из них берётся количество вакансий
+        и страниц; если вакансий больше, чем глубина выдачи, запрос разбивается на части),
+        остальные - параллельно пулом из max_workers потоков. Одновременно загружается
+        не более 2 * max_workers страниц, поэтому память не зависит от объёма выдачи.
+        Страницы возвращаются в порядке частей запроса и номеров страниц: первые - в виде словарей,
+        остальные - телами ответов (разбираются поэлементно при преобразовании).
+        :return: Итератор страниц поиска, Iterator[dict | bytes].
+        """
+        plan = ShardPlanner(self.request_page, self.__area, self.__max_workers, date_from=self.__date_from).plan()
+        tasks = [(page, shard) for shard, js_first in plan for page in range(1, min(js_first['pages'], MAX_PAGES_HH))]
+        with tqdm(total=len(plan) + len(tasks), desc='Подождите, пожалуйста. Собираем данные',
+                  initial=len(plan)) as progress:
+            with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+                tasks_iter = iter(tasks)
+                in_flight = deque(executor.submit(self.request_to_api, *task)
+                                  for task in islice(tasks_iter, 2 * self.__max_workers))
+                for shard, js_first in plan:
+                    yield js_first
+                    for _ in range(1, min(js_first['pages'], MAX_PAGES_HH)):
+                        # страницы забираются в порядке постановки в очередь независимо от порядка загрузки
+                        js_obj = in_flight.popleft().result()
+                        task = next(tasks_iter, None)
+                        if task is not None:
+                            in_flight.append(executor.submit(self.request_to_api, *task))
+                        progress.update()
+                        yield js_obj
 
-            # Заполнение справочных таблиц
-            reference_tables = [currency, schedule, employment, experience]
-            names_tables = ['currency', 'schedule', 'employment', 'experience']
-            i: int
-            for i in range(len(names_tables)):
-                reference_tables[i] = sorted(tuple(set(reference_tables[i])))
-                self.insert_table(names_tables[i], names_tables[i] + '_name', reference_tables[i])
+    def vacancies_all(self) -> None:
+        """
+        Считывает все вакансии (по частям запроса, если их больше 2000) и сохраняет их в базу данных.
+        Загрузка, преобразование и запись выполняются конвейером постранично:
+        страница записывается в БД, пока загружаются следующие.
+        Вакансии, уже имеющиеся в БД (по id hh.ru), обновляются.
+        """
+        self.__vacancy_ids = set()  # id вакансий hh.ru (части запроса могут пересекаться)
+        self.__resolver = None
+        self.__stats = {'pages': 0, 'vacancies': 0, 'db_seconds': 0.0}
+        currency_rates().reset()  # курсы валют - на момент загрузки
+        try:
+            self.create_partition()
+            Pipeline(self.pages_iter(), [self.timed_transform_page], self.load_page).run()
+            # Пересчёт в рубли зарплат вакансий, загруженных ранее без пересчёта
+            currency_rates().backfill(self.__db_name, self.__params, self.__area)
+            logger.info(f'Получено {self.coord_words_num(self.size_dict)}. '
+                        f'Всего работодателей: {self.resolver().size("employers")}')
+            http_client().log_stats()
+        except KeyError as e:
+            logger.error(f'Ошибка обращения к полученным данным ({self.__class__.__name__}). {e}')
 
-            # Заполнение таблицы employers
-            employers = sorted(tuple(set(employers)))
-            self.insert_table('employers', 'area_id, employer_name', employers)
+    def timed_transform_page(self, js_obj: dict | bytes) -> dict[str, list]:
+        """
+        Преобразование страницы поиска с учётом времени выполнения (см. transform_page).
+        """
+        with metrics().timer('hh_transform_seconds'):
+            batch = self.transform_page(js_obj)
+        metrics().inc('hh_transform_rows_total', len(batch['vacancies']))
+        return batch
 
-            # Заполнение таблицы vacancies
-            self.db_insert_table_vacancies(vak_db)
+    def transform_page(self, js_obj: dict | bytes) -> dict[str, list]:
+        """
+        Преобразование страницы поиска в строки таблиц БД.
+        :param js_obj: Страница поиска (словарь или тело ответа, вакансии из которого разбираются по одной),
+        dict | bytes.
+        :return: Словарь: имя таблицы - список строк (вакансии и значения справочников), dict[str, list].
+        """
+        batch = {'vacancies': [], 'employers': [], 'currency': [], 'schedule': [], 'employment': [], 'experience': []}
+        dimensions = [batch[table] for table in self.EXTRACTOR.tables]
+        items = js_obj['items'] if isinstance(js_obj, dict) else iter_items(js_obj)
+        for value in items:
+            if value['id'] in self.__vacancy_ids:
+                continue
+            self.__vacancy_ids.add(value['id'])
+            # Получем количество записей
+            self.size_dict += 1
+            # Строка вакансии и ключи справочников (работодатели, валюта, график, занятость, опыт)
+            row_db, keys = self.EXTRACTOR.extract(value)
+            batch['vacancies'].append(row_db)
+            for rows, key in zip(dimensions, keys):
+                rows.append(key)
+        return batch
+
+    def load_page(self, batch: dict[str, list]) -> None:
+        """
+        Запись преобразованной страницы в БД: новые значения справочников, затем вакансии.
+        :param batch: Словарь: имя таблицы - список строк, dict[str, list].
+        """
+        start = time.perf_counter()
+        # Заполнение справочных таблиц (только значениями, которых ещё нет в БД)
+        for name in ['employers', 'currency', 'schedule', 'employment', 'experience']:
+            self.resolver().resolve(name, batch[name])
+
+        # Заполнение таблицы vacancies
+        if batch['vacancies']:
+            self.db_insert_table_vacancies(batch['vacancies'])
+        self.__stats['pages'] += 1
+        self.__stats['vacancies'] += len(batch['vacancies'])
+        self.__stats['db_seconds'] += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        """
+        Показатели последней загрузки (для журнала загрузок).
+        :return: Словарь: pages - количество страниц, rows - загружено строк по таблицам,
+        db_seconds - время записи в БД, сек., dict.
+        """
+        rows = {'vacancies': self.__stats['vacancies']}
+        if self.__resolver is not None:
+            rows.update({name: self.__resolver.inserted(name) for name in DimensionResolver.DIMENSIONS})
+        return {'pages': self.__stats['pages'], 'rows': rows, 'db_seconds': self.__stats['db_seconds']}
 
-            logger.info(f'Получено {self.coord_words_num(self.size_dict)}. Всего работодателей: {len(employers)}')
-        except KeyError as e:
-            logger.error(f'Ошибка обращения к полученным данным ({self.__class__.__name__}). {e}')
+    def resolver(self) -> DimensionResolver:
+        """
+        Получение id записей справочных таблиц (создаётся при первом обращении).
+        :return: Экземпляр DimensionResolver.
+        """
+        if self.__resolver is None:
+            self.__resolver = DimensionResolver(self.__db_name, self.__params)
+            self.__resolver.preload()
+        return self.__resolver
 
     def db_insert_table_vacancies(self, vak_db: list[list]) -> None:
         """
         Заполнение данными таблицы vacancies ("Вакансии").
         :param vak_db: Список списков вакансий, list[list].
         """
-        # Получение списков словарей таблиц связанных по вторичному ключу c табл. vacancies.
-        dict_employers = self.select_data_table('employers', ['employer_id', 'area_id', 'employer_name'])
-        dict_currency = self.select_data_table('currency', ['currency_id', 'currency_name'])
-        dict_schedule = self.select_data_table('schedule', ['schedule_id', 'schedule_name'])
-        dict_employment = self.select_data_table('employment', ['employment_id', 'employment_name'])
-        dict_experience = self.select_data_table('experience', ['experience_id', 'experience_name'])
-
+        resolver = self.resolver()
+        rates = currency_rates()
         try:
             # Формирование списка кортежей для заполнения таблицы vacancies
+            # (зарплаты в валюте вакансии и в рублях - по курсу hh.ru)
             vacancies_db = []
             for data_list in vak_db:
                 vacancy = (
+                    self.__area,
                     datetime.strptime(data_list[0], '%Y-%m-%d'),
                     data_list[1],
-                    self.foreign_key(dict_employers, data_list[2], 'employer_id', 'employer_name'),
+                    resolver.key('employers', data_list[2]),
                     data_list[3],
                     data_list[4],
-                    self.foreign_key(dict_currency, data_list[5], 'currency_id', 'currency_name'),
-                    self.foreign_key(dict_schedule, data_list[6], 'schedule_id', 'schedule_name'),
-                    self.foreign_key(dict_employment, data_list[7], 'employment_id', 'employment_name'),
-                    self.foreign_key(dict_experience, data_list[8], 'experience_id', 'experience_name'),
+                    rates.to_rub(data_list[3], data_list[5]),
+                    rates.to_rub(data_list[4], data_list[5]),
+                    resolver.key('currency', (data_list[5],)),
+                    resolver.key('schedule', (data_list[6],)),
+                    resolver.key('employment', (data_list[7],)),
+                    resolver.key('experience', (data_list[8],)),
                     data_list[9],
                     data_list[10],
                     data_list[11],
-                    data_list[12]
+                    data_list[12],
+                    data_list[13]
                 )
-                if vacancy.count(-1) == 0:
-                    vacancies_db.append(vacancy)
-                else:
-                    continue
-            # Заполнение таблицы БД vacancies (вакансии)
-            self.insert_table('vacancies', 'date_publication, '
+                vacancies_db.append(vacancy)
+            # Заполнение таблицы БД vacancies (вакансии) с обновлением имеющихся
+            self.upsert_table('vacancies', 'area_id, '
+                                           'date_publication, '
                                            'position_employee,'
                                            'employer_id, '
                                            'salary_from, '
                                            'salary_to, '
+                                           'salary_from_rub, '
+                                           'salary_to_rub, '
                                            'currency_id, '
                                            'schedule_id, '
                                            'employment_id, '
@@ -295,58 +276,70 @@ class VacHH(Mixin):
                                            'applicant_requirements, '
                                            'duties, '
                                            'employer_address, '
-                                           'url', vacancies_db)
+                                           'url, '
+                                           'hh_id', vacancies_db)
         except Exception as err:
             logger.error(f'Ошибка создания списка вакансий ({self.__class__.__name__}): {err}')
 
-    def insert_table(self, table: str, columns: str, list_table: list[tuple]) -> None:
+    def create_partition(self) -> None:
+        """
+        Создание секции таблицы vacancies для региона/города поиска (если её нет).
+        """
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"CREATE TABLE IF NOT EXISTS vacancies_{int(self.__area)} "
+                                f"PARTITION OF vacancies FOR VALUES IN ({int(self.__area)})")
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Создание секции таблицы vacancies ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def upsert_table(self, table: str, columns: str, list_table: list[tuple]) -> None:
         """
-        Заполнение таблицы БД данными.
+        Заполнение таблицы БД данными с обновлением записей с тем же id hh.ru в регионе/городе поиска.
         :param table: Имя заполняемой таблицы, str.
         :param columns: Имена полей, str.
         :param list_table: Список картежей с данными для заполнения таблицы, list[tuple].
         """
-        conn = psycopg2.connect(dbname=self.__db_name, **self.__params)
         try:
-            with conn:
+            BulkLoader(self.__db_name, self.__params).upsert(table, columns, list_table, 'area_id, hh_id')
+            logger.info(f'Таблица {table} БД {self.__db_name} обновлена успешно')
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f'Обновление таблицы БД данными ({self.__class__.__name__}): {error}')
+            exit(1)
+
+    def delete_expired(self) -> None:
+        """
+        Удаление вакансий региона/города поиска, срок публикации которых на hh.ru истёк
+        (VACANCY_LIFETIME_DAYS), если они не были обновлены (переопубликованы) при синхронизации.
+        """
+        start = time.perf_counter()
+        try:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
                 with conn.cursor() as cur:
-                    database_request = (f"INSERT INTO  {table}({columns})"
-                                        f"VALUES ({', '.join(['%s'] * len(list_table[0]))})")
-                    cur.executemany(database_request, list_table)
-            logger.info(f'Таблица {table} БД {self.__db_name} заполнена данными успешно')
+                    cur.execute("DELETE FROM vacancies WHERE area_id = %s AND date_publication < current_date - %s",
+                                (self.__area, VACANCY_LIFETIME_DAYS))
+                    logger.info(f'Из таблицы vacancies БД {self.__db_name} удалено устаревших вакансий: '
+                                f'{cur.rowcount}')
+            self.__stats['db_seconds'] += time.perf_counter() - start
         except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f'Заполнение таблицы БД данными ({self.__class__.__name__}): {error}')
+            logger.error(f'Удаление устаревших вакансий ({self.__class__.__name__}): {error}')
             exit(1)
-        finally:
-            conn.close()
 
-    def select_data_table(self, table: str, columns_list: list) -> list[dict[Any, Any]]:
+    def refresh_summary(self) -> None:
         """
-        Получение данных из таблицы БД с сортировкой по возрастанию значения ключевого поля.
-        :param table: Имя таблицы, из которой извлекаются все данные, str.
-        :param columns_list: Список заголовков таблицы, list.
-        :return: Список словарей, содержащий данные таблицы, list[dict[Any, Any]].
+        Обновление сводной статистики по вакансиям (материализованное представление vacancies_summary).
         """
-        conn = psycopg2.connect(dbname=self.__db_name, **self.__params)
+        start = time.perf_counter()
         try:
-            with conn:
+            with db_pool(self.__db_name, self.__params).transaction() as conn:
                 with conn.cursor() as cur:
-                    # Формируем запрос
-                    database_request = (f"SELECT * FROM {table} "
-                                        f"ORDER BY {columns_list[0]}")
-                    cur.execute(database_request)
-                    # Формируем список словарей
-                    fetch = cur.fetchall()
-                    result = []
-                    for row in fetch:
-                        result.append(dict(zip(columns_list, row)))
-            logger.info(f'Данные из {table} получены успешно')
-            return result
+                    cur.execute("REFRESH MATERIALIZED VIEW vacancies_summary")
+            self.__stats['db_seconds'] += time.perf_counter() - start
+            logger.info(f'Сводная статистика по вакансиям БД {self.__db_name} обновлена')
         except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f'Получение данных из таблицы БД с сортировкой по возрастанию ({self.__class__.__name__}): {error}')
+            logger.error(f'Обновление сводной статистики ({self.__class__.__name__}): {error}')
             exit(1)
-        finally:
-            conn.close()
 
     def __str__(self) -> str:
         return f'Получение и вставка в БД сведений о вакансиях с сервиса hh.ru по API {self.__url}'
@@ -354,5 +347,6 @@ class VacHH(Mixin):
     def __repr__(self) -> str:
         return (f"{self.__class__.__name__}(url: {self.__url}, area: {self.__area},"
                 f" only_with_salary: {self.__only_with_salary}, salary: {self.__salary},"
-                f" per_page: {self.__per_page}, size_dict: {self.size_dict}),"
+                f" per_page: {self.__per_page}, max_workers: {self.__max_workers}, date_from: {self.__date_from},"
+                f" size_dict: {self.size_dict}),"
                 f" БД {self.__db_name}, host: {self.__params[0]}, port: {self.__params[3]}")
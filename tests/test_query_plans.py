@@ -0,0 +1,86 @@
+"""
+Проверка планов выполнения (EXPLAIN) запросов DBManager: списки вакансий региона/города
+(постраничная выборка по ключу, поиск, зарплата выше средней) и сводная статистика
+читают индексы, созданные для них (миграции src/conf/migrations, dbcreatetables.sql).
+Полный просмотр таблиц запрещён (enable_seqscan = off), поэтому без нужного индекса план
+использует другой индекс (первичный ключ) и тест не проходит.
+Количество всех вакансий региона/города читается по любому индексу (наименьшему) и не проверяется.
+Тесты выполняются, если доступна БД vacancies (параметры - src/conf/database.ini)
+с загруженными данными хотя бы по одному региону/городу, иначе пропускаются.
+"""
+import os
+from datetime import date
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+pytest.importorskip('loguru')
+
+from src.conf.config import config
+from src.conf.constants import DB_NAME
+from src.utils.dbmanager import DBManager
+from src.utils.queryplan import uses_index, plan_indexes
+
+PATH_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'conf', 'database.ini')
+
+# Индексы, созданные для запросов (план должен читать хотя бы один из них)
+ORDER_INDEX = 'ix_vacancies_area_id_date_salary_rub_id'
+SALARY_INDEXES = ['ix_vacancies_area_id_salary_from_rub', 'ix_vacancies_area_id_salary_to_rub']
+SEARCH_INDEXES = ['ix_vacancies_search_vector', 'ix_vacancies_position_employee_trgm']
+INDEXES = {
+    'summary': ['ux_vacancies_summary_area_id'],
+    'page_all': [ORDER_INDEX],
+    'count_higher': SALARY_INDEXES,
+    'page_higher': SALARY_INDEXES + [ORDER_INDEX],
+    'count_keyword': SEARCH_INDEXES,
+    'page_keyword': SEARCH_INDEXES,
+}
+
+
+@pytest.fixture(scope='module')
+def db() -> DBManager:
+    """
+    DBManager по региону/городу, данные по которому загружены (пропуск теста, если БД недоступна).
+    """
+    try:
+        params = config(PATH_INI)
+        with psycopg2.connect(dbname=DB_NAME, connect_timeout=3, **params) as conn:
+            with conn.cursor() as cur:
+                cur.execute('SELECT area_id FROM area_freshness ORDER BY freshness_datetime DESC LIMIT 1')
+                row = cur.fetchone()
+        conn.close()
+    except Exception as error:
+        pytest.skip(f'БД {DB_NAME} недоступна: {error}')
+    if row is None:
+        pytest.skip(f'В БД {DB_NAME} нет загруженных вакансий')
+    return DBManager(DB_NAME, params, row[0])
+
+
+@pytest.fixture(scope='module')
+def plans(db: DBManager) -> dict[str, list[str]]:
+    return db.explain_queries('python', seqscan=False)
+
+
+def expected_indexes(db: DBManager, indexes: list[str]) -> set[str]:
+    """
+    Имена индексов и индексов секций, созданных по ним.
+    """
+    return set().union(*(db.index_names(index) for index in indexes))
+
+
+@pytest.mark.parametrize('name', list(INDEXES))
+def test_query_uses_index(db: DBManager, plans: dict[str, list[str]], name: str) -> None:
+    table = 'vacancies_summary' if name == 'summary' else 'vacancies'
+    assert uses_index(plans[name], table), '\n'.join(plans[name])
+    assert plan_indexes(plans[name]) & expected_indexes(db, INDEXES[name]), '\n'.join(plans[name])
+
+
+@pytest.mark.parametrize('kind', ['all', 'higher', 'keyword'])
+def test_next_page_uses_index(db: DBManager, kind: str) -> None:
+    after = (date.today(), 0, 0)
+    if kind == 'keyword':
+        after = (1.0,) + after
+    database_request, query_params, _ = db.page_select(kind, 10, after=after, word='python')
+    plan = db.explain(database_request, query_params, seqscan=False)
+    assert uses_index(plan), '\n'.join(plan)
+    assert plan_indexes(plan) & expected_indexes(db, INDEXES[f'page_{kind}']), '\n'.join(plan)
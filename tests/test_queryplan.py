@@ -0,0 +1,39 @@
+"""
+Разбор планов выполнения (src/utils/queryplan.py): не требует БД.
+"""
+from src.utils.queryplan import uses_index, plan_indexes
+
+PLAN = [
+    'Limit  (cost=0.86..45.32 rows=10 width=580)',
+    '  ->  Nested Loop  (cost=0.86..4420.51 rows=994 width=580)',
+    '        ->  Index Scan using vacancies_1_area_id_date_publication_salary_from_rub_vac_idx on vacancies_1 vacancies'
+    '  (cost=0.29..1480.05 rows=994 width=540)',
+    '              Index Cond: (area_id = 1)',
+    '        ->  Index Only Scan using pk_employers_employer_id on employers  (cost=0.28..2.90 rows=1 width=36)',
+]
+
+BITMAP_PLAN = [
+    'Aggregate  (cost=95.14..95.15 rows=1 width=8)',
+    '  ->  Bitmap Heap Scan on vacancies_1 vacancies  (cost=17.07..94.55 rows=236 width=0)',
+    '        ->  BitmapOr  (cost=17.07..17.07 rows=243 width=0)',
+    '              ->  Bitmap Index Scan on vacancies_1_search_vector_idx  (cost=0.00..8.54 rows=3 width=0)',
+    '              ->  Bitmap Index Scan on vacancies_1_position_employee_idx  (cost=0.00..8.40 rows=240 width=0)',
+]
+
+
+def test_uses_index() -> None:
+    assert uses_index(PLAN)
+    assert uses_index(BITMAP_PLAN)
+    assert uses_index(['Seq Scan on employers  (cost=0.00..1.01)'])
+    assert not uses_index(['  ->  Seq Scan on vacancies_1 vacancies  (cost=0.00..35.50)'])
+    assert not uses_index(['Seq Scan on vacancies_summary'], 'vacancies_summary')
+    assert uses_index(['Seq Scan on vacancies_summary'])
+
+
+def test_plan_indexes() -> None:
+    assert plan_indexes(PLAN) == {'vacancies_1_area_id_date_publication_salary_from_rub_vac_idx',
+                                  'pk_employers_employer_id'}
+    assert plan_indexes(BITMAP_PLAN) == {'vacancies_1_search_vector_idx', 'vacancies_1_position_employee_idx'}
+    assert plan_indexes(['Index Scan Backward using ux_vacancies_summary_area_id on vacancies_summary']) == \
+        {'ux_vacancies_summary_area_id'}
+    assert plan_indexes(['Seq Scan on vacancies_1 vacancies']) == set()
@@ -0,0 +1,75 @@
+"""
+Статистика зарплат (SalaryAnalytics): вычисление в БД (percentile_cont, GROUPING SETS, width_bucket -
+без NumPy) и с NumPy дают одинаковый результат на синтетических вакансиях.
+Вакансии загружаются в БД бенчмарков vacancies_bench (сервер - src/conf/database.ini).
+Тест выполняется, если установлены psycopg2 и NumPy и доступен сервер БД, иначе пропускается.
+"""
+import math
+import os
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+pytest.importorskip('loguru')
+pytest.importorskip('numpy')
+
+from src.benchmarks.bench import BENCH_DB_NAME, BENCH_AREA_ID, BENCH_RATES, prepare_database, reset_area
+from src.benchmarks.fixtures import synthetic_pages
+from src.conf.config import config
+from src.utils.currencyrates import currency_rates
+from src.utils.salaryanalytics import SalaryAnalytics
+from src.utils.vacancies import VacHH
+
+PATH_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+PATH_INI = os.path.join(PATH_SRC, 'conf', 'database.ini')
+ROWS = 3000
+
+
+@pytest.fixture(scope='module')
+def analytics() -> SalaryAnalytics:
+    """
+    SalaryAnalytics по региону/городу бенчмарков с загруженными синтетическими вакансиями
+    (пропуск теста, если сервер БД недоступен).
+    """
+    try:
+        params = config(PATH_INI)
+        psycopg2.connect(dbname='postgres', connect_timeout=3, **params).close()
+    except Exception as error:
+        pytest.skip(f'Сервер БД недоступен: {error}')
+    cwd = os.getcwd()
+    os.chdir(PATH_SRC)  # пути к скриптам создания БД заданы относительно каталога src
+    try:
+        prepare_database(params)
+        currency_rates().update(BENCH_RATES)
+        reset_area(params)
+        vac = VacHH(BENCH_DB_NAME, params, BENCH_AREA_ID)
+        for page in synthetic_pages(ROWS, BENCH_AREA_ID):
+            vac.load_page(vac.transform_page(page))
+    finally:
+        os.chdir(cwd)
+    return SalaryAnalytics(BENCH_DB_NAME, params, BENCH_AREA_ID)
+
+
+def assert_same(sql: object, vectorised: object, path: str = 'stats') -> None:
+    """
+    Сравнение результатов (числа с плавающей точкой - с относительной погрешностью 1e-9).
+    """
+    if isinstance(sql, dict):
+        assert isinstance(vectorised, dict) and sql.keys() == vectorised.keys(), path
+        for key in sql:
+            assert_same(sql[key], vectorised[key], f'{path}.{key}')
+    elif isinstance(sql, list):
+        assert isinstance(vectorised, list) and len(sql) == len(vectorised), path
+        for i, (sql_value, vectorised_value) in enumerate(zip(sql, vectorised)):
+            assert_same(sql_value, vectorised_value, f'{path}[{i}]')
+    elif isinstance(sql, float) or isinstance(vectorised, float):
+        assert sql is not None and vectorised is not None, f'{path}: {sql} != {vectorised}'
+        assert math.isclose(sql, vectorised, rel_tol=1e-9), f'{path}: {sql} != {vectorised}'
+    else:
+        assert sql == vectorised, f'{path}: {sql!r} != {vectorised!r}'
+
+
+def test_sql_and_numpy_stats_match(analytics: SalaryAnalytics) -> None:
+    sql, vectorised = analytics.sql_stats(), analytics.numpy_stats()
+    assert sql['salary_from_rub']['count'] > 0 and sql['breakdowns']['employer']
+    assert_same(sql, vectorised)